@@ -0,0 +1,143 @@
+"""
+اعتبارسنجی عدم همپوشانی بازه‌ها (تاریخ یا مبلغ) برای یک دسته از رکوردها.
+
+بازه‌های موجود همه کلیدهای دسته (مثلاً کارمند و سازمان) یک بار خوانده
+می‌شوند، با بازه‌های دسته بر اساس (کلید، شروع) مرتب می‌شوند و با یک پیمایش
+و یک heap از پایان بازه‌های باز، همه جفت‌های همپوشان پیدا می‌شوند:
+O(n log n + تعداد همپوشانی‌ها). متد clean() مدل‌ها همین سرویس را برای یک
+رکورد و مسیرهای بارگذاری انبوه برای کل دسته صدا می‌زنند.
+"""
+import heapq
+from collections import namedtuple
+from itertools import groupby
+from operator import attrgetter
+
+from django.core.exceptions import ValidationError
+from django.utils.translation import gettext as _, gettext_lazy
+
+
+Range = namedtuple('Range', 'key start end item stored')
+
+# A row already in the database that conflicts with the batch.
+StoredRange = namedtuple('StoredRange', 'pk start end')
+
+KEY_CHUNK_SIZE = 500
+
+
+def _ended(end, start, closed):
+    return end < start if closed else end <= start
+
+
+def find_overlaps(ranges, closed=True):
+    """
+    Every overlapping pair of `ranges` (Range tuples) that share a key, as
+    (earlier item, later item). A None end is open-ended. closed=True: ranges
+    sharing an endpoint overlap (inclusive dates); closed=False: they only
+    touch (brackets like [from, to)). Pairs of two stored ranges are skipped.
+    """
+    conflicts = []
+    ordered = sorted((r for r in ranges if r.start is not None), key=attrgetter('key', 'start'))
+    for _key, group in groupby(ordered, key=attrgetter('key')):
+        # (open-ended, end, sequence, range): the earliest finite end on top.
+        active = []
+        for sequence, current in enumerate(group):
+            while active and not active[0][0] and _ended(active[0][1], current.start, closed):
+                heapq.heappop(active)
+            conflicts += [
+                (other.item, current.item)
+                for _open, _end, _seq, other in active
+                if not (other.stored and current.stored)
+            ]
+            open_ended = current.end is None
+            heapq.heappush(active, (open_ended, 0 if open_ended else current.end, sequence, current))
+    return conflicts
+
+
+class OverlapValidator:
+    """
+    Overlap check of a model's ranges within each key (e.g. the employment
+    history of one employee in one organization).
+
+    key_fields: fields grouping the ranges; start_field/end_field: the range
+    bounds (end may be null = open-ended); closed: see find_overlaps();
+    message: the error of one conflicting record.
+    """
+
+    def __init__(self, model, key_fields, start_field='start_date', end_field='end_date', closed=True, message=None):
+        self.model = model
+        self.key_attnames = [model._meta.get_field(name).attname for name in key_fields]
+        self.start_field = start_field
+        self.end_field = end_field
+        self.closed = closed
+        self.message = message or gettext_lazy("این بازه با یک بازه موجود همپوشانی دارد.")
+
+    def key_of(self, obj):
+        key = tuple(getattr(obj, attname) for attname in self.key_attnames)
+        return None if None in key else key
+
+    def stored_ranges(self, keys, exclude_pks=()):
+        """
+        Ranges in the database for `keys`, read once (in chunks of key values).
+        Rows in `exclude_pks` are being replaced by the batch and left out.
+        """
+        keys = set(keys)
+        exclude_pks = set(exclude_pks)
+        first = self.key_attnames[0]
+        first_values = sorted({key[0] for key in keys})
+        ranges = []
+        for start in range(0, len(first_values), KEY_CHUNK_SIZE):
+            rows = self.model._default_manager.filter(**{
+                f'{first}__in': first_values[start:start + KEY_CHUNK_SIZE],
+            }).values_list('pk', *self.key_attnames, self.start_field, self.end_field).order_by()
+            for pk, *values in rows:
+                key, start_value, end_value = tuple(values[:-2]), values[-2], values[-1]
+                if key in keys and pk not in exclude_pks:
+                    ranges.append(Range(key, start_value, end_value, StoredRange(pk, start_value, end_value), True))
+        return ranges
+
+    def conflicts(self, objects):
+        """
+        [(obj, other)] for every conflict of `objects` with each other or with
+        the stored rows; `other` is an object of the batch or a StoredRange.
+        """
+        batch = []
+        for obj in objects:
+            key = self.key_of(obj)
+            if key is not None:
+                batch.append(Range(key, getattr(obj, self.start_field), getattr(obj, self.end_field), obj, False))
+        if not batch:
+            return []
+        stored = self.stored_ranges(
+            {item.key for item in batch},
+            exclude_pks={item.item.pk for item in batch if item.item.pk is not None},
+        )
+        pairs = []
+        for first, second in find_overlaps(stored + batch, closed=self.closed):
+            # Report against the record of the batch.
+            pairs.append((second, first) if isinstance(first, StoredRange) else (first, second))
+        return pairs
+
+    def _bounds(self, item):
+        if isinstance(item, StoredRange):
+            return item.start, item.end
+        return getattr(item, self.start_field), getattr(item, self.end_field)
+
+    def validate(self, objects):
+        """
+        Raises one ValidationError listing every conflict of `objects`.
+        """
+        errors = []
+        for obj, other in self.conflicts(objects):
+            (start, end), (other_start, other_end) = self._bounds(obj), self._bounds(other)
+            errors.append(ValidationError(
+                _("%(message)s (%(start)s تا %(end)s با %(other_start)s تا %(other_end)s)"),
+                params={
+                    'message': self.message,
+                    'start': start,
+                    'end': end if end is not None else _("تاکنون"),
+                    'other_start': other_start,
+                    'other_end': other_end if other_end is not None else _("تاکنون"),
+                },
+            ))
+        if errors:
+            raise ValidationError(errors)
@@ -0,0 +1,63 @@
+"""
+میکسین‌های مشترک ویوها.
+"""
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.utils.translation import gettext as _
+
+
+class RelatedObjectsMixin:
+    """
+    Applies the view's declared select_related/prefetch_related to the list
+    queryset, whatever get_queryset() returned. Place before ListView (and
+    before KeysetPaginationMixin) in the bases.
+
+    Declare every relation that the template or the models' __str__ follows,
+    so a page costs a fixed number of queries regardless of its row count.
+    """
+
+    list_select_related = ()
+    list_prefetch_related = ()
+
+    def get_related_queryset(self, queryset):
+        if self.list_select_related:
+            queryset = queryset.select_related(*self.list_select_related)
+        if self.list_prefetch_related:
+            queryset = queryset.prefetch_related(*self.list_prefetch_related)
+        return queryset
+
+    def get_context_data(self, **kwargs):
+        queryset = kwargs.pop('object_list', self.object_list)
+        return super().get_context_data(object_list=self.get_related_queryset(queryset), **kwargs)
+
+
+class OrganizationPeriodMixin:
+    """
+    For views addressed by organization_pk/financial_period_pk URL kwargs.
+    Place between LoginRequiredMixin and UserPassesTestMixin in the bases so
+    its test_func() overrides the latter's. test_func() loads
+    self.organization and self.financial_period (404 when the period belongs
+    to another organization) and checks `organization_permission` in the
+    organization. It runs after the login check, so anonymous users never
+    reach the lookups.
+    """
+
+    organization_permission = None
+
+    def get_organization_permission(self):
+        return self.organization_permission
+
+    def test_func(self):
+        from organizations.models import Organization
+        from settings_app.models import FinancialPeriod
+        from users.permissions import has_org_permission
+
+        self.organization = get_object_or_404(Organization, pk=self.kwargs['organization_pk'])
+        self.financial_period = get_object_or_404(
+            FinancialPeriod.objects.select_related('fiscal_year'), pk=self.kwargs['financial_period_pk']
+        )
+        if self.financial_period.fiscal_year.organization_id != self.organization.pk:
+            raise Http404(_("دوره مالی متعلق به این سازمان نیست."))
+        user = self.request.user
+        return user.is_staff or user.is_superuser or \
+               has_org_permission(user, self.organization, self.get_organization_permission())
@@ -0,0 +1,214 @@
+"""
+صفحه‌بندی کلیدی (keyset / cursor) برای لیست‌های بزرگ.
+
+به جای OFFSET و COUNT(*)، هر صفحه از روی مقادیر کلید مرتب‌سازی آخرین (یا اولین)
+ردیف صفحه قبل جستجو می‌شود؛ هزینه هر صفحه مستقل از عمق آن است. ترتیب از
+Meta.ordering مدل گرفته می‌شود و pk به انتهای آن اضافه می‌شود تا یکتا باشد.
+"""
+import base64
+import binascii
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import F, Q
+from django.http import Http404
+from django.utils.translation import gettext as _
+
+
+DEFAULT_PAGE_SIZE = 50
+AFTER_PARAM = 'after'
+BEFORE_PARAM = 'before'
+
+
+class KeysetKey:
+    """
+    One column of the keyset ordering.
+    Relations are keyed on their foreign-key column so the order is index-backed.
+    """
+
+    def __init__(self, model, name):
+        self.descending = name.startswith('-')
+        name = name.lstrip('-')
+        if name == 'pk':
+            name = model._meta.pk.name
+
+        parts = name.split('__')
+        nullable = False
+        current = model
+        field = None
+        for part in parts:
+            field = current._meta.get_field(part)
+            nullable = nullable or field.null
+            if field.is_relation:
+                current = field.related_model
+        if field.is_relation:
+            if not (field.many_to_one or field.one_to_one) or not field.concrete:
+                raise FieldDoesNotExist(f"Cannot paginate on relation '{name}'.")
+            parts[-1] = field.attname
+            field = field.target_field
+
+        self.path = '__'.join(parts)
+        self.field = field
+        self.nullable = nullable
+        # Values of the model's own columns are read straight off the instance.
+        self.annotation = f'keyset_{self.path}' if len(parts) > 1 else None
+
+    def order_by(self, forward):
+        expression = F(self.path)
+        # NULL sorts as the smallest value on every database.
+        if self.descending == forward:
+            return expression.desc(nulls_last=True)
+        return expression.asc(nulls_first=True)
+
+    def value_of(self, obj):
+        return getattr(obj, self.annotation or self.path)
+
+    def equals(self, value):
+        if value is None:
+            return Q(**{f'{self.path}__isnull': True})
+        return Q(**{self.path: value})
+
+    def beyond(self, value, forward):
+        """
+        Rows strictly past `value` in the walking direction, or None if there are none.
+        """
+        if self.descending != forward:
+            if value is None:
+                return Q(**{f'{self.path}__isnull': False})
+            return Q(**{f'{self.path}__gt': value})
+        if value is None:
+            return None
+        condition = Q(**{f'{self.path}__lt': value})
+        if self.nullable:
+            condition |= Q(**{f'{self.path}__isnull': True})
+        return condition
+
+
+def get_keyset_keys(model, ordering=None):
+    if ordering is None:
+        ordering = model._meta.ordering or []
+    keys = [KeysetKey(model, name) for name in ordering]
+    if not any(key.path == model._meta.pk.attname for key in keys):
+        keys.append(KeysetKey(model, 'pk'))
+    return keys
+
+
+def encode_cursor(keys, obj):
+    values = [key.value_of(obj) for key in keys]
+    payload = json.dumps([None if value is None else str(value) for value in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(keys, cursor):
+    try:
+        payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        raw_values = json.loads(payload)
+        if not isinstance(raw_values, list) or len(raw_values) != len(keys):
+            raise ValueError(cursor)
+        return [None if raw is None else key.field.to_python(raw) for key, raw in zip(keys, raw_values)]
+    except (ValueError, TypeError, ValidationError, binascii.Error):
+        raise Http404(_("نشانگر صفحه نامعتبر است."))
+
+
+def seek(keys, values, forward):
+    """
+    Filter selecting the rows after (forward) or before the row holding `values`.
+    """
+    condition = None
+    prefix = Q()
+    for key, value in zip(keys, values):
+        beyond = key.beyond(value, forward)
+        if beyond is not None:
+            clause = prefix & beyond
+            condition = clause if condition is None else condition | clause
+        prefix &= key.equals(value)
+    return condition
+
+
+class KeysetPage:
+    """
+    یک صفحه از نتایج به همراه نشانگرهای صفحه بعد و قبل.
+    """
+
+    def __init__(self, object_list, keys, has_next, has_previous, query_params):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.next_cursor = encode_cursor(keys, object_list[-1]) if has_next else None
+        self.previous_cursor = encode_cursor(keys, object_list[0]) if has_previous else None
+        self._query_params = query_params
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    def _querystring(self, param, cursor):
+        params = self._query_params.copy()
+        params.pop(AFTER_PARAM, None)
+        params.pop(BEFORE_PARAM, None)
+        params[param] = cursor
+        return params.urlencode()
+
+    def next_querystring(self):
+        return self._querystring(AFTER_PARAM, self.next_cursor) if self.has_next else ''
+
+    def previous_querystring(self):
+        return self._querystring(BEFORE_PARAM, self.previous_cursor) if self.has_previous else ''
+
+
+def keyset_paginate(request, queryset, ordering=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Returns one KeysetPage of `queryset` for the `after`/`before` cursor in request.GET.
+    Fetches page_size + 1 rows to learn whether another page exists; never counts.
+    """
+    keys = get_keyset_keys(queryset.model, ordering)
+    annotations = {key.annotation: F(key.path) for key in keys if key.annotation}
+    if annotations:
+        queryset = queryset.annotate(**annotations)
+
+    after = request.GET.get(AFTER_PARAM)
+    before = request.GET.get(BEFORE_PARAM)
+    forward = not before
+    cursor = before or after
+
+    if cursor:
+        condition = seek(keys, decode_cursor(keys, cursor), forward)
+        queryset = queryset.filter(condition) if condition is not None else queryset.none()
+
+    rows = list(queryset.order_by(*(key.order_by(forward) for key in keys))[:page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+
+    if forward:
+        has_next, has_previous = has_more, bool(cursor)
+    else:
+        rows.reverse()
+        has_next, has_previous = True, has_more
+    if not rows:
+        has_next = has_previous = False
+    return KeysetPage(rows, keys, has_next, has_previous, request.GET)
+
+
+class KeysetPaginationMixin:
+    """
+    Keyset pagination for ListView; place before ListView in the bases.
+    The page is exposed as `keyset_page` and replaces object_list in the context.
+    """
+
+    keyset_page_size = DEFAULT_PAGE_SIZE
+    keyset_ordering = None
+
+    def get_keyset_ordering(self):
+        return self.keyset_ordering
+
+    def get_context_data(self, **kwargs):
+        queryset = kwargs.pop('object_list', self.object_list)
+        page = keyset_paginate(self.request, queryset, self.get_keyset_ordering(), self.keyset_page_size)
+        context = super().get_context_data(object_list=page.object_list, **kwargs)
+        context['keyset_page'] = page
+        return context
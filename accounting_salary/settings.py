@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+from datetime import timedelta
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -64,6 +65,12 @@ INSTALLED_APPS = [
     "loans",
     # salaries وابسته به organizations، employees و settings_app است.
     "salaries",
+    # reports فقط از داده‌های اپ‌های بالا گزارش تهیه می‌کند.
+    "reports",
+    # jobs صف کارهای پس‌زمینه (محاسبه حقوق، خروجی‌ها، فیش‌ها) روی همان پایگاه داده است.
+    "jobs",
+    # benchmarks ابزار تولید داده آزمایشی و سنجش کارایی است و مدلی ندارد.
+    "benchmarks",
     # Add other custom apps here as needed...
 ]
 
@@ -80,6 +87,8 @@ MEDIA_ROOT = BASE_DIR / "media"  # یا os.path.join(BASE_DIR, 'media')
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    # زمان پاسخ و کوئری‌های درخواست‌ها (reports.instrumentation)؛ بالای بقیه تا آن‌ها را هم بسنجد.
+    "reports.instrumentation.RequestMetricsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -119,6 +128,38 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Organization permission maps (users.permissions) and the tax table versions
+# (settings_app.tax) are cached here. With more than one worker process, point
+# this at a shared backend (Redis/Memcached) so invalidations are seen by every
+# process.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "accounting-salary",
+    }
+}
+
+ORGANIZATION_PERMISSION_CACHE_TIMEOUT = 60 * 60
+
+# Seconds a process keeps a compiled tax table before rebuilding it, for TaxLevel
+# writes that bypass the signals.
+TAX_TABLE_CACHE_TIMEOUT = 60 * 5
+
+# نمونه‌برداری کارایی درخواست‌ها (reports.instrumentation): سهم درخواست‌های سنجیده شده
+# (۰ غیرفعال)، مدت نگهداری نمونه‌ها و آستانه ثبت هشدار درخواست کند. نمونه‌ها در یک رشته
+# پس‌زمینه ذخیره می‌شوند تا زمان پاسخ درخواست‌ها افزایش نیابد.
+REQUEST_METRICS_SAMPLE_RATE = 1.0
+REQUEST_METRICS_RETENTION = timedelta(days=7)
+REQUEST_METRICS_SLOW_MS = 1000
+REQUEST_METRICS_BACKGROUND_FLUSH = True
+
+# فونت TTF فارسی برای فیش‌های حقوقی PDF (reports.payslips)؛ بدون آن از Helvetica استفاده می‌شود.
+PAYSLIP_FONT_PATH = None
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -162,3 +203,42 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 STATIC_URL = "/static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
+
+
+# Logging
+# https://docs.djangoproject.com/en/5.2/topics/logging/
+# Slow requests and duplicate queries (reports.instrumentation) and background
+# job failures (jobs) go to the console.
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "simple": {
+            "format": "{asctime} {levelname} {name}: {message}",
+            "style": "{",
+        },
+    },
+    "handlers": {
+        "console": {
+            "class": "logging.StreamHandler",
+            "formatter": "simple",
+        },
+    },
+    "root": {
+        "handlers": ["console"],
+        "level": "WARNING",
+    },
+    "loggers": {
+        "reports.instrumentation": {
+            "handlers": ["console"],
+            "level": "INFO",
+            "propagate": False,
+        },
+        "jobs": {
+            "handlers": ["console"],
+            "level": "INFO",
+            "propagate": False,
+        },
+    },
+}
@@ -0,0 +1,23 @@
+"""
+ابزارهای تولید خروجی جریانی (برای StreamingHttpResponse و فایل).
+"""
+import csv
+
+
+class Echo:
+    """
+    File-like object whose write() returns the value, so csv.writer output
+    can be yielded line by line instead of buffered.
+    """
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(rows):
+    """
+    Yields each row of `rows` as a CSV text line.
+    """
+    writer = csv.writer(Echo())
+    for row in rows:
+        yield writer.writerow(row)
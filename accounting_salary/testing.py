@@ -0,0 +1,85 @@
+"""
+ابزارهای کمکی تست.
+"""
+import datetime
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+from employees.models import Employee
+from organizations.models import EmployeeOrganization, Organization
+from settings_app.models import FiscalYear, FinancialPeriod
+from users.models import CustomUser
+
+
+@contextmanager
+def assert_max_queries(max_queries, using=DEFAULT_DB_ALIAS):
+    """
+    Fails when the block runs more than `max_queries` queries.
+    Unlike assertNumQueries it is a ceiling, meant for "this page must not
+    scale with its row count" budgets.
+    """
+    with CaptureQueriesContext(connections[using]) as context:
+        yield context
+    executed = len(context.captured_queries)
+    if executed > max_queries:
+        queries = '\n'.join(
+            f"{i}. {query['sql']}" for i, query in enumerate(context.captured_queries, start=1)
+        )
+        raise AssertionError(f"{executed} queries executed, budget is {max_queries}:\n{queries}")
+
+
+class QueryBudgetMixin:
+    """
+    TestCase mixin: self.assertMaxQueries(n) as a context manager.
+    """
+
+    def assertMaxQueries(self, max_queries, using=DEFAULT_DB_ALIAS):
+        return assert_max_queries(max_queries, using)
+
+
+class PayrollTestDataMixin:
+    """
+    TestCase mixin: one organization with fiscal year 1403 and its first
+    period (Farvardin), plus create_employee() for members of it.
+    Subclasses that add their own data call super().setUpTestData() first.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.organization = Organization.objects.create(name="سازمان نمونه")
+        cls.fiscal_year = FiscalYear.objects.create(
+            organization=cls.organization,
+            title="1403",
+            start_date=datetime.date(2024, 3, 20),
+            end_date=datetime.date(2025, 3, 20),
+        )
+        cls.financial_period = FinancialPeriod.objects.create(
+            fiscal_year=cls.fiscal_year,
+            name="فروردین",
+            start_date=datetime.date(2024, 3, 20),
+            end_date=datetime.date(2024, 4, 19),
+        )
+
+    @classmethod
+    def create_employee(cls, number=1, member=True, **membership):
+        """
+        Employee number `number` (national code zero-padded to ten digits).
+        Unless `member` is False, also a member of cls.organization since
+        2024-01-01; `membership` overrides the EmployeeOrganization fields.
+        """
+        employee = Employee.objects.create(
+            user_account=CustomUser.objects.create_user(f'employee{number}'),
+            first_name="کارمند", last_name=str(number), national_code=f"{number:010d}",
+            hire_date=datetime.date(2024, 1, 1),
+        )
+        if member:
+            EmployeeOrganization.objects.create(**{
+                'employee': employee,
+                'organization': cls.organization,
+                'start_date': datetime.date(2024, 1, 1),
+                **membership,
+            })
+        return employee
@@ -0,0 +1,198 @@
+import datetime
+import random
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.http import Http404, QueryDict
+from django.test import RequestFactory, SimpleTestCase, TestCase
+
+from hr.models import EmploymentHistory, JobTitle, employment_history_overlaps
+from organizations.models import Organization
+from settings_app.models import FinancialPeriod, TaxLevel, financial_period_overlaps, tax_level_overlaps
+
+from .intervals import Range, StoredRange, find_overlaps
+from .pagination import AFTER_PARAM, BEFORE_PARAM, keyset_paginate
+from .testing import PayrollTestDataMixin
+
+
+class KeysetPaginationTests(PayrollTestDataMixin, TestCase):
+    """
+    پیمایش صفحه به صفحه در هر دو جهت باید همه ردیف‌ها را به همان ترتیب لیست برگرداند.
+    """
+
+    PAGE_SIZE = 5
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        rows = []
+        for number in (1, 2, 3):
+            employee = cls.create_employee(number, member=False)
+            for year, end_date in [(2020, datetime.date(2020, 12, 31)), (2021, None), (2022, None), (2023, None)]:
+                rows.append(EmploymentHistory(
+                    employee=employee, organization=cls.organization,
+                    start_date=datetime.date(year, 1, 1), end_date=end_date, is_current=False,
+                ))
+        EmploymentHistory.objects.bulk_create(rows)
+        other = Organization.objects.create(name="الف")
+        JobTitle.objects.bulk_create([
+            JobTitle(organization=organization, title=f"عنوان {number}")
+            for organization in (cls.organization, other)
+            for number in range(4)
+        ])
+
+    def page(self, queryset, **params):
+        return keyset_paginate(RequestFactory().get('/', params), queryset, page_size=self.PAGE_SIZE)
+
+    def walk_forward(self, queryset):
+        pks, params = [], {}
+        while True:
+            page = self.page(queryset, **params)
+            pks.extend(obj.pk for obj in page)
+            if not page.has_next:
+                return pks, page
+            params = {AFTER_PARAM: page.next_cursor}
+
+    def test_forward_walk_matches_the_list_ordering(self):
+        expected = list(EmploymentHistory.objects.order_by('employee', '-start_date', '-end_date', 'pk')
+                        .values_list('pk', flat=True))
+        pks, last_page = self.walk_forward(EmploymentHistory.objects.all())
+        self.assertEqual(pks, expected)
+        self.assertEqual(len(last_page), len(expected) % self.PAGE_SIZE)
+
+    def test_backward_walk_matches_the_list_ordering(self):
+        expected, last_page = self.walk_forward(EmploymentHistory.objects.all())
+        pks, page = [obj.pk for obj in last_page], last_page
+        while page.has_previous:
+            page = self.page(EmploymentHistory.objects.all(), **{BEFORE_PARAM: page.previous_cursor})
+            self.assertEqual(len(page), self.PAGE_SIZE)
+            pks[:0] = [obj.pk for obj in page]
+        self.assertEqual(pks, expected)
+
+    def test_ordering_through_a_relation(self):
+        expected = list(JobTitle.objects.order_by('organization__name', 'title', 'pk').values_list('pk', flat=True))
+        pks, _page = self.walk_forward(JobTitle.objects.all())
+        self.assertEqual(pks, expected)
+
+    def test_first_page_has_no_previous(self):
+        page = self.page(EmploymentHistory.objects.all())
+        self.assertTrue(page.has_next)
+        self.assertFalse(page.has_previous)
+        self.assertEqual(page.previous_querystring(), '')
+
+    def test_querystring_keeps_other_parameters(self):
+        page = self.page(EmploymentHistory.objects.all(), organization=str(self.organization.pk))
+        params = QueryDict(page.next_querystring())
+        self.assertEqual(params['organization'], str(self.organization.pk))
+        self.assertEqual(params[AFTER_PARAM], page.next_cursor)
+        self.assertNotIn(BEFORE_PARAM, params)
+
+    def test_invalid_cursor_is_not_found(self):
+        for cursor in ('not-a-cursor', 'WzFd'):
+            with self.assertRaises(Http404):
+                self.page(EmploymentHistory.objects.all(), **{AFTER_PARAM: cursor})
+
+
+class FindOverlapsTests(SimpleTestCase):
+    """
+    همه جفت بازه‌های همپوشان با کلید یکسان، برای بازه‌های بسته و نیم‌باز.
+    """
+
+    def test_shared_endpoint(self):
+        ranges = [Range('k', 1, 5, 'a', False), Range('k', 5, 9, 'b', False)]
+        self.assertEqual(find_overlaps(ranges, closed=True), [('a', 'b')])
+        self.assertEqual(find_overlaps(ranges, closed=False), [])
+
+    def test_open_ended_range_overlaps_every_later_range(self):
+        ranges = [
+            Range('k', 1, None, 'open', False),
+            Range('k', 3, 4, 'b', False),
+            Range('k', 10, 12, 'c', False),
+        ]
+        self.assertEqual(sorted(find_overlaps(ranges)), [('open', 'b'), ('open', 'c')])
+
+    def test_ranges_of_other_keys_do_not_conflict(self):
+        ranges = [Range('k1', 1, 5, 'a', False), Range('k2', 1, 5, 'b', False)]
+        self.assertEqual(find_overlaps(ranges), [])
+
+    def test_stored_pairs_are_skipped(self):
+        ranges = [Range('k', 1, 5, 'a', True), Range('k', 2, 6, 'b', True), Range('k', 4, 8, 'c', False)]
+        self.assertEqual(sorted(find_overlaps(ranges)), [('a', 'c'), ('b', 'c')])
+
+    def test_matches_pairwise_comparison(self):
+        rng = random.Random(22)
+        for closed in (True, False):
+            ranges = []
+            for number in range(200):
+                start = rng.randrange(100)
+                end = None if rng.random() < 0.05 else start + rng.randrange(1, 15)
+                ranges.append(Range(rng.randrange(5), start, end, number, False))
+            expected = set()
+            for first in ranges:
+                for second in ranges:
+                    if first.key != second.key or first.item >= second.item:
+                        continue
+                    first_end = float('inf') if first.end is None else first.end
+                    second_end = float('inf') if second.end is None else second.end
+                    if closed:
+                        overlap = first.start <= second_end and second.start <= first_end
+                    else:
+                        overlap = first.start < second_end and second.start < first_end
+                    if overlap:
+                        expected.add((first.item, second.item))
+            found = {tuple(sorted(pair)) for pair in find_overlaps(ranges, closed=closed)}
+            self.assertEqual(found, expected)
+
+
+class OverlapValidatorTests(PayrollTestDataMixin, TestCase):
+    """
+    همپوشانی یک دسته رکورد با یکدیگر و با ردیف‌های ذخیره‌شده با یک کوئری.
+    """
+
+    def period(self, start_date, end_date, name="دوره"):
+        return FinancialPeriod(fiscal_year=self.fiscal_year, name=name, start_date=start_date, end_date=end_date)
+
+    def test_conflict_with_a_stored_row(self):
+        period = self.period(datetime.date(2024, 4, 19), datetime.date(2024, 5, 20))
+        [(obj, other)] = financial_period_overlaps.conflicts([period])
+        self.assertIs(obj, period)
+        self.assertEqual(other, StoredRange(
+            self.financial_period.pk, self.financial_period.start_date, self.financial_period.end_date,
+        ))
+        with self.assertRaises(ValidationError):
+            period.full_clean()
+        self.period(datetime.date(2024, 4, 20), datetime.date(2024, 5, 20)).full_clean()
+
+    def test_saved_row_is_not_compared_with_itself(self):
+        self.financial_period.end_date = datetime.date(2024, 4, 25)
+        financial_period_overlaps.validate([self.financial_period])
+
+    def test_batch_is_checked_with_one_query(self):
+        batch = [
+            self.period(datetime.date(2024, 4, 20), datetime.date(2024, 5, 20), "اردیبهشت"),
+            self.period(datetime.date(2024, 5, 15), datetime.date(2024, 6, 20), "خرداد"),
+            self.period(datetime.date(2024, 4, 1), datetime.date(2024, 4, 10), "تکراری"),
+        ]
+        with self.assertNumQueries(1), self.assertRaises(ValidationError) as caught:
+            financial_period_overlaps.validate(batch)
+        self.assertEqual(len(caught.exception.error_list), 2)
+
+    def test_adjacent_tax_levels_do_not_overlap(self):
+        TaxLevel.objects.create(
+            fiscal_year=self.fiscal_year, level_title="1",
+            from_amount=Decimal('0'), to_amount=Decimal('100'), tax_percent=Decimal('0'),
+        )
+        adjacent = TaxLevel(
+            fiscal_year=self.fiscal_year, level_title="2",
+            from_amount=Decimal('100'), to_amount=Decimal('200'), tax_percent=Decimal('10'),
+        )
+        tax_level_overlaps.validate([adjacent])
+        adjacent.from_amount = Decimal('99')
+        with self.assertRaises(ValidationError):
+            tax_level_overlaps.validate([adjacent])
+
+    def test_records_with_a_missing_key_are_skipped(self):
+        employee = self.create_employee(member=False)
+        history = EmploymentHistory(employee=employee, start_date=datetime.date(2024, 1, 1))
+        with self.assertNumQueries(0):
+            self.assertEqual(employment_history_overlaps.conflicts([history]), [])
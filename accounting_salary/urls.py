@@ -62,6 +62,14 @@ urlpatterns = [
     # اطمینان حاصل کنید که app_name = 'salaries' در salaries/urls.py تنظیم شده است.
     path('salaries/', include('salaries.urls')),
 
+    # شامل کردن مسیرهای URL اپلیکیشن reports (گزارش‌ها و خروجی‌ها)
+    # اطمینان حاصل کنید که app_name = 'reports' در reports/urls.py تنظیم شده است.
+    path('reports/', include('reports.urls')),
+
+    # شامل کردن مسیرهای URL اپلیکیشن jobs (صف کارهای پس‌زمینه و وضعیت آن‌ها)
+    # اطمینان حاصل کنید که app_name = 'jobs' در jobs/urls.py تنظیم شده است.
+    path('jobs/', include('jobs.urls')),
+
     # اضافه کردن مسیرهای فایل‌های مدیا در حالت توسعه (DEBUG=True)
     # این خطوط فقط در محیط توسعه برای سرو کردن فایل‌های آپلود شده (مانند عکس پرسنلی) لازم هستند.
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
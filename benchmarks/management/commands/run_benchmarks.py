@@ -0,0 +1,64 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks.suite import BENCHMARKS, DEFAULT_THRESHOLD, compare, load_report, run, save_report
+
+
+class Command(BaseCommand):
+    help = "سنجش زمان، تعداد کوئری و حافظه نماهای پرتکرار و محاسبه حقوق و مقایسه با خط مبنا (بدون تغییر پایگاه داده)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'names', nargs='*',
+            help="Benchmarks to run (default: all). Use --list to see them.",
+        )
+        parser.add_argument('--list', action='store_true', help="List the registered benchmarks and exit.")
+        parser.add_argument('--repeat', type=int, default=5, help="Timed runs per benchmark; the median is reported.")
+        parser.add_argument(
+            '--organization', type=int, default=None,
+            help="Organization id to run against (default: the one with the most members).",
+        )
+        parser.add_argument('--output', help="Write the JSON report to this file.")
+        parser.add_argument('--baseline', help="Compare against this JSON report and fail on regressions.")
+        parser.add_argument(
+            '--threshold', type=float, default=DEFAULT_THRESHOLD,
+            help="Allowed slowdown against the baseline as a fraction (default: 0.25).",
+        )
+
+    def handle(self, *args, **options):
+        if options['list']:
+            for name in BENCHMARKS:
+                self.stdout.write(name)
+            return
+        unknown = [name for name in options['names'] if name not in BENCHMARKS]
+        if unknown:
+            raise CommandError(f"Unknown benchmarks: {', '.join(unknown)}")
+
+        try:
+            report = run(
+                names=options['names'],
+                repeat=options['repeat'],
+                organization_id=options['organization'],
+                progress=self.stdout.write,
+            )
+        except ValidationError as exc:
+            raise CommandError(' '.join(exc.messages))
+
+        width = max(len(name) for name in report['results'])
+        self.stdout.write(f"{'benchmark':{width}}  median ms    min ms  queries  peak KB")
+        for name, result in report['results'].items():
+            self.stdout.write(
+                f"{name:{width}}  {result['wall_ms']:9.2f}  {result['wall_ms_min']:8.2f}  "
+                f"{result['queries']:7}  {result['peak_kb']:7.0f}"
+            )
+        if options['output']:
+            save_report(report, options['output'])
+            self.stdout.write(f"Report written to {options['output']}")
+
+        if options['baseline']:
+            regressions = compare(report, load_report(options['baseline']), options['threshold'])
+            for name, metric, previous, current in regressions:
+                self.stderr.write(f"REGRESSION {name}: {metric} {previous} -> {current}")
+            if regressions:
+                raise CommandError(f"{len(regressions)} regression(s) against {options['baseline']}")
+            self.stdout.write(self.style.SUCCESS("No regressions against the baseline"))
@@ -0,0 +1,289 @@
+"""
+سنجش کارایی نماهای پرتکرار، بررسی مجوزها و محاسبه حقوق روی داده آزمایشی.
+
+هر سناریو (با دکوراتور benchmark ثبت می‌شود) چند بار اجرا و میانه زمان آن
+گزارش می‌شود؛ یک اجرای جداگانه تعداد کوئری‌ها و بیشینه حافظه (tracemalloc) را
+اندازه می‌گیرد تا سربار tracemalloc در زمان‌ها نیاید. کل اجرا در یک تراکنش
+انجام و در پایان rollback می‌شود (کاربر و نقش سنجش، اجرای حقوق)، پس پایگاه
+داده دست نخورده می‌ماند.
+
+نتیجه به صورت JSON ذخیره و با یک خط مبنای ذخیره شده مقایسه می‌شود: سناریویی
+که کند‌تر از آستانه مجاز شود یا کوئری بیشتری بزند پسرفت به حساب می‌آید.
+"""
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from collections import namedtuple
+from dataclasses import dataclass
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils.translation import gettext as _
+
+from employees.models import Employee
+from organizations.models import Organization
+from settings_app.models import FinancialPeriod
+from users.models import OrganizationRole, UserOrganizationRole
+from users.permissions import permission_cache_key
+
+
+Benchmark = namedtuple('Benchmark', 'name func')
+
+BENCHMARKS = {}
+
+ROLE_APPS = ['organizations', 'employees', 'hr', 'loans', 'salaries', 'settings_app', 'reports']
+PERMISSION_CHECKS = [
+    'employees.view_employee',
+    'hr.view_monthlyworkrecord',
+    'hr.change_employmenthistory',
+    'loans.view_employeeloan',
+    'salaries.view_employeesalaryitem',
+    'salaries.add_payrollrun',
+]
+DEFAULT_THRESHOLD = 0.25  # allowed slowdown against the baseline (25%)
+
+
+def benchmark(name):
+    """
+    Registers func(context) as the benchmark `name`. The function performs one
+    iteration; the runner repeats and measures it.
+    """
+    def register(func):
+        BENCHMARKS[name] = Benchmark(name, func)
+        return func
+    return register
+
+
+@dataclass
+class BenchmarkContext:
+    organization: Organization
+    financial_period: FinancialPeriod
+    employee: Employee
+    user: object
+    client: Client
+
+
+def _pick_scope(organization_id=None):
+    """
+    The organization with the most members (or `organization_id`), its period
+    with the most salary items and one of its employees.
+    """
+    organizations = Organization.objects.all()
+    if organization_id is not None:
+        organizations = organizations.filter(pk=organization_id)
+    organization = organizations.annotate(
+        members=Count('employee_organizations'),
+    ).order_by('-members', 'pk').first()
+    financial_period = FinancialPeriod.objects.filter(fiscal_year__organization=organization).annotate(
+        items=Count('employee_salary_items'),
+    ).order_by('-items', 'pk').first() if organization else None
+    employee = Employee.objects.filter(
+        employee_organizations__organization=organization,
+    ).order_by('pk').first() if organization else None
+    if employee is None or financial_period is None:
+        raise ValidationError(_("داده‌ای برای سنجش کارایی وجود ندارد؛ ابتدا generate_dataset را اجرا کنید."))
+    return organization, financial_period, employee
+
+
+def _benchmark_user(organization):
+    """
+    A non-staff user holding every permission of the payroll apps, both
+    globally (the list views check has_perm first) and through a role in
+    `organization`, so the views take their normal permission path.
+    """
+    permissions = list(Permission.objects.filter(content_type__app_label__in=ROLE_APPS))
+    user = get_user_model().objects.create_user(username=f"benchmark-{time.monotonic_ns()}")
+    user.user_permissions.set(permissions)
+    role = OrganizationRole.objects.create(organization=organization, name=f"benchmark-{user.pk}")
+    role.permissions.set(permissions)
+    UserOrganizationRole.objects.create(user=user, organization=organization, role=role)
+    return user
+
+
+# --- Scenarios ----------------------------------------------------------------
+
+def _get(context, url):
+    response = context.client.get(url)
+    if response.status_code != 200:
+        raise ValidationError(_("درخواست %(url)s با وضعیت %(status)s پاسخ داد.") % {
+            'url': url, 'status': response.status_code,
+        })
+    return response
+
+
+@benchmark('view.employee_list')
+def employee_list(context):
+    _get(context, reverse('employees:employee_list') + f"?organization_pk={context.organization.pk}")
+
+
+@benchmark('view.monthlyworkrecord_list_by_org')
+def monthly_work_record_list(context):
+    _get(context, reverse('hr:monthlyworkrecord_list_by_org', args=[context.organization.pk]))
+
+
+@benchmark('view.employmenthistory_list_by_org')
+def employment_history_list(context):
+    _get(context, reverse('hr:employmenthistory_list_by_org', args=[context.organization.pk]))
+
+
+@benchmark('view.salaryitemtype_list')
+def salary_item_type_list(context):
+    _get(context, reverse('salaries:salaryitemtype_list', args=[context.organization.pk, context.financial_period.pk]))
+
+
+@benchmark('view.employeeloan_list_by_org')
+def employee_loan_list(context):
+    _get(context, reverse('loans:employeeloan_list_by_org', args=[context.organization.pk]))
+
+
+@benchmark('view.payroll_summary')
+def payroll_summary(context):
+    _get(context, reverse('reports:payroll_summary', args=[context.organization.pk, context.financial_period.pk]))
+
+
+@benchmark('permissions.cold')
+def permissions_cold(context):
+    # A fresh user object and no cached map for this user: the map is loaded from
+    # the database. Only this user's key is dropped, not the rest of the cache.
+    cache.delete(permission_cache_key(context.user.pk))
+    user = get_user_model().objects.get(pk=context.user.pk)
+    for perm_name in PERMISSION_CHECKS:
+        user.has_organization_permission(context.organization, perm_name)
+
+
+@benchmark('permissions.cached')
+def permissions_cached(context):
+    # A fresh user object per request, map served from the shared cache.
+    for _n in range(100):
+        user = get_user_model()(pk=context.user.pk, is_active=True)
+        for perm_name in PERMISSION_CHECKS:
+            user.has_organization_permission(context.organization, perm_name)
+
+
+@benchmark('payroll.compute')
+def payroll_compute(context):
+    from salaries.payroll import compute_period_payroll
+
+    compute_period_payroll(context.organization, context.financial_period)
+
+
+@benchmark('payroll.run')
+def payroll_run(context):
+    from salaries.payroll import run_payroll
+
+    run_payroll(context.organization, context.financial_period)
+
+
+@benchmark('payroll.recompute_employee')
+def payroll_recompute_employee(context):
+    from salaries.models import PayrollRun
+    from salaries.payroll import mark_dirty, recompute_dirty, run_payroll
+
+    payroll_run = PayrollRun.objects.filter(
+        organization=context.organization, financial_period=context.financial_period,
+    ).first() or run_payroll(context.organization, context.financial_period)
+    mark_dirty(employee_id=context.employee.pk, financial_period_id=context.financial_period.pk)
+    recompute_dirty(payroll_run)
+
+
+# --- Runner -------------------------------------------------------------------
+
+def measure(func, context, repeat):
+    """
+    {wall_ms (median), wall_ms_min, queries, peak_kb} for `repeat` timed runs
+    plus one traced run. The first call warms up caches and is not counted.
+    """
+    func(context)
+    timings = []
+    for _n in range(repeat):
+        started = time.perf_counter()
+        func(context)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            func(context)
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        'wall_ms': round(statistics.median(timings), 3),
+        'wall_ms_min': round(min(timings), 3),
+        'queries': len(queries),
+        'peak_kb': round(peak / 1024, 1),
+    }
+
+
+def run(names=None, repeat=5, organization_id=None, progress=None):
+    """
+    Runs the selected benchmarks (all when `names` is empty) and returns the
+    JSON-serializable report. Everything is rolled back afterwards.
+    """
+    report = progress or (lambda message: None)
+    selected = [BENCHMARKS[name] for name in names] if names else list(BENCHMARKS.values())
+    results = {}
+    with transaction.atomic():
+        organization, financial_period, employee = _pick_scope(organization_id)
+        user = _benchmark_user(organization)
+        client = Client()
+        client.force_login(user)
+        context = BenchmarkContext(organization, financial_period, employee, user, client)
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            for item in selected:
+                results[item.name] = measure(item.func, context, repeat)
+                report(f"  {item.name}: {results[item.name]['wall_ms']:.1f} ms, "
+                       f"{results[item.name]['queries']} queries")
+        members = organization.employee_organizations.count()
+        transaction.set_rollback(True)
+    return {
+        'meta': {
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'repeat': repeat,
+            'organization_members': members,
+        },
+        'results': results,
+    }
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Regressions of `current` against `baseline` (two reports of run()):
+    [(name, metric, baseline value, current value)]. A benchmark regresses when
+    its median time grows by more than `threshold` or it runs more queries.
+    """
+    regressions = []
+    for name, result in current['results'].items():
+        previous = baseline['results'].get(name)
+        if previous is None:
+            continue
+        if result['wall_ms'] > previous['wall_ms'] * (1 + threshold):
+            regressions.append((name, 'wall_ms', previous['wall_ms'], result['wall_ms']))
+        if result['queries'] > previous['queries']:
+            regressions.append((name, 'queries', previous['queries'], result['queries']))
+    return regressions
+
+
+def load_report(path):
+    with open(path, encoding='utf-8') as handle:
+        return json.load(handle)
+
+
+def save_report(report, path):
+    with open(path, 'w', encoding='utf-8') as handle:
+        json.dump(report, handle, indent=2, ensure_ascii=False)
+        handle.write('\n')
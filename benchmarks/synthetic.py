@@ -0,0 +1,324 @@
+"""
+تولید داده آزمایشی در مقیاس بزرگ برای آزمون بار و بنچمارک.
+
+سازمان‌ها، سال‌های مالی با سطوح مالیاتی، دوره‌های ماهانه (ماه‌های شمسی)،
+دپارتمان‌ها و عناوین شغلی، انواع آیتم حقوقی هر دوره و سپس کارکنان در
+دسته‌های batch_size تایی ساخته می‌شوند؛ برای هر دسته کاربر، کارمند، عضویت در
+سازمان، حساب بانکی، سوابق شغلی، کارکرد ماهیانه، آیتم‌های حقوقی هر دوره و وام
+(به همراه جدول اقساط) با bulk_create در یک تراکنش نوشته می‌شوند. حافظه مصرفی به
+اندازه یک دسته است، نه کل داده.
+
+خروجی فقط به seed و پارامترها (و بیشترین کد ملی موجود) وابسته است: دو اجرا با
+seed یکسان روی پایگاه داده یکسان داده یکسان می‌سازند.
+"""
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Max
+from django.utils.translation import gettext as _
+
+from employees.models import BankAccount, Employee
+from hr.models import Department, EmploymentHistory, JobTitle, MonthlyWorkRecord, employment_history_overlaps
+from loans.models import EmployeeLoan, LoanInstallment
+from loans.schedule import add_jalali_months, build_schedule
+from organizations.models import EmployeeOrganization, Organization, membership_overlaps
+from reports.summary import rebuild_period
+from salaries.models import EmployeeSalaryItem, SalaryItemType
+from settings_app.models import (
+    FinancialPeriod, FiscalYear, TaxLevel, financial_period_overlaps, fiscal_year_overlaps, tax_level_overlaps,
+)
+
+
+FIRST_NAMES = [
+    'علی', 'محمد', 'حسین', 'رضا', 'مهدی', 'امیر', 'سعید', 'حمید', 'مجید', 'نیما',
+    'فاطمه', 'زهرا', 'مریم', 'سارا', 'نرگس', 'لیلا', 'الهام', 'مینا', 'شیوا', 'هانیه',
+]
+LAST_NAMES = [
+    'احمدی', 'محمدی', 'حسینی', 'رضایی', 'کریمی', 'موسوی', 'جعفری', 'صادقی', 'رحیمی', 'نوری',
+    'کاظمی', 'قاسمی', 'عباسی', 'اکبری', 'حیدری', 'یوسفی', 'مرادی', 'سلطانی', 'شریفی', 'طاهری',
+]
+DEPARTMENTS = ['مالی', 'منابع انسانی', 'فروش', 'بازاریابی', 'فناوری اطلاعات', 'تولید', 'تدارکات', 'حقوقی']
+JOB_TITLES = ['کارشناس', 'کارشناس ارشد', 'سرپرست', 'مدیر', 'کارمند اداری', 'تکنسین']
+BANKS = ['ملی', 'ملت', 'صادرات', 'تجارت', 'سپه', 'پاسارگاد']
+
+# (name, item_type, is_base_salary, is_deduction, amount range in rials, share of employees)
+ITEM_TYPES = [
+    ('حقوق پایه', 'monthly', True, False, (80_000_000, 400_000_000), 1.0),
+    ('حق مسکن', 'monthly', False, False, (9_000_000, 9_000_000), 1.0),
+    ('بن کارگری', 'monthly', False, False, (14_000_000, 14_000_000), 1.0),
+    ('حق اولاد', 'monthly', False, False, (7_000_000, 21_000_000), 0.4),
+    ('حق ماموریت', 'daily', False, False, (500_000, 2_000_000), 0.2),
+    ('اضافه کاری', 'other', False, False, (2_000_000, 30_000_000), 0.5),
+    ('پاداش', 'other', False, False, (5_000_000, 50_000_000), 0.1),
+    ('حق سرپرستی', 'monthly', False, False, (10_000_000, 40_000_000), 0.15),
+    ('بیمه سهم کارمند', 'monthly', False, True, (5_000_000, 30_000_000), 1.0),
+    ('بیمه تکمیلی', 'monthly', False, True, (1_000_000, 3_000_000), 0.6),
+    ('کسر کار', 'other', False, True, (500_000, 5_000_000), 0.1),
+    ('مساعده', 'other', False, True, (5_000_000, 20_000_000), 0.05),
+]
+
+# Annual brackets (from, to, percent) in rials, per fiscal year.
+TAX_LEVELS = [
+    (0, 1_440_000_000, 0),
+    (1_440_000_000, 1_980_000_000, 10),
+    (1_980_000_000, 3_240_000_000, 15),
+    (3_240_000_000, 4_800_000_000, 20),
+    (4_800_000_000, 999_999_999_999, 30),
+]
+
+FISCAL_YEAR_START = date(2024, 3, 20)  # 1 Farvardin 1403
+
+
+def _amount(rng, low, high):
+    # Whole thousands of rials.
+    return Decimal(rng.randint(low // 1000, high // 1000) * 1000)
+
+
+class DatasetGenerator:
+    """
+    تولید کننده داده آزمایشی.
+
+    organizations: تعداد سازمان‌ها؛ employees: تعداد کل کارکنان (بین سازمان‌ها پخش می‌شوند)
+    periods: تعداد دوره‌های ماهانه از ابتدای سال مالی ۱۴۰۳ (حداکثر ۱۲)
+    loan_ratio: سهم کارکنان دارای وام؛ progress(message): گزارش پیشرفت
+    """
+
+    def __init__(self, organizations=2, employees=1000, periods=3, loan_ratio=0.1, seed=1,
+                 batch_size=2000, summary=True, progress=None):
+        if organizations < 1 or employees < 1:
+            raise ValidationError(_("تعداد سازمان‌ها و کارکنان باید مثبت باشد."))
+        if not 1 <= periods <= 12:
+            raise ValidationError(_("تعداد دوره‌ها باید بین ۱ و ۱۲ باشد."))
+        self.organization_count = organizations
+        self.employee_count = employees
+        self.period_count = periods
+        self.loan_ratio = loan_ratio
+        self.seed = seed
+        self.batch_size = batch_size
+        self.summary = summary
+        self.progress = progress or (lambda message: None)
+        self.rng = random.Random(seed)
+        self.counts = {}
+        self.organizations = []
+        self.periods = {}
+        self.departments = {}
+        self.job_titles = {}
+        self.item_types = {}
+
+    def _bulk(self, model, objects, overlaps=None):
+        if overlaps is not None:
+            # bulk_create skips clean(): check the whole batch in one pass instead.
+            overlaps.validate(objects)
+        created = model.objects.bulk_create(objects, batch_size=self.batch_size)
+        self.counts[model.__name__] = self.counts.get(model.__name__, 0) + len(created)
+        return created
+
+    # --- Reference data ---------------------------------------------------
+
+    def create_organizations(self):
+        prefix = f"synthetic-{self.seed}"
+        if Organization.objects.filter(name__startswith=f"{prefix}-").exists():
+            raise ValidationError(_("داده آزمایشی با این seed قبلاً ساخته شده است."))
+        self.organizations = self._bulk(Organization, [
+            Organization(name=f"{prefix}-{n + 1}", code=f"S{self.seed}-{n + 1}")
+            for n in range(self.organization_count)
+        ])
+        fiscal_years = self._bulk(FiscalYear, [
+            FiscalYear(
+                organization=organization,
+                title='1403',
+                start_date=FISCAL_YEAR_START,
+                end_date=add_jalali_months(FISCAL_YEAR_START, 12) - timedelta(days=1),
+            )
+            for organization in self.organizations
+        ], overlaps=fiscal_year_overlaps)
+        self._bulk(TaxLevel, [
+            TaxLevel(
+                fiscal_year=fiscal_year,
+                level_title=f"{index + 1}",
+                from_amount=Decimal(low),
+                to_amount=Decimal(high),
+                tax_percent=Decimal(percent),
+            )
+            for fiscal_year in fiscal_years
+            for index, (low, high, percent) in enumerate(TAX_LEVELS)
+        ], overlaps=tax_level_overlaps)
+        for organization, fiscal_year in zip(self.organizations, fiscal_years):
+            self.periods[organization.pk] = self._bulk(FinancialPeriod, [
+                FinancialPeriod(
+                    fiscal_year=fiscal_year,
+                    name=f"1403-{month + 1:02d}",
+                    start_date=add_jalali_months(FISCAL_YEAR_START, month),
+                    end_date=add_jalali_months(FISCAL_YEAR_START, month + 1) - timedelta(days=1),
+                )
+                for month in range(self.period_count)
+            ], overlaps=financial_period_overlaps)
+            self.departments[organization.pk] = self._bulk(Department, [
+                Department(organization=organization, name=name) for name in DEPARTMENTS
+            ])
+            self.job_titles[organization.pk] = self._bulk(JobTitle, [
+                JobTitle(organization=organization, title=title) for title in JOB_TITLES
+            ])
+        for organization in self.organizations:
+            for period in self.periods[organization.pk]:
+                created = self._bulk(SalaryItemType, [
+                    SalaryItemType(
+                        organization=organization,
+                        financial_period=period,
+                        name=name,
+                        item_type=item_type,
+                        is_base_salary=is_base,
+                        is_deduction=is_deduction,
+                    )
+                    for name, item_type, is_base, is_deduction, _range, _share in ITEM_TYPES
+                ])
+                self.item_types[period.pk] = list(zip(created, ITEM_TYPES))
+
+    # --- Employees --------------------------------------------------------
+
+    def _first_national_code(self):
+        highest = Employee.objects.filter(national_code__regex=r'^[0-9]{10}$').aggregate(
+            highest=Max('national_code'),
+        )['highest']
+        return int(highest) + 1 if highest else 1
+
+    def create_employee_batch(self, numbers, first_code):
+        rng = self.rng
+        User = get_user_model()
+        users = self._bulk(User, [
+            User(username=f"synthetic-{self.seed}-{n}", password=UNUSABLE_PASSWORD_PREFIX)
+            for n in numbers
+        ])
+        staff = self._bulk(Employee, [
+            Employee(
+                user_account=user,
+                first_name=rng.choice(FIRST_NAMES),
+                last_name=rng.choice(LAST_NAMES),
+                national_code=f"{first_code + n:010d}",
+                personnel_code=f"S{self.seed}-{n + 1:06d}",
+                hire_date=FISCAL_YEAR_START - timedelta(days=rng.randint(30, 20 * 365)),
+            )
+            for n, user in zip(numbers, users)
+        ])
+
+        memberships, accounts, history, records, items, loans = [], [], [], [], [], []
+        for employee in staff:
+            organization = self.organizations[rng.randrange(len(self.organizations))]
+            periods = self.periods[organization.pk]
+            # About one in twenty leaves during the generated periods.
+            end_date = None
+            if rng.random() < 0.05:
+                end_date = rng.choice(periods).end_date
+            memberships.append(EmployeeOrganization(
+                employee=employee,
+                organization=organization,
+                start_date=employee.hire_date,
+                end_date=end_date,
+                is_active=end_date is None,
+            ))
+            code = int(employee.national_code)
+            accounts.append(BankAccount(
+                employee=employee,
+                bank_name=rng.choice(BANKS),
+                account_number=f"{code:013d}",
+                sheba_number=f"IR{code:024d}",
+            ))
+
+            # One to three consecutive positions; the last one is current.
+            starts = sorted({employee.hire_date} | {
+                employee.hire_date + timedelta(days=rng.randint(1, (FISCAL_YEAR_START - employee.hire_date).days))
+                for _n in range(rng.randint(0, 2))
+            })
+            for index, start in enumerate(starts):
+                last = index == len(starts) - 1
+                history.append(EmploymentHistory(
+                    employee=employee,
+                    organization=organization,
+                    department=rng.choice(self.departments[organization.pk]),
+                    job_title=rng.choice(self.job_titles[organization.pk]),
+                    start_date=start,
+                    end_date=end_date if last else starts[index + 1] - timedelta(days=1),
+                    is_current=last and end_date is None,
+                ))
+
+            for period in periods:
+                if end_date is not None and period.start_date > end_date:
+                    break
+                days = (period.end_date - period.start_date).days + 1
+                records.append(MonthlyWorkRecord(
+                    employee=employee,
+                    organization=organization,
+                    financial_period=period,
+                    working_days_in_month=Decimal(days - rng.choice([0, 0, 0, 1, 2])),
+                    standard_hours_in_month=Decimal('176'),
+                    monthly_working_hours=Decimal(rng.randint(160, 200)),
+                    overtime_hours=Decimal(rng.choice([0, 0, 4, 8, 16, 24])),
+                    used_leave_days=Decimal(rng.choice([0, 0, 1, 2, 3])),
+                ))
+                for item_type, (_name, _kind, _base, _deduction, (low, high), share) in self.item_types[period.pk]:
+                    if share >= 1 or rng.random() < share:
+                        items.append(EmployeeSalaryItem(
+                            employee=employee,
+                            financial_period=period,
+                            salary_item_type=item_type,
+                            amount=_amount(rng, low, high),
+                        ))
+
+            if rng.random() < self.loan_ratio:
+                months = rng.choice([6, 12, 18, 24, 36])
+                installment = _amount(rng, 2_000_000, 20_000_000)
+                first_due = periods[0].end_date
+                loans.append(EmployeeLoan(
+                    employee=employee,
+                    organization=organization,
+                    loan_amount=installment * months,
+                    first_installment_date=first_due,
+                    last_installment_date=add_jalali_months(first_due, months - 1),
+                    monthly_installment_amount=installment,
+                    outstanding_balance=installment * months,
+                ))
+
+        self._bulk(EmployeeOrganization, memberships, overlaps=membership_overlaps)
+        self._bulk(BankAccount, accounts)
+        self._bulk(EmploymentHistory, history, overlaps=employment_history_overlaps)
+        self._bulk(MonthlyWorkRecord, records)
+        self._bulk(EmployeeSalaryItem, items)
+        # bulk_create sends no post_save, so the schedules are built here.
+        loans = self._bulk(EmployeeLoan, loans)
+        self._bulk(LoanInstallment, [
+            LoanInstallment(
+                loan=loan,
+                organization_id=loan.organization_id,
+                installment_number=number,
+                due_date=due_date,
+                amount=amount,
+            )
+            for loan in loans
+            for number, due_date, amount in build_schedule(loan)
+        ])
+
+    def run(self):
+        """
+        Generates the dataset and returns {model name: rows created}.
+        """
+        started = time.perf_counter()
+        with transaction.atomic():
+            self.create_organizations()
+        first_code = self._first_national_code()
+        for start in range(0, self.employee_count, self.batch_size):
+            numbers = range(start, min(start + self.batch_size, self.employee_count))
+            with transaction.atomic():
+                self.create_employee_batch(numbers, first_code)
+            self.progress(f"  {numbers.stop}/{self.employee_count} employees ({time.perf_counter() - started:.1f}s)")
+        if self.summary:
+            # Bulk writes bypass the summary signals.
+            for organization in self.organizations:
+                for period in self.periods[organization.pk]:
+                    rebuild_period(organization, period)
+        return self.counts
@@ -64,6 +64,10 @@ class Employee(models.Model):
         verbose_name = _("کارمند")
         verbose_name_plural = _("کارکنان")
         ordering = ['last_name', 'first_name'] # مرتب سازی پیش فرض
+        indexes = [
+            # Backs the default ordering (lists, keyset pagination) without a sort.
+            models.Index(fields=['last_name', 'first_name'], name='employee_name_idx'),
+        ]
 
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
@@ -13,20 +13,11 @@ from .models import Employee, BankAccount
 # اگر ویوهای خاصی در employees به مدل‌های سازمان نیاز دارند، آنها را از organizations.models وارد کنید
 from organizations.models import Organization, EmployeeOrganization
 
-# Import CustomUser model to use has_organization_permission method
-from users.models import CustomUser # Assuming CustomUser is in users.models
+# Organization-level permission checks (resolved once per request)
+from users.permissions import has_org_permission, get_permission_resolver
+from accounting_salary.pagination import keyset_paginate
 
 
-# Helper function to check organization-specific permission
-def has_org_permission(user, organization, perm_name):
-    """
-    Checks if the user has the specified permission in the given organization.
-    Assumes user is an instance of CustomUser with the has_organization_permission method.
-    """
-    if not isinstance(user, CustomUser):
-        # Handle cases where user is not CustomUser (e.g., AnonymousUser)
-        return False
-    return user.has_organization_permission(organization, perm_name)
 
 # Predicate for user_passes_test decorator
 def user_can_view_employees_in_org(user):
@@ -83,13 +74,17 @@ def employee_list(request):
              return redirect('home') # Redirect to home or a permission denied page
 
         employees = Employee.objects.filter(employee_organizations__organization=organization).distinct()
-        context = {'employees': employees, 'organization': organization}
+        # The template lists every membership of each employee.
+        employees = employees.prefetch_related('employee_organizations__organization')
+        page = keyset_paginate(request, employees)
+        context = {'employees': page.object_list, 'keyset_page': page, 'organization': organization}
     else:
         # General list - requires broader permission or shows only employees in user's orgs
         # For simplicity, let's show all employees for staff/superuser, or none otherwise (needs refinement)
         if request.user.is_staff or request.user.is_superuser:
-             employees = Employee.objects.all()
-             context = {'employees': employees}
+             employees = Employee.objects.prefetch_related('employee_organizations__organization')
+             page = keyset_paginate(request, employees)
+             context = {'employees': page.object_list, 'keyset_page': page}
         else:
              # Show only employees in organizations the user has permission to view
              # This requires more complex filtering based on user's roles/permissions across organizations
@@ -176,11 +171,8 @@ def employee_detail(request, pk):
     employee = get_object_or_404(Employee, pk=pk)
 
     # Check if the user has permission to view this employee in any of their organizations
-    user_can_view = False
-    for emp_org in employee.employee_organizations.all():
-         if has_org_permission(request.user, emp_org.organization, 'employees.view_employee'):
-             user_can_view = True
-             break # Found at least one organization where the user can view employees
+    employee_org_ids = employee.employee_organizations.values_list('organization_id', flat=True)
+    user_can_view = get_permission_resolver(request.user).has_in_any(employee_org_ids, 'employees.view_employee')
 
     if not user_can_view and not request.user.is_superuser and not request.user.is_staff:
          messages.error(request, _("شما مجوز مشاهده جزئیات این کارمند را ندارید."))
@@ -204,11 +196,8 @@ def employee_update(request, pk):
     from .forms import EmployeeForm # import داخلی
 
     # Check if the user has permission to change this employee in any of their organizations
-    user_can_change = False
-    for emp_org in employee.employee_organizations.all():
-         if has_org_permission(request.user, emp_org.organization, 'employees.change_employee'):
-             user_can_change = True
-             break # Found at least one organization where the user can change employees
+    employee_org_ids = employee.employee_organizations.values_list('organization_id', flat=True)
+    user_can_change = get_permission_resolver(request.user).has_in_any(employee_org_ids, 'employees.change_employee')
 
     if not user_can_change and not request.user.is_superuser and not request.user.is_staff:
          messages.error(request, _("شما مجوز ویرایش این کارمند را ندارید."))
@@ -241,11 +230,8 @@ def bank_account_create(request, employee_id):
     from .forms import BankAccountForm # import داخلی
 
     # Check if the user has permission to add bank accounts for this employee
-    user_can_add_bank_account = False
-    for emp_org in employee.employee_organizations.all():
-         if has_org_permission(request.user, emp_org.organization, 'employees.add_bankaccount'):
-             user_can_add_bank_account = True
-             break # Found at least one organization where the user can add bank accounts
+    employee_org_ids = employee.employee_organizations.values_list('organization_id', flat=True)
+    user_can_add_bank_account = get_permission_resolver(request.user).has_in_any(employee_org_ids, 'employees.add_bankaccount')
 
     if not user_can_add_bank_account and not request.user.is_superuser and not request.user.is_staff:
          messages.error(request, _("شما مجوز افزودن حساب بانکی برای این کارمند را ندارید."))
@@ -202,3 +202,27 @@ class MonthlyWorkRecordForm(forms.ModelForm):
         # if organization:
         #      self.fields['employee'].queryset = Employee.objects.filter(employee_organizations__organization=organization).distinct()
 
+
+
+class MonthlyWorkRecordImportForm(forms.Form):
+    """
+    فرم بارگذاری فایل CSV/XLSX کارکرد ماهیانه برای ورود گروهی.
+    سازمان و دوره مالی برای ردیف‌هایی استفاده می‌شوند که ستون مربوط را ندارند.
+    """
+    organization = forms.ModelChoiceField(
+        queryset=Organization.objects.all(),
+        required=False,
+        label=_('سازمان'),
+        widget=forms.Select(attrs={'class': 'form-control'}),
+    )
+    financial_period = forms.ModelChoiceField(
+        queryset=FinancialPeriod.objects.select_related('fiscal_year__organization'),
+        required=False,
+        label=_('دوره مالی'),
+        widget=forms.Select(attrs={'class': 'form-control'}),
+    )
+    file = forms.FileField(
+        label=_('فایل کارکرد'),
+        help_text=_('فایل CSV یا XLSX با سطر عنوان؛ ستون national_code یا personnel_code الزامی است.'),
+        widget=forms.ClearableFileInput(attrs={'class': 'form-control', 'accept': '.csv,.xlsx'}),
+    )
@@ -0,0 +1,105 @@
+"""
+نگهداری مجموعه‌ای (set-based) پرچم is_current سوابق شغلی.
+
+سابقه فعلی هر کارمند در هر سازمان، سابقه‌ای است که در تاریخ مرجع (پیش‌فرض
+امروز) برقرار است: شروع آن گذشته و پایان آن خالی یا نرسیده است. اگر چند سابقه
+چنین باشند (داده‌های قدیمی همپوشان) جدیدترین شروع انتخاب می‌شود. یکتایی این
+سابقه را قید جزئی unique_current_employment_per_employee_org در پایگاه داده
+تضمین می‌کند.
+
+save() هر سابقه فقط سوابق دیگر همان کارمند در همان سازمان را به‌روز می‌کند؛
+ورود گروهی سوابق (مثلاً انتقال داده‌های قدیمی) به جای آن bulk_load() را صدا
+می‌زند: ردیف‌ها با یک پیمایش از نظر همپوشانی بررسی، با bulk_create و بدون
+قلاب‌های save() درج و سپس پرچم‌ها برای همه کارکنان دسته با refresh_current()
+دوباره محاسبه می‌شوند: یک UPDATE پرچم ردیف‌های قدیمی را برمی‌دارد و یک UPDATE
+دیگر ردیف‌های منتخب ROW_NUMBER() OVER (PARTITION BY employee, organization) را
+علامت می‌زند؛ فقط ردیف‌هایی که پرچمشان تغییر می‌کند نوشته می‌شوند.
+"""
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+from django.utils.translation import gettext as _
+
+from .models import EmploymentHistory, employment_history_overlaps
+
+
+DEFAULT_BATCH_SIZE = 2000
+EMPLOYEE_CHUNK_SIZE = 500
+
+
+def current_history(as_of, employee_ids):
+    """
+    Queryset of the pks of the current rows of `employee_ids` on `as_of`:
+    per (employee, organization), the latest-starting row in effect on that
+    date.
+    """
+    rows = EmploymentHistory.objects.filter(
+        Q(end_date__isnull=True) | Q(end_date__gte=as_of),
+        start_date__lte=as_of,
+        employee_id__in=employee_ids,
+    )
+    return rows.annotate(
+        position=Window(
+            RowNumber(),
+            partition_by=[F('employee_id'), F('organization_id')],
+            order_by=[F('start_date').desc(), F('pk').desc()],
+        ),
+    ).filter(position=1).order_by().values('pk')
+
+
+def _refresh(as_of, employee_ids):
+    rows = EmploymentHistory.objects.filter(employee_id__in=employee_ids)
+    current = current_history(as_of, employee_ids)
+    # Clear first: the partial unique index never sees two current rows.
+    cleared = rows.filter(is_current=True).exclude(pk__in=current).update(is_current=False)
+    marked = rows.filter(is_current=False, pk__in=current).update(is_current=True)
+    return cleared + marked
+
+
+def refresh_current(employee_ids, as_of=None):
+    """
+    Recomputes is_current of the given employees and returns the number of
+    rows changed. Only rows whose flag changes are written; employees are
+    handled in chunks to bound the IN lists.
+
+    The flag is derived from the dates alone: a flag set by hand on a row
+    that is not in effect on `as_of` (e.g. a position starting next month)
+    is replaced, and an employee with only future rows has none. Callers
+    pass the employees they changed; refreshing everyone is an explicit
+    choice (the refresh_current_positions command with --all).
+    """
+    as_of = as_of or timezone.localdate()
+    employee_ids = sorted(set(employee_ids))
+    with transaction.atomic():
+        return sum(
+            _refresh(as_of, employee_ids[start:start + EMPLOYEE_CHUNK_SIZE])
+            for start in range(0, len(employee_ids), EMPLOYEE_CHUNK_SIZE)
+        )
+
+
+def bulk_load(histories, batch_size=DEFAULT_BATCH_SIZE, as_of=None):
+    """
+    Inserts unsaved EmploymentHistory objects without their per-row save()
+    and clean() queries: the batch is validated in one pass (dates and
+    overlaps with each other and with the stored rows), inserted with
+    is_current cleared and then flagged by refresh_current(). Returns the
+    created objects; nothing is written if a row is invalid.
+    """
+    histories = list(histories)
+    errors = [
+        ValidationError(_("تاریخ شروع نمی‌تواند بعد از تاریخ پایان باشد."))
+        for history in histories
+        if history.end_date and history.start_date > history.end_date
+    ]
+    if errors:
+        raise ValidationError(errors)
+    employment_history_overlaps.validate(histories)
+
+    for history in histories:
+        history.is_current = False
+    with transaction.atomic():
+        created = EmploymentHistory.objects.bulk_create(histories, batch_size=batch_size)
+        refresh_current({history.employee_id for history in histories}, as_of=as_of)
+    return created
@@ -0,0 +1,53 @@
+import time
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from hr.work_record_import import DEFAULT_CHUNK_SIZE, import_work_records
+
+
+class Command(BaseCommand):
+    help = "ورود گروهی کارکرد ماهیانه از فایل CSV یا XLSX"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV or XLSX file exported by the time-attendance system.")
+        parser.add_argument(
+            '--organization', type=int,
+            help="Organization pk for rows without an organization_code column.",
+        )
+        parser.add_argument(
+            '--period', type=int,
+            help="Financial period pk for rows without a financial_period column.",
+        )
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument(
+            '--errors',
+            help="Where to write rejected rows (default: <path>.errors.csv).",
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        started = time.perf_counter()
+        try:
+            with open(path, 'rb') as fileobj:
+                result = import_work_records(
+                    fileobj,
+                    path,
+                    organization=options['organization'],
+                    financial_period=options['period'],
+                    chunk_size=options['chunk_size'],
+                )
+        except OSError as exc:
+            raise CommandError(str(exc))
+        except ValidationError as exc:
+            raise CommandError(' '.join(exc.messages))
+
+        self.stdout.write(
+            f"Rows: {result.rows}, imported: {result.imported}, rejected: {len(result.errors)} "
+            f"({time.perf_counter() - started:.2f}s)"
+        )
+        if result.has_errors:
+            errors_path = options['errors'] or f"{path}.errors.csv"
+            with open(errors_path, 'w', encoding='utf-8-sig', newline='') as fileobj:
+                result.write_errors(fileobj)
+            self.stdout.write(f"Rejected rows written to {errors_path}")
@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from hr.history import refresh_current
+from hr.models import EmploymentHistory
+
+
+class Command(BaseCommand):
+    help = "محاسبه دوباره موقعیت شغلی فعلی (is_current) کارکنان از روی تاریخ سوابق شغلی"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--employee', type=int, action='append', dest='employees',
+            help="Only this employee pk (repeatable).",
+        )
+        parser.add_argument(
+            '--all', action='store_true',
+            help="Every employee with employment history. Flags set by hand are replaced.",
+        )
+        parser.add_argument(
+            '--as-of', type=parse_date,
+            help="Reference date (YYYY-MM-DD, default: today).",
+        )
+
+    def handle(self, *args, **options):
+        if bool(options['employees']) == options['all']:
+            raise CommandError("Give either --employee or --all.")
+        employees = options['employees']
+        if options['all']:
+            employees = EmploymentHistory.objects.values_list('employee_id', flat=True).order_by().distinct()
+        started = time.perf_counter()
+        changed = refresh_current(employees, as_of=options['as_of'])
+        self.stdout.write(f"Rows changed: {changed} ({time.perf_counter() - started:.2f}s)")
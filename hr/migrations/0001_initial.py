@@ -0,0 +1,115 @@
+# Generated by Django 5.2.1 on 2026-10-18 18:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('employees', '0003_delete_organization'),
+        ('organizations', '0001_initial'),
+        ('settings_app', '0002_alter_fiscalyear_organization'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Department',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, verbose_name='نام دپارتمان')),
+                ('description', models.TextField(blank=True, null=True, verbose_name='توضیحات')),
+                ('is_active', models.BooleanField(default=True, verbose_name='فعال')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='تاریخ ایجاد')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='تاریخ به\u200cروزرسانی')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='departments', to='organizations.organization', verbose_name='سازمان')),
+            ],
+            options={
+                'verbose_name': 'دپارتمان',
+                'verbose_name_plural': 'دپارتمان\u200cها',
+                'ordering': ['organization', 'name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='JobTitle',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=255, verbose_name='عنوان شغلی')),
+                ('description', models.TextField(blank=True, null=True, verbose_name='توضیحات')),
+                ('is_active', models.BooleanField(default=True, verbose_name='فعال')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='تاریخ ایجاد')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='تاریخ به\u200cروزرسانی')),
+                ('organization', models.ForeignKey(blank=True, help_text='سازمانی که این عنوان شغلی به آن مرتبط است (اختیاری).', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='job_titles', to='organizations.organization', verbose_name='سازمان')),
+            ],
+            options={
+                'verbose_name': 'عنوان شغلی',
+                'verbose_name_plural': 'عناوین شغلی',
+                'ordering': ['organization__name', 'title'],
+            },
+        ),
+        migrations.CreateModel(
+            name='EmploymentHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_date', models.DateField(verbose_name='تاریخ شروع')),
+                ('end_date', models.DateField(blank=True, null=True, verbose_name='تاریخ پایان')),
+                ('is_current', models.BooleanField(default=True, help_text='آیا این موقعیت شغلی فعلی کارمند است؟', verbose_name='فعلی؟')),
+                ('responsibilities', models.TextField(blank=True, null=True, verbose_name='مسئولیت\u200cها')),
+                ('notes', models.TextField(blank=True, null=True, verbose_name='ملاحظات')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='تاریخ ایجاد')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='تاریخ به\u200cروزرسانی')),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='employment_history', to='hr.department', verbose_name='دپارتمان')),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='employment_history', to='employees.employee', verbose_name='کارمند')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='employment_history', to='organizations.organization', verbose_name='سازمان')),
+                ('job_title', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='employment_history', to='hr.jobtitle', verbose_name='عنوان شغلی')),
+            ],
+            options={
+                'verbose_name': 'سابقه شغلی',
+                'verbose_name_plural': 'سوابق شغلی',
+                'ordering': ['employee', '-start_date', '-end_date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='MonthlyWorkRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('monthly_working_hours', models.DecimalField(decimal_places=2, default=0, max_digits=10, verbose_name='ساعات کارکرد در ماه')),
+                ('working_days_in_month', models.DecimalField(decimal_places=1, default=0, max_digits=5, verbose_name='روزهای کاری در ماه')),
+                ('standard_hours_in_month', models.DecimalField(decimal_places=2, default=0, max_digits=10, verbose_name='ساعت استاندارد در ماه')),
+                ('overtime_hours', models.DecimalField(decimal_places=2, default=0, max_digits=10, verbose_name='ساعات اضافه کاری')),
+                ('deficit_hours', models.DecimalField(decimal_places=2, default=0, max_digits=10, verbose_name='ساعات کسر کاری')),
+                ('used_leave_days', models.DecimalField(decimal_places=1, default=0, max_digits=5, verbose_name='روزهای مرخصی استفاده شده')),
+                ('used_leave_hours', models.DecimalField(decimal_places=2, default=0, max_digits=10, verbose_name='ساعات مرخصی استفاده شده')),
+                ('friday_holiday_workdays', models.DecimalField(decimal_places=1, default=0, max_digits=5, verbose_name='روزهای جمعه کاری یا تعطیل کاری')),
+                ('mission_days', models.DecimalField(decimal_places=1, default=0, max_digits=5, verbose_name='روزهای ماموریت')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='تاریخ ایجاد')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='تاریخ به\u200cروزرسانی')),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_work_records', to='employees.employee', verbose_name='کارمند')),
+                ('financial_period', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_work_records', to='settings_app.financialperiod', verbose_name='دوره مالی')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_work_records', to='organizations.organization', verbose_name='سازمان')),
+            ],
+            options={
+                'verbose_name': 'کارکرد ماهیانه',
+                'verbose_name_plural': 'کارکرد ماهیانه کارکنان',
+                'ordering': ['financial_period', 'employee'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='department',
+            constraint=models.UniqueConstraint(fields=('organization', 'name'), name='unique_department_name_per_org'),
+        ),
+        migrations.AddConstraint(
+            model_name='jobtitle',
+            constraint=models.UniqueConstraint(fields=('organization', 'title'), name='unique_job_title_per_org'),
+        ),
+        migrations.AddConstraint(
+            model_name='employmenthistory',
+            constraint=models.UniqueConstraint(fields=('employee', 'organization', 'start_date'), name='unique_employment_start_per_employee_org'),
+        ),
+        migrations.AddConstraint(
+            model_name='monthlyworkrecord',
+            constraint=models.UniqueConstraint(fields=('employee', 'organization', 'financial_period'), name='unique_monthly_work_record_per_employee_org_period'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.1 on 2026-10-18 18:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0004_employee_employee_name_idx'),
+        ('hr', '0001_initial'),
+        ('organizations', '0002_employeeorganization_emp_org_ordering_idx'),
+        ('settings_app', '0002_alter_fiscalyear_organization'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='employmenthistory',
+            index=models.Index(fields=['employee', '-start_date', '-end_date'], name='employment_ordering_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employmenthistory',
+            index=models.Index(fields=['organization', 'employee', '-start_date', '-end_date'], name='employment_org_emp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='monthlyworkrecord',
+            index=models.Index(fields=['organization', 'financial_period', 'employee'], name='work_record_org_period_idx'),
+        ),
+    ]
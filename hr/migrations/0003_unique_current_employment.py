@@ -0,0 +1,36 @@
+# Generated by Django 5.2.1 on 2026-10-18 18:06
+
+from django.db import migrations, models
+
+
+def clear_duplicate_current(apps, schema_editor):
+    """Keep only the latest-starting current row of each employee in an organization."""
+    EmploymentHistory = apps.get_model('hr', 'EmploymentHistory')
+    seen = set()
+    stale = []
+    rows = EmploymentHistory.objects.filter(is_current=True).order_by(
+        'employee_id', 'organization_id', '-start_date', '-pk',
+    ).values_list('pk', 'employee_id', 'organization_id')
+    for pk, employee_id, organization_id in rows.iterator():
+        if (employee_id, organization_id) in seen:
+            stale.append(pk)
+        else:
+            seen.add((employee_id, organization_id))
+    EmploymentHistory.objects.filter(pk__in=stale).update(is_current=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0004_employee_employee_name_idx'),
+        ('hr', '0002_employment_and_work_record_idx'),
+        ('organizations', '0002_employeeorganization_emp_org_ordering_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_duplicate_current, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='employmenthistory',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_current', True)), fields=('employee', 'organization'), name='unique_current_employment_per_employee_org', violation_error_message='فقط یک سابقه شغلی برای هر کارمند در هر سازمان می\u200cتواند به عنوان موقعیت فعلی علامت\u200cگذاری شود.'),
+        ),
+    ]
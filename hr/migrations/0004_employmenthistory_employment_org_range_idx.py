@@ -0,0 +1,19 @@
+# Generated by Django 5.2.1 on 2026-10-18 18:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0004_employee_employee_name_idx'),
+        ('hr', '0003_unique_current_employment'),
+        ('organizations', '0002_employeeorganization_emp_org_ordering_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='employmenthistory',
+            index=models.Index(fields=['organization', 'start_date', 'end_date'], name='employment_org_range_idx'),
+        ),
+    ]
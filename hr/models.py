@@ -3,6 +3,8 @@ from django.utils.translation import gettext_lazy as _
 from django.core.exceptions import ValidationError
 from django.db.models import Q
 
+from accounting_salary.intervals import OverlapValidator
+
 # Import necessary models from other apps
 from organizations.models import Organization # To link departments, job titles, and work records to an organization
 from employees.models import Employee # To link employment history and work records to an employee
@@ -133,6 +135,24 @@ class EmploymentHistory(models.Model):
         # Adding a unique constraint on employee, organization, and start_date for basic uniqueness.
         constraints = [
             models.UniqueConstraint(fields=['employee', 'organization', 'start_date'], name='unique_employment_start_per_employee_org'),
+            # At most one current position per employee in an organization
+            # (partial index, also serves the current-position lookups).
+            models.UniqueConstraint(
+                fields=['employee', 'organization'],
+                condition=Q(is_current=True),
+                name='unique_current_employment_per_employee_org',
+                violation_error_message=_("فقط یک سابقه شغلی برای هر کارمند در هر سازمان می‌تواند به عنوان موقعیت فعلی علامت‌گذاری شود."),
+            ),
+        ]
+        # (employee, organization) lookups, including the overlap check in clean(),
+        # use the unique constraint's prefix.
+        indexes = [
+            # Default ordering for the employee and unfiltered lists.
+            models.Index(fields=['employee', '-start_date', '-end_date'], name='employment_ordering_idx'),
+            # Organization filter in employee order (lists, summaries, org chart).
+            models.Index(fields=['organization', 'employee', '-start_date', '-end_date'], name='employment_org_emp_idx'),
+            # As-of range predicates of the org chart (hr.org_chart).
+            models.Index(fields=['organization', 'start_date', 'end_date'], name='employment_org_range_idx'),
         ]
 
     def clean(self):
@@ -144,44 +164,20 @@ class EmploymentHistory(models.Model):
         if self.start_date and self.end_date and self.start_date > self.end_date:
             raise ValidationError(_("تاریخ شروع نمی‌تواند بعد از تاریخ پایان باشد."))
 
-        # Check for overlapping history for the same employee and organization
-        if self.employee and self.organization and self.start_date:
-             # Find existing history entries for the same employee and organization
-             # that overlap with the current entry's date range [self.start_date, self.end_date]
-             # Two ranges [A, B] and [C, D] overlap if A <= D and C <= B
-            overlapping_history = EmploymentHistory.objects.filter(
-                employee=self.employee,
-                organization=self.organization
-            ).filter(
-                # Overlap condition:
-                # (existing_end_date >= new_start_date OR existing_end_date is null)
-                # AND (existing_start_date <= new_end_date OR new_end_date is null)
-                (Q(end_date__gte=self.start_date) | Q(end_date__isnull=True)) &
-                (Q(start_date__lte=self.end_date) | Q(end_date__isnull=True))
-            ).exclude(pk=self.pk) # Exclude the current object itself when updating
-
-            if overlapping_history.exists():
-                raise ValidationError(_("این بازه سابقه شغلی با یک سابقه شغلی موجود برای این کارمند در این سازمان همپوشانی دارد."))
-
-        # Ensure only one history entry is marked as 'is_current' for a given employee
-        if self.is_current and self.employee:
-            current_positions = EmploymentHistory.objects.filter(
-                employee=self.employee,
-                is_current=True
-            ).exclude(pk=self.pk) # Exclude the current object
-
-            if current_positions.exists():
-                 # You might want to automatically set is_current=False for the existing one
-                 # or raise a validation error. Raising error for now.
-                 raise ValidationError(_("فقط یک سابقه شغلی برای هر کارمند می‌تواند به عنوان موقعیت فعلی علامت‌گذاری شود."))
+        # Overlap with the other history of the employee in the organization (accounting_salary.intervals).
+        employment_history_overlaps.validate([self])
 
+        # One current row per employee and organization is checked by
+        # full_clean() through unique_current_employment_per_employee_org.
 
     def save(self, *args, **kwargs):
-        # Optional: Automatically set is_current=False for other entries
-        # if this one is marked as current
-        if self.is_current and self.employee:
+        # Clear the previous current position of the employee in this organization.
+        # Bulk loads skip this per-row update and use hr.history.bulk_load().
+        if self.is_current and self.employee_id and self.organization_id:
             EmploymentHistory.objects.filter(
-                employee=self.employee
+                employee_id=self.employee_id,
+                organization_id=self.organization_id,
+                is_current=True,
             ).exclude(pk=self.pk).update(is_current=False)
 
         super().save(*args, **kwargs)
@@ -192,6 +188,13 @@ class EmploymentHistory(models.Model):
         return f"{self.employee} در {self.job_title} ({self.organization.name}, {period})"
 
 
+employment_history_overlaps = OverlapValidator(
+    EmploymentHistory,
+    key_fields=['employee', 'organization'],
+    message=_("این بازه سابقه شغلی با یک سابقه شغلی موجود برای این کارمند در این سازمان همپوشانی دارد."),
+)
+
+
 class MonthlyWorkRecord(models.Model):
     """
     مدلی برای ذخیره اطلاعات کارکرد ماهیانه یک کارمند در یک سازمان و دوره مالی مشخص.
@@ -286,6 +289,10 @@ class MonthlyWorkRecord(models.Model):
             )
         ]
         ordering = ['financial_period', 'employee']
+        # The unique constraint leads with employee; lists and payroll filter by organization first.
+        indexes = [
+            models.Index(fields=['organization', 'financial_period', 'employee'], name='work_record_org_period_idx'),
+        ]
 
     def __str__(self):
         return f"کارکرد {self.employee} در {self.organization.name} ({self.financial_period.name})"
@@ -0,0 +1,91 @@
+"""
+چارت سازمانی در یک تاریخ (as-of) از روی سوابق شغلی.
+
+سابقه‌ای در تاریخ D برقرار است که start_date <= D و end_date خالی یا >= D باشد.
+تعداد کارکنان هر دپارتمان (یا عنوان شغلی) برای یک سری از تاریخ‌ها با یک کوئری
+محاسبه می‌شود: سوابق سازمان که با بازه کل سری همپوشانی دارند یک بار پیمایش
+(شاخص employment_org_range_idx) و برای هر تاریخ یک COUNT(DISTINCT employee)
+شرطی (FILTER) در همان GROUP BY حساب می‌شود؛ نه یک کوئری برای هر تاریخ.
+
+members() فهرست کارکنان یک دپارتمان یا عنوان شغلی را در یک تاریخ برمی‌گرداند.
+"""
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Q
+from django.utils.translation import gettext as _
+
+from loans.schedule import add_jalali_months
+
+from .models import EmploymentHistory
+
+
+# group_by: (id field, name field) of the grouping.
+GROUPINGS = {
+    'department': ('department_id', 'department__name'),
+    'job_title': ('job_title_id', 'job_title__title'),
+}
+MAX_DATES = 60
+
+
+def in_effect(as_of):
+    """
+    Q matching the employment history rows in effect on `as_of`.
+    """
+    return Q(start_date__lte=as_of) & (Q(end_date__isnull=True) | Q(end_date__gte=as_of))
+
+
+def month_series(end, months):
+    """
+    `months` dates one Jalali month apart, ending at `end` (oldest first).
+    """
+    return [add_jalali_months(end, -offset) for offset in range(months - 1, -1, -1)]
+
+
+def headcount_series(organization, dates, group_by='department'):
+    """
+    Headcount per department (or job title) of the organization on each of
+    `dates`, in one query:
+    {'dates': [...], 'totals': [...], 'groups': [{'id', 'name', 'headcount': [...]}]}.
+    Groups without anybody on any of the dates are left out; rows without a
+    department/job title form a group with id None.
+    """
+    if group_by not in GROUPINGS:
+        raise ValidationError(_("گروه‌بندی نامعتبر است."))
+    dates = sorted(set(dates))
+    if not dates or len(dates) > MAX_DATES:
+        raise ValidationError(_("تعداد تاریخ‌ها باید بین ۱ و %(max)s باشد."), params={'max': MAX_DATES})
+
+    id_field, name_field = GROUPINGS[group_by]
+    rows = EmploymentHistory.objects.filter(
+        Q(end_date__isnull=True) | Q(end_date__gte=dates[0]),
+        organization=organization,
+        start_date__lte=dates[-1],
+    ).values(id_field, name_field).annotate(**{
+        f'on_{index}': Count('employee_id', distinct=True, filter=in_effect(day))
+        for index, day in enumerate(dates)
+    }).order_by(name_field, id_field)
+
+    groups = []
+    for row in rows:
+        headcount = [row[f'on_{index}'] for index in range(len(dates))]
+        if any(headcount):
+            groups.append({'id': row[id_field], 'name': row[name_field], 'headcount': headcount})
+    return {
+        'dates': dates,
+        'totals': [sum(group['headcount'][index] for group in groups) for index in range(len(dates))],
+        'groups': groups,
+    }
+
+
+def members(organization, as_of, department=None, job_title=None):
+    """
+    Employment history rows of the organization in effect on `as_of`,
+    optionally of one department and/or job title (pk values).
+    """
+    rows = EmploymentHistory.objects.filter(in_effect(as_of), organization=organization)
+    if department is not None:
+        rows = rows.filter(department_id=department)
+    if job_title is not None:
+        rows = rows.filter(job_title_id=job_title)
+    return rows.select_related('employee', 'department', 'job_title').order_by(
+        'department__name', 'job_title__title', 'employee__last_name', 'employee__first_name', 'pk',
+    )
@@ -1,3 +1,231 @@
-from django.test import TestCase
+import datetime
+import io
+import tempfile
+from decimal import Decimal
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from accounting_salary.testing import PayrollTestDataMixin
+from jobs.models import Job
+from jobs.queue import claim_next, run_job
+from organizations.models import EmployeeOrganization, Organization
+from salaries.models import PayrollResultLine, PayrollRun
+from users.models import CustomUser
+
+from .history import bulk_load, refresh_current
+from .org_chart import MAX_DATES
+from .models import EmploymentHistory, MonthlyWorkRecord
+from .work_record_import import import_work_records
+
+
+class CurrentEmploymentConstraintTests(PayrollTestDataMixin, TestCase):
+    """
+    در هر سازمان فقط یک سابقه شغلی فعلی برای هر کارمند مجاز است.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.employee = cls.create_employee(member=False)
+
+    def history(self, start_date, end_date=None, organization=None, is_current=True):
+        return EmploymentHistory(
+            employee=self.employee,
+            organization=organization or self.organization,
+            start_date=start_date,
+            end_date=end_date,
+            is_current=is_current,
+        )
+
+    def test_second_current_row_is_rejected(self):
+        # bulk_create() skips save(), which would clear the first current row.
+        EmploymentHistory.objects.bulk_create([self.history(datetime.date(2023, 1, 1), datetime.date(2023, 12, 31))])
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            EmploymentHistory.objects.bulk_create([self.history(datetime.date(2024, 1, 1))])
+
+    def test_current_rows_in_other_organizations_are_allowed(self):
+        other = Organization.objects.create(name="سازمان دیگر")
+        EmploymentHistory.objects.bulk_create([
+            self.history(datetime.date(2024, 1, 1)),
+            self.history(datetime.date(2024, 1, 1), organization=other),
+        ])
+        self.assertEqual(EmploymentHistory.objects.filter(is_current=True).count(), 2)
+
+    def test_save_clears_previous_current_row(self):
+        first = self.history(datetime.date(2023, 1, 1), datetime.date(2023, 12, 31))
+        first.save()
+        self.history(datetime.date(2024, 1, 1)).save()
+        first.refresh_from_db()
+        self.assertFalse(first.is_current)
+
+
+class RefreshCurrentTests(PayrollTestDataMixin, TestCase):
+    """
+    محاسبه دوباره موقعیت فعلی فقط برای کارکنان داده شده، از روی تاریخ‌ها.
+    """
+
+    AS_OF = datetime.date(2024, 6, 1)
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.first = cls.create_employee(1, member=False)
+        cls.second = cls.create_employee(2, member=False)
+        # Set by hand on a position that has not started yet.
+        cls.future = EmploymentHistory.objects.create(
+            employee=cls.second, organization=cls.organization,
+            start_date=datetime.date(2099, 1, 1), is_current=True,
+        )
+
+    def current_pks(self):
+        return set(EmploymentHistory.objects.filter(is_current=True).values_list('pk', flat=True))
+
+    def test_bulk_load_refreshes_only_the_loaded_employees(self):
+        created = bulk_load([
+            EmploymentHistory(employee=self.first, organization=self.organization,
+                              start_date=datetime.date(2023, 1, 1), end_date=datetime.date(2023, 12, 31)),
+            EmploymentHistory(employee=self.first, organization=self.organization,
+                              start_date=datetime.date(2024, 1, 1)),
+        ], as_of=self.AS_OF)
+        self.assertEqual(self.current_pks(), {created[1].pk, self.future.pk})
+
+    def test_flags_follow_the_dates(self):
+        self.assertEqual(refresh_current([self.second], as_of=self.AS_OF), 1)
+        self.assertEqual(self.current_pks(), set())
+        self.assertEqual(refresh_current([self.second], as_of=datetime.date(2099, 1, 1)), 1)
+        self.assertEqual(self.current_pks(), {self.future.pk})
+
+    def test_command_needs_employees_or_all(self):
+        for args in ([], ['--all', '--employee', str(self.first.pk)]):
+            with self.assertRaises(CommandError):
+                call_command('refresh_current_positions', *args, stdout=io.StringIO())
+        call_command('refresh_current_positions', '--employee', str(self.first.pk), stdout=io.StringIO())
+        self.assertEqual(self.current_pks(), {self.future.pk})
+        call_command('refresh_current_positions', '--all', stdout=io.StringIO())
+        self.assertEqual(self.current_pks(), set())
+
+
+class OrgChartViewTests(PayrollTestDataMixin, TestCase):
+    """
+    چارت سازمانی: تعداد ماه‌ها پیش از ساختن تاریخ‌ها محدود می‌شود.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        EmploymentHistory.objects.create(
+            employee=cls.create_employee(), organization=cls.organization, start_date=datetime.date(2024, 1, 1),
+        )
+        cls.user = CustomUser.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def get_chart(self, **params):
+        self.client.force_login(self.user)
+        url = reverse('hr:org_chart', kwargs={'organization_pk': self.organization.pk})
+        return self.client.get(url, {'date': '2024-06-01', 'format': 'json', **params})
+
+    def test_months_within_bounds(self):
+        for months in (1, MAX_DATES):
+            response = self.get_chart(months=months)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.json()['dates']), months)
+        self.assertEqual(response.json()['totals'][-1], 1)
+
+    def test_months_out_of_bounds_is_a_bad_request(self):
+        for months in (0, -1, MAX_DATES + 1, 10 ** 9):
+            with self.subTest(months=months):
+                self.assertEqual(self.get_chart(months=months).status_code, 400)
+
+
+class WorkRecordImportTests(PayrollTestDataMixin, TestCase):
+    """
+    ورود گروهی کارکرد: خانه‌های خالی، عضویت در دوره و علامت‌گذاری ردیف‌های حقوق.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.employees = [cls.create_employee(1), cls.create_employee(2)]
+        # Left before the period started.
+        cls.employees.append(cls.create_employee(
+            3, start_date=datetime.date(2023, 1, 1), end_date=datetime.date(2024, 3, 1),
+        ))
+
+    def run_import(self, text):
+        return import_work_records(
+            io.BytesIO(text.encode('utf-8')), 'records.csv',
+            organization=self.organization, financial_period=self.financial_period,
+        )
+
+    def test_xlsx_file(self):
+        from openpyxl import Workbook
+
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(['national_code', 'overtime_hours', 'mission_days'])
+        sheet.append(['0000000001', 10, None])
+        upload = io.BytesIO()
+        workbook.save(upload)
+        upload.seek(0)
+        result = import_work_records(
+            upload, 'records.xlsx', organization=self.organization, financial_period=self.financial_period,
+        )
+        self.assertEqual(result.imported, 1)
+        self.assertEqual(MonthlyWorkRecord.objects.get().overtime_hours, Decimal('10.00'))
+
+    def test_blank_cells_keep_stored_values(self):
+        self.run_import("national_code,overtime_hours,mission_days\n0000000001,10,2\n0000000002,5,1\n")
+        result = self.run_import("national_code,overtime_hours,mission_days\n0000000001,,3\n0000000002,7,\n")
+        self.assertEqual(result.imported, 2)
+        records = {
+            record.employee_id: (record.overtime_hours, record.mission_days)
+            for record in MonthlyWorkRecord.objects.all()
+        }
+        self.assertEqual(records, {
+            self.employees[0].pk: (Decimal('10.00'), Decimal('3.0')),
+            self.employees[1].pk: (Decimal('7.00'), Decimal('1.0')),
+        })
+
+    def test_membership_must_cover_the_period(self):
+        EmployeeOrganization.objects.filter(employee=self.employees[1]).update(is_active=False)
+        result = self.run_import("national_code,overtime_hours\n0000000001,1\n0000000002,1\n0000000003,1\n")
+        self.assertEqual(result.imported, 1)
+        self.assertEqual([line for line, _row, _messages in result.errors], [3, 4])
+
+    def test_only_imported_employees_are_marked_dirty(self):
+        payroll_run = PayrollRun.objects.create(organization=self.organization, financial_period=self.financial_period)
+        PayrollResultLine.objects.bulk_create([
+            PayrollResultLine(payroll_run=payroll_run, employee=employee) for employee in self.employees[:2]
+        ])
+        self.run_import("national_code,overtime_hours\n0000000001,4\n")
+        self.assertEqual(
+            list(payroll_run.lines.filter(is_dirty=True).values_list('employee_id', flat=True)),
+            [self.employees[0].pk],
+        )
+
+    def test_view_queues_the_import(self):
+        user = CustomUser.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(user)
+        upload = SimpleUploadedFile(
+            'records.csv', "national_code,overtime_hours\n0000000001,4\n0000000003,1\n".encode('utf-8'),
+        )
+        with override_settings(MEDIA_ROOT=tempfile.mkdtemp()):
+            response = self.client.post(reverse('hr:monthlyworkrecord_import'), {
+                'organization': self.organization.pk,
+                'financial_period': self.financial_period.pk,
+                'file': upload,
+            })
+            job = Job.objects.get()
+            self.assertRedirects(response, reverse('jobs:job_detail', kwargs={'pk': job.pk}), fetch_redirect_response=False)
+            self.assertFalse(MonthlyWorkRecord.objects.exists())
+
+            self.assertTrue(run_job(claim_next('test')))
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_SUCCEEDED)
+        self.assertEqual((job.result['imported'], job.result['rejected']), (1, 1))
+        self.assertEqual(len(job.result['files']), 1)
+        self.assertEqual(MonthlyWorkRecord.objects.get().employee, self.employees[0])
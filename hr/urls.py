@@ -20,6 +20,9 @@ from .views import (
     MonthlyWorkRecordCreateView,
     MonthlyWorkRecordUpdateView,
     MonthlyWorkRecordDeleteView,
+    MonthlyWorkRecordImportView,
+
+    OrgChartView,
 
     # Import DetailViews if you create them later
     # DepartmentDetailView,
@@ -88,6 +91,11 @@ urlpatterns = [
     path('work-records/<int:pk>/update/', MonthlyWorkRecordUpdateView.as_view(), name='monthlyworkrecord_update'),
     # Delete Monthly Work Record
     path('work-records/<int:pk>/delete/', MonthlyWorkRecordDeleteView.as_view(), name='monthlyworkrecord_delete'),
+    # Bulk import from CSV/XLSX, run on the job queue (rejected rows are a job file)
+    path('work-records/import/', MonthlyWorkRecordImportView.as_view(), name='monthlyworkrecord_import'),
     # Detail Monthly Work Record (Optional)
     # path('work-records/<int:pk>/', MonthlyWorkRecordDetailView.as_view(), name='monthlyworkrecord_detail'),
+
+    # --- Org chart (headcount and members on a date) ---
+    path('organization/<int:organization_pk>/org-chart/', OrgChartView.as_view(), name='org_chart'),
 ]
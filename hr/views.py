@@ -1,11 +1,20 @@
+import uuid
+
 from django.shortcuts import render, get_object_or_404, redirect
-from django.http import HttpResponse
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 from django.views.generic import (
+    FormView,
+    TemplateView,
     ListView,
     DetailView, # Optional: Add DetailView if needed
     CreateView,
     UpdateView,
     DeleteView,
+    View,
 )
 from django.urls import reverse_lazy, reverse
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin # Import UserPassesTestMixin
@@ -15,33 +24,28 @@ from django.db.models import Q
 
 # Import models and forms from the current app
 from .models import Department, JobTitle, EmploymentHistory, MonthlyWorkRecord
-from .forms import DepartmentForm, JobTitleForm, EmploymentHistoryForm, MonthlyWorkRecordForm
+from .forms import DepartmentForm, JobTitleForm, EmploymentHistoryForm, MonthlyWorkRecordForm, MonthlyWorkRecordImportForm
+from .work_record_import import file_extension
+from .org_chart import MAX_DATES, headcount_series, members, month_series
 
 # Import necessary models from other apps for filtering or context
 from organizations.models import Organization
 from employees.models import Employee
 from settings_app.models import FinancialPeriod
 
-# Import CustomUser model for permission checks
-from users.models import CustomUser # Assuming CustomUser is in users.models
+# Organization-level permission checks (resolved once per request)
+from users.permissions import has_org_permission, org_ids_with_permission, get_permission_resolver
+from accounting_salary.pagination import KeysetPaginationMixin
+from jobs.queue import enqueue
+from accounting_salary.mixins import RelatedObjectsMixin
 from django.utils.translation import gettext as _
 
 
-# Helper function to check organization-specific permission (can be defined in users app and imported)
-def has_org_permission(user, organization, perm_name):
-    """
-    Checks if the user has the specified permission in the given organization.
-    Assumes user is an instance of CustomUser with the has_organization_permission method.
-    """
-    if not isinstance(user, CustomUser):
-        # Handle cases where user is not CustomUser (e.g., AnonymousUser)
-        return False
-    return user.has_organization_permission(organization, perm_name)
 
 
 # --- Views for Department ---
 
-class DepartmentListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
+class DepartmentListView(LoginRequiredMixin, UserPassesTestMixin, RelatedObjectsMixin, KeysetPaginationMixin, ListView):
     """
     نمایش لیست دپارتمان‌ها.
     نیاز به ورود به سیستم و مجوز مشاهده دپارتمان‌ها (در سازمان مربوطه) دارد.
@@ -50,7 +54,8 @@ class DepartmentListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
     model = Department
     template_name = 'hr/department_list.html'
     context_object_name = 'department_list'
-    # paginate_by = 10
+    keyset_page_size = 50
+    list_select_related = ('organization',)
 
     def test_func(self):
         # Check if the user has the general 'view_department' permission or is staff/superuser
@@ -76,10 +81,7 @@ class DepartmentListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
             # If no organization_pk, show only departments in organizations the user has permission to view them in
             # This requires defining what "permission to view departments in an organization" means.
             # Let's assume it means having 'hr.view_department' permission in that organization.
-            user_accessible_org_ids = [
-                org.pk for org in Organization.objects.all() # Or a subset of organizations
-                if has_org_permission(self.request.user, org, 'hr.view_department')
-            ]
+            user_accessible_org_ids = org_ids_with_permission(self.request.user, 'hr.view_department')
             queryset = queryset.filter(organization__pk__in=user_accessible_org_ids)
 
 
@@ -176,7 +178,7 @@ class DepartmentDeleteView(LoginRequiredMixin, UserPassesTestMixin, SuccessMessa
 
 # --- Views for JobTitle ---
 
-class JobTitleListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
+class JobTitleListView(LoginRequiredMixin, UserPassesTestMixin, RelatedObjectsMixin, KeysetPaginationMixin, ListView):
     """
     نمایش لیست عناوین شغلی.
     نیاز به ورود به سیستم و مجوز مشاهده عناوین شغلی (در سازمان مربوطه) دارد.
@@ -185,7 +187,8 @@ class JobTitleListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
     model = JobTitle
     template_name = 'hr/jobtitle_list.html'
     context_object_name = 'jobtitle_list'
-    # paginate_by = 10
+    keyset_page_size = 50
+    list_select_related = ('organization',)
 
     def test_func(self):
         # Check if the user has the general 'view_jobtitle' permission or is staff/superuser
@@ -211,10 +214,7 @@ class JobTitleListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
         else:
             # If no organization_pk, show only job titles in organizations the user has permission to view them in
             # and general job titles (organization__isnull=True).
-            user_accessible_org_ids = [
-                org.pk for org in Organization.objects.all() # Or a subset of organizations
-                if has_org_permission(self.request.user, org, 'hr.view_jobtitle')
-            ]
+            user_accessible_org_ids = org_ids_with_permission(self.request.user, 'hr.view_jobtitle')
             queryset = queryset.filter(Q(organization__pk__in=user_accessible_org_ids) | Q(organization__isnull=True))
 
 
@@ -328,7 +328,7 @@ class JobTitleDeleteView(LoginRequiredMixin, UserPassesTestMixin, SuccessMessage
 
 # --- Views for EmploymentHistory ---
 
-class EmploymentHistoryListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
+class EmploymentHistoryListView(LoginRequiredMixin, UserPassesTestMixin, RelatedObjectsMixin, KeysetPaginationMixin, ListView):
     """
     نمایش لیست سوابق شغلی.
     نیاز به ورود به سیستم و مجوز مشاهده سوابق شغلی (در سازمان مربوطه) دارد.
@@ -337,7 +337,8 @@ class EmploymentHistoryListView(LoginRequiredMixin, UserPassesTestMixin, ListVie
     model = EmploymentHistory
     template_name = 'hr/employmenthistory_list.html'
     context_object_name = 'employmenthistory_list'
-    # paginate_by = 10
+    keyset_page_size = 50
+    list_select_related = ('employee', 'organization', 'department', 'job_title__organization')
 
     def test_func(self):
         # Check if the user has the general 'view_employmenthistory' permission or is staff/superuser
@@ -355,11 +356,8 @@ class EmploymentHistoryListView(LoginRequiredMixin, UserPassesTestMixin, ListVie
         if employee_pk:
             employee = get_object_or_404(Employee, pk=employee_pk)
             # Check if user has permission to view this employee's history in any of their organizations
-            user_can_view_history = False
-            for emp_org in employee.employee_organizations.all():
-                 if has_org_permission(self.request.user, emp_org.organization, 'hr.view_employmenthistory'):
-                     user_can_view_history = True
-                     break
+            employee_org_ids = employee.employee_organizations.values_list('organization_id', flat=True)
+            user_can_view_history = get_permission_resolver(self.request.user).has_in_any(employee_org_ids, 'hr.view_employmenthistory')
             if not user_can_view_history and not self.request.user.is_staff and not self.request.user.is_superuser:
                  messages.error(self.request, _("شما مجوز مشاهده سوابق شغلی این کارمند را ندارید."))
                  return EmploymentHistory.objects.none()
@@ -379,10 +377,7 @@ class EmploymentHistoryListView(LoginRequiredMixin, UserPassesTestMixin, ListVie
 
         # If no specific filter, show only history in organizations the user has permission to view them in
         if not employee_pk and not organization_pk and not self.request.user.is_staff and not self.request.user.is_superuser:
-             user_accessible_org_ids = [
-                org.pk for org in Organization.objects.all() # Or a subset of organizations
-                if has_org_permission(self.request.user, org, 'hr.view_employmenthistory')
-            ]
+             user_accessible_org_ids = org_ids_with_permission(self.request.user, 'hr.view_employmenthistory')
              queryset = queryset.filter(organization__pk__in=user_accessible_org_ids)
 
 
@@ -505,7 +500,7 @@ class EmploymentHistoryDeleteView(LoginRequiredMixin, UserPassesTestMixin, Succe
 
 # --- Views for MonthlyWorkRecord ---
 
-class MonthlyWorkRecordListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
+class MonthlyWorkRecordListView(LoginRequiredMixin, UserPassesTestMixin, RelatedObjectsMixin, KeysetPaginationMixin, ListView):
     """
     نمایش لیست رکوردهای کارکرد ماهیانه.
     نیاز به ورود به سیستم و مجوز مشاهده رکوردهای کارکرد (در سازمان مربوطه) دارد.
@@ -514,7 +509,8 @@ class MonthlyWorkRecordListView(LoginRequiredMixin, UserPassesTestMixin, ListVie
     model = MonthlyWorkRecord
     template_name = 'hr/monthlyworkrecord_list.html'
     context_object_name = 'monthlyworkrecord_list'
-    # paginate_by = 10
+    keyset_page_size = 50
+    list_select_related = ('employee', 'organization', 'financial_period')
 
     def test_func(self):
         # Check if the user has the general 'view_monthlyworkrecord' permission or is staff/superuser
@@ -559,10 +555,7 @@ class MonthlyWorkRecordListView(LoginRequiredMixin, UserPassesTestMixin, ListVie
 
         else:
             # If no specific filter, show only work records in organizations the user has permission to view them in
-            user_accessible_org_ids = [
-                org.pk for org in Organization.objects.all() # Or a subset of organizations
-                if has_org_permission(self.request.user, org, 'hr.view_monthlyworkrecord')
-            ]
+            user_accessible_org_ids = org_ids_with_permission(self.request.user, 'hr.view_monthlyworkrecord')
             queryset = queryset.filter(organization__pk__in=user_accessible_org_ids)
 
 
@@ -699,4 +692,138 @@ class MonthlyWorkRecordDeleteView(LoginRequiredMixin, UserPassesTestMixin, Succe
         messages.success(self.request, self.success_message)
         return super().delete(request, *args, **kwargs)
 
+
+# --- Bulk import of MonthlyWorkRecord ---
+
+class MonthlyWorkRecordImportView(LoginRequiredMixin, UserPassesTestMixin, FormView):
+    """
+    ورود گروهی کارکرد ماهیانه از فایل CSV/XLSX.
+    نیاز به ورود به سیستم و مجوز افزودن رکورد کارکرد (در سازمان‌های ردیف‌های فایل) دارد.
+    فایل ذخیره و ورود آن در صف کارها (jobs) قرار می‌گیرد؛ کاربر به صفحه وضعیت کار
+    هدایت می‌شود و فایل ردیف‌های رد شده از همان صفحه قابل دریافت است.
+    """
+    form_class = MonthlyWorkRecordImportForm
+    template_name = 'hr/monthlyworkrecord_import.html'
+
+    def test_func(self):
+        # Organization-specific permission is checked per row during the import.
+        return self.request.user.is_staff or self.request.user.is_superuser or \
+               self.request.user.has_perm('hr.add_monthlyworkrecord') or \
+               bool(org_ids_with_permission(self.request.user, 'hr.add_monthlyworkrecord'))
+
+    def form_valid(self, form):
+        user = self.request.user
+        organization = form.cleaned_data.get('organization')
+        financial_period = form.cleaned_data.get('financial_period')
+        if user.is_staff or user.is_superuser:
+            allowed_organization_ids = None
+        else:
+            allowed_organization_ids = sorted(org_ids_with_permission(user, 'hr.add_monthlyworkrecord'))
+            if organization and organization.pk not in allowed_organization_ids:
+                messages.error(self.request, _("شما مجوز افزودن رکورد کارکرد در این سازمان را ندارید."))
+                return self.form_invalid(form)
+
+        upload = form.cleaned_data['file']
+        try:
+            extension = file_extension(upload.name)
+        except ValidationError as exc:
+            form.add_error('file', exc)
+            return self.form_invalid(form)
+
+        stored = default_storage.save(f"imports/work_records/{uuid.uuid4().hex}{extension}", upload)
+        job = enqueue(
+            'hr.work_record_import',
+            {
+                'upload': stored,
+                'filename': upload.name,
+                'organization': organization.pk if organization else None,
+                'financial_period': financial_period.pk if financial_period else None,
+                'allowed_organization_ids': allowed_organization_ids,
+            },
+            user=user,
+            organization=organization,
+        )
+        messages.success(self.request, _("فایل کارکرد دریافت شد و ورود آن در صف کارها قرار گرفت."))
+        return redirect('jobs:job_detail', pk=job.pk)
+
+
+# --- Org chart ---
+
+class OrgChartView(LoginRequiredMixin, UserPassesTestMixin, TemplateView):
+    """
+    چارت سازمانی یک سازمان در یک تاریخ: تعداد کارکنان هر دپارتمان (یا عنوان
+    شغلی) در ماه‌های منتهی به آن تاریخ و فهرست کارکنان یک گروه.
+    پارامترها: ?date=YYYY-MM-DD&group_by=department|job_title&months=N&group=<pk>
+    و format=json برای خروجی JSON.
+    نیاز به ورود به سیستم و مجوز مشاهده سوابق شغلی در سازمان دارد.
+    """
+    template_name = 'hr/org_chart.html'
+    default_months = 12
+
+    def test_func(self):
+        self.organization = get_object_or_404(Organization, pk=self.kwargs['organization_pk'])
+        user = self.request.user
+        return user.is_staff or user.is_superuser or \
+               has_org_permission(user, self.organization, 'hr.view_employmenthistory')
+
+    def get_params(self):
+        params = self.request.GET
+        as_of = timezone.localdate()
+        if params.get('date'):
+            as_of = parse_date(params['date'])
+            if as_of is None:
+                raise ValidationError(_("تاریخ نامعتبر است."))
+        try:
+            months = int(params.get('months', self.default_months))
+            group = int(params['group']) if params.get('group') else None
+        except ValueError:
+            raise ValidationError(_("پارامترهای چارت سازمانی نامعتبر است."))
+        # Checked before month_series() builds the dates.
+        if not 1 <= months <= MAX_DATES:
+            raise ValidationError(_("تعداد ماه‌ها باید بین ۱ و %(max)s باشد."), params={'max': MAX_DATES})
+        return as_of, params.get('group_by', 'department'), months, group
+
+    def get(self, request, *args, **kwargs):
+        try:
+            as_of, group_by, months, group = self.get_params()
+            chart = headcount_series(self.organization, month_series(as_of, months), group_by)
+        except ValidationError as exc:
+            return HttpResponse(' '.join(exc.messages), status=400, content_type='text/plain; charset=utf-8')
+
+        group_members = None
+        if group is not None:
+            group_members = members(self.organization, as_of, **{group_by: group})
+
+        if request.GET.get('format') == 'json':
+            return JsonResponse({
+                'organization': self.organization.pk,
+                'date': as_of.isoformat(),
+                'group_by': group_by,
+                'dates': [day.isoformat() for day in chart['dates']],
+                'totals': chart['totals'],
+                'groups': chart['groups'],
+                'members': None if group_members is None else [
+                    {
+                        'employee': history.employee_id,
+                        'name': str(history.employee),
+                        'department': history.department.name if history.department else None,
+                        'job_title': history.job_title.title if history.job_title else None,
+                        'start_date': history.start_date.isoformat(),
+                        'end_date': history.end_date.isoformat() if history.end_date else None,
+                    }
+                    for history in group_members
+                ],
+            }, json_dumps_params={'ensure_ascii': False})
+
+        return self.render_to_response(self.get_context_data(
+            organization=self.organization,
+            as_of=as_of,
+            group_by=group_by,
+            months=months,
+            chart=chart,
+            group=group,
+            group_members=group_members,
+        ))
+
+
 # Note: Detail Views can be added for any of the models if needed.
@@ -0,0 +1,361 @@
+"""
+ورود گروهی کارکرد ماهیانه از فایل CSV یا XLSX.
+
+فایل ردیف به ردیف خوانده می‌شود (کل فایل در حافظه بارگذاری نمی‌شود) و ردیف‌ها
+در دسته‌های chunk_size تایی اعتبارسنجی می‌شوند: برای هر دسته کارکنان با یک
+کوئری و عضویت‌هایشان با یک کوئری دیگر بارگذاری می‌شوند؛ سازمان‌ها و دوره‌های
+مالی یک بار در ابتدای کار. کارمند باید در دوره مالی ردیف عضو فعال سازمان باشد.
+ردیف‌های معتبر هر دسته با bulk_create(update_conflicts=True) روی قید یکتای
+(employee, organization, financial_period) درج یا به‌روزرسانی می‌شوند؛ خانه‌های
+خالی یک ردیف مقدار ذخیره شده را تغییر نمی‌دهند، پس ردیف‌ها بر اساس ستون‌های پر
+شده گروه‌بندی و هر گروه با یک bulk_create نوشته می‌شود. خطاهای هر ردیف برای ساخت
+فایل خطا نگهداری می‌شوند.
+
+ستون‌های فایل (سطر اول عنوان ستون‌ها است):
+  national_code یا personnel_code      شناسه کارمند (یکی الزامی است)
+  organization_code                    کد سازمان (در صورت تعیین سازمان پیش‌فرض اختیاری)
+  financial_period                     شناسه دوره مالی (در صورت تعیین دوره پیش‌فرض اختیاری)
+  و هر یک از فیلدهای عددی MonthlyWorkRecord (VALUE_FIELDS)
+"""
+import csv
+import io
+import os
+from collections import defaultdict
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils.translation import gettext as _
+
+from employees.models import Employee
+from organizations.models import Organization, EmployeeOrganization
+from settings_app.models import FinancialPeriod
+
+from .models import MonthlyWorkRecord
+
+
+VALUE_FIELDS = [
+    'monthly_working_hours',
+    'working_days_in_month',
+    'standard_hours_in_month',
+    'overtime_hours',
+    'deficit_hours',
+    'used_leave_days',
+    'used_leave_hours',
+    'friday_holiday_workdays',
+    'mission_days',
+]
+EMPLOYEE_KEY_COLUMNS = ['national_code', 'personnel_code']
+ORGANIZATION_COLUMN = 'organization_code'
+PERIOD_COLUMN = 'financial_period'
+UNIQUE_FIELDS = ['employee', 'organization', 'financial_period']
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+# --- Readers ---------------------------------------------------------------------
+
+def _normalize_header(header):
+    return [str(name or '').strip().lower() for name in header]
+
+
+def _cell(value):
+    if value is None:
+        return ''
+    return str(value).strip()
+
+
+def iter_csv_rows(fileobj, encoding='utf-8-sig'):
+    """
+    Yields (line number, row dict) per data row of a CSV file opened in binary mode.
+    """
+    text = io.TextIOWrapper(fileobj, encoding=encoding, newline='')
+    try:
+        reader = csv.reader(text)
+        header = _normalize_header(next(reader, []))
+        for values in reader:
+            if any(_cell(value) for value in values):
+                yield reader.line_num, dict(zip(header, (_cell(value) for value in values)))
+    finally:
+        # Leave the underlying file open for the caller.
+        text.detach()
+
+
+def iter_xlsx_rows(fileobj):
+    """
+    Yields (line number, row dict) per data row of the first sheet, using
+    openpyxl's read-only mode.
+    """
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValidationError(_("برای خواندن فایل‌های XLSX نصب بسته openpyxl لازم است."))
+
+    workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = _normalize_header(next(rows, ()))
+        for line, values in enumerate(rows, start=2):
+            if any(_cell(value) for value in values):
+                yield line, dict(zip(header, (_cell(value) for value in values)))
+    finally:
+        workbook.close()
+
+
+def file_extension(filename):
+    """
+    The lower-case extension of a supported file name; ValidationError otherwise.
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    if extension not in ('.csv', '.xlsx', '.xlsm'):
+        raise ValidationError(_("فقط فایل‌های CSV و XLSX پشتیبانی می‌شوند."))
+    return extension
+
+
+def iter_rows(fileobj, filename):
+    if file_extension(filename) == '.csv':
+        return iter_csv_rows(fileobj)
+    return iter_xlsx_rows(fileobj)
+
+
+# --- Import ----------------------------------------------------------------------
+
+class ImportResult:
+    """
+    خلاصه نتیجه ورود: تعداد ردیف‌ها و خطاهای هر ردیف.
+    هر خطا یک تاپل (شماره سطر فایل، ردیف اصلی، پیام‌ها) است.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.imported = 0
+        self.errors = []
+        self.columns = []
+
+    @property
+    def has_errors(self):
+        return bool(self.errors)
+
+    def write_errors(self, fileobj):
+        """
+        Writes the rejected rows, with their line number and messages, as CSV text.
+        The file keeps the original columns so it can be fixed and re-imported.
+        """
+        writer = csv.writer(fileobj)
+        writer.writerow(['line'] + self.columns + ['errors'])
+        for line, row, messages in self.errors:
+            writer.writerow([line] + [row.get(column, '') for column in self.columns] + ['; '.join(messages)])
+
+
+class MonthlyWorkRecordImporter:
+    """
+    ورود کارکرد ماهیانه به صورت دسته‌ای.
+
+    organization / financial_period: مقادیر پیش‌فرض برای ردیف‌هایی که ستون مربوط را ندارند.
+    allowed_organization_ids: اگر داده شود، ردیف‌های سازمان‌های دیگر رد می‌شوند.
+    """
+
+    def __init__(self, organization=None, financial_period=None, allowed_organization_ids=None,
+                 chunk_size=DEFAULT_CHUNK_SIZE):
+        self.organization_id = getattr(organization, 'pk', organization)
+        self.financial_period_id = getattr(financial_period, 'pk', financial_period)
+        self.allowed_organization_ids = allowed_organization_ids
+        self.chunk_size = chunk_size
+        self.value_fields = {name: MonthlyWorkRecord._meta.get_field(name) for name in VALUE_FIELDS}
+
+    # --- Lookups loaded once per import -------------------------------------------
+
+    def load_organizations(self):
+        return dict(Organization.objects.exclude(code__isnull=True).values_list('code', 'pk'))
+
+    def load_periods(self):
+        """
+        {period id: (organization id, start date, end date)}.
+        """
+        return {
+            pk: (organization_id, start_date, end_date)
+            for pk, organization_id, start_date, end_date in FinancialPeriod.objects.values_list(
+                'pk', 'fiscal_year__organization_id', 'start_date', 'end_date',
+            )
+        }
+
+    # --- Lookups loaded per chunk -----------------------------------------------
+
+    def load_employees(self, chunk):
+        """
+        {(key column, value): employee id} for the employee keys used in the chunk.
+        """
+        lookup = {}
+        for column in EMPLOYEE_KEY_COLUMNS:
+            values = {row.get(column) for _line, row in chunk if row.get(column)}
+            if values:
+                rows = Employee.objects.filter(**{f'{column}__in': values}).values_list(column, 'pk')
+                lookup.update(((column, value), pk) for value, pk in rows)
+        return lookup
+
+    def load_memberships(self, employee_ids, organization_ids):
+        """
+        {(employee id, organization id): [(start date, end date)]} of the active memberships.
+        """
+        memberships = defaultdict(list)
+        rows = EmployeeOrganization.objects.filter(
+            employee_id__in=employee_ids,
+            organization_id__in=organization_ids,
+            is_active=True,
+        ).values_list('employee_id', 'organization_id', 'start_date', 'end_date')
+        for employee_id, organization_id, start_date, end_date in rows:
+            memberships[(employee_id, organization_id)].append((start_date, end_date))
+        return memberships
+
+    def is_member(self, memberships, record):
+        """
+        Whether an active membership of the record's employee overlaps its period,
+        the rule the payroll engine uses to pick the period's employees.
+        """
+        _organization_id, period_start, period_end = self.periods[record.financial_period_id]
+        return any(
+            start_date <= period_end and (end_date is None or end_date >= period_start)
+            for start_date, end_date in memberships.get((record.employee_id, record.organization_id), ())
+        )
+
+    # --- Processing -------------------------------------------------------------
+
+    def run(self, rows):
+        """
+        `rows` yields (line number, row dict) pairs, as the readers above do.
+        """
+        result = ImportResult()
+        self.organizations = self.load_organizations()
+        self.periods = self.load_periods()
+        # {(organization id, period id): employee ids} written by the import.
+        self.touched = defaultdict(set)
+
+        chunk = []
+        for line, row in rows:
+            if not result.columns:
+                result.columns = list(row)
+            chunk.append((line, row))
+            if len(chunk) >= self.chunk_size:
+                self.process_chunk(chunk, result)
+                chunk = []
+        if chunk:
+            self.process_chunk(chunk, result)
+
+        self.mark_payroll_dirty()
+        return result
+
+    def process_chunk(self, chunk, result):
+        employees = self.load_employees(chunk)
+        parsed = []
+        for line, row in chunk:
+            result.rows += 1
+            messages = []
+            record, fields = self.parse_row(row, employees, messages)
+            if messages:
+                result.errors.append((line, row, messages))
+            else:
+                parsed.append((line, row, record, fields))
+
+        memberships = self.load_memberships(
+            {record.employee_id for _line, _row, record, _fields in parsed},
+            {record.organization_id for _line, _row, record, _fields in parsed},
+        )
+        # Later rows for the same employee/organization/period replace earlier ones.
+        records = {}
+        for line, row, record, fields in parsed:
+            if not self.is_member(memberships, record):
+                result.errors.append((line, row, [_("کارمند در این دوره مالی عضو فعال این سازمان نیست.")]))
+                continue
+            records[(record.employee_id, record.organization_id, record.financial_period_id)] = (record, fields)
+
+        # Only the filled cells of a row overwrite an existing record.
+        groups = defaultdict(list)
+        for record, fields in records.values():
+            groups[fields].append(record)
+        if groups:
+            with transaction.atomic():
+                for fields, group in groups.items():
+                    MonthlyWorkRecord.objects.bulk_create(
+                        group,
+                        update_conflicts=True,
+                        unique_fields=UNIQUE_FIELDS,
+                        update_fields=list(fields) + ['updated_at'],
+                    )
+            result.imported += len(records)
+            for employee_id, organization_id, period_id in records:
+                self.touched[(organization_id, period_id)].add(employee_id)
+
+    def parse_row(self, row, employees, messages):
+        """
+        (unsaved MonthlyWorkRecord, names of the value fields filled in the row),
+        or (None, ()) with `messages` describing what is wrong.
+        """
+        employee_id = None
+        for column in EMPLOYEE_KEY_COLUMNS:
+            if row.get(column):
+                employee_id = employees.get((column, row[column]))
+                if employee_id is None:
+                    messages.append(_("کارمندی با %(column)s «%(value)s» یافت نشد.") % {
+                        'column': column, 'value': row[column],
+                    })
+                break
+        else:
+            messages.append(_("شناسه کارمند (national_code یا personnel_code) مشخص نشده است."))
+
+        organization_id = self.organization_id
+        if row.get(ORGANIZATION_COLUMN):
+            organization_id = self.organizations.get(row[ORGANIZATION_COLUMN])
+            if organization_id is None:
+                messages.append(_("سازمانی با کد «%(code)s» یافت نشد.") % {'code': row[ORGANIZATION_COLUMN]})
+        elif organization_id is None:
+            messages.append(_("سازمان مشخص نشده است."))
+        if (organization_id is not None and self.allowed_organization_ids is not None
+                and organization_id not in self.allowed_organization_ids):
+            messages.append(_("شما مجوز ثبت کارکرد در این سازمان را ندارید."))
+
+        period_id = self.financial_period_id
+        if row.get(PERIOD_COLUMN):
+            try:
+                period_id = int(row[PERIOD_COLUMN])
+            except ValueError:
+                period_id = None
+            if period_id not in self.periods:
+                messages.append(_("دوره مالی «%(period)s» یافت نشد.") % {'period': row[PERIOD_COLUMN]})
+                period_id = None
+        elif period_id is None:
+            messages.append(_("دوره مالی مشخص نشده است."))
+        if organization_id is not None and period_id is not None and self.periods[period_id][0] != organization_id:
+            messages.append(_("دوره مالی متعلق به سال مالی این سازمان نیست."))
+
+        values = {}
+        for name, field in self.value_fields.items():
+            raw = row.get(name)
+            if not raw:
+                continue
+            try:
+                values[name] = field.clean(raw.replace(',', ''), None)
+            except ValidationError as exc:
+                messages.append(f"{field.verbose_name}: {' '.join(exc.messages)}")
+
+        if messages:
+            return None, ()
+        record = MonthlyWorkRecord(
+            employee_id=employee_id,
+            organization_id=organization_id,
+            financial_period_id=period_id,
+            **values,
+        )
+        return record, tuple(values)
+
+    def mark_payroll_dirty(self):
+        # bulk_create sends no post_save signals; flag the imported employees' lines here.
+        from salaries.payroll import mark_dirty
+
+        for (organization_id, period_id), employee_ids in self.touched.items():
+            mark_dirty(financial_period_id=period_id, organization_id=organization_id, employee_ids=employee_ids)
+
+
+def import_work_records(fileobj, filename, **options):
+    """
+    Imports a CSV/XLSX file of monthly work records; returns an ImportResult.
+    """
+    return MonthlyWorkRecordImporter(**options).run(iter_rows(fileobj, filename))
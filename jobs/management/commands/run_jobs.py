@@ -0,0 +1,58 @@
+import multiprocessing
+
+from django.core.management.base import BaseCommand
+
+from jobs.queue import worker_name
+from jobs.worker import run_worker, worker_process
+
+
+class Command(BaseCommand):
+    help = "اجرای پروسه‌های کارگر صف کارهای پس‌زمینه"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=1,
+            help="Number of worker processes to run.",
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help="Exit when no due job is left instead of polling.",
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=2.0,
+            help="Seconds to wait between polls of an empty queue.",
+        )
+        parser.add_argument(
+            '--max-jobs', type=int, default=None,
+            help="Exit (each process) after running this many jobs.",
+        )
+
+    def handle(self, *args, **options):
+        work_options = {'once': options['once'], 'sleep': options['sleep'], 'max_jobs': options['max_jobs']}
+        if options['processes'] <= 1:
+            self.run_single(work_options)
+            return
+
+        # Spawned (not forked) so children never share the parent's database connection.
+        context = multiprocessing.get_context('spawn')
+        processes = [
+            context.Process(target=worker_process, args=(work_options,), name=f"jobs-worker-{index}")
+            for index in range(options['processes'])
+        ]
+        for process in processes:
+            process.start()
+        self.stdout.write(f"Started {len(processes)} workers")
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.join()
+
+    def run_single(self, work_options):
+        worker = worker_name()
+        self.stdout.write(f"Worker {worker} started")
+        processed = run_worker(worker=worker, **work_options)
+        self.stdout.write(f"Worker {worker} ran {processed} jobs")
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.1 on 2026-10-18 17:12
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('organizations', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task', models.CharField(max_length=100, verbose_name='نوع کار')),
+                ('params', models.JSONField(blank=True, default=dict, verbose_name='پارامترها')),
+                ('status', models.CharField(choices=[('queued', 'در صف'), ('running', 'در حال اجرا'), ('succeeded', 'انجام شده'), ('failed', 'ناموفق')], default='queued', max_length=10, verbose_name='وضعیت')),
+                ('progress_done', models.PositiveIntegerField(default=0, verbose_name='انجام شده')),
+                ('progress_total', models.PositiveIntegerField(default=0, verbose_name='کل')),
+                ('message', models.TextField(blank=True, verbose_name='پیام')),
+                ('result', models.JSONField(blank=True, null=True, verbose_name='نتیجه')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='تعداد تلاش')),
+                ('max_attempts', models.PositiveIntegerField(default=3, verbose_name='حداکثر تلاش')),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, verbose_name='اجرا پس از')),
+                ('locked_by', models.CharField(blank=True, max_length=100, verbose_name='کارگر')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='زمان برداشتن')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='تاریخ ایجاد')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='زمان شروع')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='زمان پایان')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='تاریخ به\u200cروزرسانی')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='jobs', to=settings.AUTH_USER_MODEL, verbose_name='ایجاد کننده')),
+                ('organization', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='jobs', to='organizations.organization', verbose_name='سازمان')),
+            ],
+            options={
+                'verbose_name': 'کار پس\u200cزمینه',
+                'verbose_name_plural': 'کارهای پس\u200cزمینه',
+                'ordering': ['-created_at', '-id'],
+                'indexes': [models.Index(fields=['status', 'run_after', 'id'], name='job_status_run_after_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,102 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from organizations.models import Organization
+
+
+class Job(models.Model):
+    """
+    یک کار پس‌زمینه در صف کارها (jobs.queue).
+    پروسه‌های کارگر (فرمان run_jobs) کارهای در صف را برمی‌دارند، اجرا می‌کنند و
+    وضعیت، پیشرفت و نتیجه را در همین ردیف ثبت می‌کنند؛ ویوها فقط کار را در صف
+    قرار می‌دهند و وضعیت آن را می‌خوانند.
+    """
+
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, _('در صف')),
+        (STATUS_RUNNING, _('در حال اجرا')),
+        (STATUS_SUCCEEDED, _('انجام شده')),
+        (STATUS_FAILED, _('ناموفق')),
+    ]
+    FINISHED_STATUSES = (STATUS_SUCCEEDED, STATUS_FAILED)
+
+    task = models.CharField(max_length=100, verbose_name=_("نوع کار"))
+    params = models.JSONField(default=dict, blank=True, verbose_name=_("پارامترها"))
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=STATUS_QUEUED,
+        verbose_name=_("وضعیت")
+    )
+    progress_done = models.PositiveIntegerField(default=0, verbose_name=_("انجام شده"))
+    progress_total = models.PositiveIntegerField(default=0, verbose_name=_("کل"))
+    message = models.TextField(blank=True, verbose_name=_("پیام"))
+    result = models.JSONField(blank=True, null=True, verbose_name=_("نتیجه"))
+
+    attempts = models.PositiveIntegerField(default=0, verbose_name=_("تعداد تلاش"))
+    max_attempts = models.PositiveIntegerField(default=3, verbose_name=_("حداکثر تلاش"))
+    run_after = models.DateTimeField(default=timezone.now, verbose_name=_("اجرا پس از"))
+    locked_by = models.CharField(max_length=100, blank=True, verbose_name=_("کارگر"))
+    locked_at = models.DateTimeField(blank=True, null=True, verbose_name=_("زمان برداشتن"))
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='jobs',
+        verbose_name=_("ایجاد کننده")
+    )
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+        related_name='jobs',
+        verbose_name=_("سازمان")
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("تاریخ ایجاد"))
+    started_at = models.DateTimeField(blank=True, null=True, verbose_name=_("زمان شروع"))
+    finished_at = models.DateTimeField(blank=True, null=True, verbose_name=_("زمان پایان"))
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_("تاریخ به‌روزرسانی"))
+
+    class Meta:
+        verbose_name = _("کار پس‌زمینه")
+        verbose_name_plural = _("کارهای پس‌زمینه")
+        indexes = [
+            # Workers poll for due queued jobs in this order.
+            models.Index(fields=['status', 'run_after', 'id'], name='job_status_run_after_idx'),
+        ]
+        ordering = ['-created_at', '-id']
+
+    @property
+    def is_finished(self):
+        return self.status in self.FINISHED_STATUSES
+
+    @property
+    def percent(self):
+        if not self.progress_total:
+            return 100 if self.status == self.STATUS_SUCCEEDED else 0
+        return min(100, round(100 * self.progress_done / self.progress_total))
+
+    def set_progress(self, done, total=None, message=None):
+        """
+        Records progress from inside a running task with a single UPDATE.
+        """
+        self.progress_done = done
+        fields = {'progress_done': done, 'updated_at': timezone.now()}
+        if total is not None:
+            self.progress_total = fields['progress_total'] = total
+        if message is not None:
+            self.message = fields['message'] = message
+        Job.objects.filter(pk=self.pk).update(**fields)
+
+    def __str__(self):
+        return f"{self.task} #{self.pk} ({self.get_status_display()})"
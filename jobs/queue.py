@@ -0,0 +1,258 @@
+"""
+صف کارهای پس‌زمینه روی پایگاه داده.
+
+ویوها با enqueue() یک ردیف Job در صف قرار می‌دهند و پروسه‌های کارگر (فرمان
+run_jobs) با claim_next() آن را برمی‌دارند. برداشتن کار یک UPDATE شرطی روی
+status است، پس دو کارگر هرگز یک کار را با هم اجرا نمی‌کنند و به قفل ردیفی
+(SELECT ... FOR UPDATE) نیازی نیست؛ روی SQLite و PostgreSQL یکسان کار می‌کند.
+کار ناموفق با تأخیر نمایی دوباره در صف قرار می‌گیرد تا به max_attempts برسد.
+در طول اجرای هر کار، یک رشته ضربان (heartbeat) هر HEARTBEAT_INTERVAL ثانیه
+locked_at را تازه می‌کند؛ کاری که locked_at آن بیش از STALE_AFTER کهنه شده باشد
+کارگرش از کار افتاده است و دوباره در صف قرار می‌گیرد، هر قدر هم که اجرای کار
+طولانی باشد.
+"""
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, close_old_connections, connections
+from django.utils import timezone
+
+from .models import Job
+
+
+logger = logging.getLogger(__name__)
+
+TASKS = {}
+
+RETRY_BASE_DELAY = 30  # seconds; doubled for every failed attempt
+HEARTBEAT_INTERVAL = 60  # seconds
+# Several missed heartbeats, so a busy database does not requeue a live job.
+STALE_AFTER = timedelta(seconds=HEARTBEAT_INTERVAL * 5)
+CLAIM_CANDIDATES = 5
+
+
+class Task:
+    """
+    A registered job function: func(job, **params) -> JSON-serializable result.
+    `permission` is the organization permission needed to enqueue it from a view.
+    `period_task`: takes only organization/financial_period and may be queued
+    from the period pages (JobEnqueueView); other tasks are queued by their own views.
+    """
+
+    def __init__(self, name, func, label, permission=None, max_attempts=3, period_task=True):
+        self.name = name
+        self.func = func
+        self.label = label
+        self.permission = permission
+        self.max_attempts = max_attempts
+        self.period_task = period_task
+
+
+def task(name, label, permission=None, max_attempts=3, period_task=True):
+    """
+    Decorator registering a job function under `name`.
+    """
+    def register(func):
+        TASKS[name] = Task(name, func, label, permission, max_attempts, period_task)
+        return func
+    return register
+
+
+def get_task(name):
+    return TASKS.get(name)
+
+
+def available_tasks(user, organization):
+    """
+    (name, label) of the period tasks the user may queue in the organization.
+    """
+    from users.permissions import has_org_permission
+
+    unrestricted = user.is_staff or user.is_superuser
+    return [
+        (registered.name, registered.label)
+        for registered in TASKS.values()
+        if registered.period_task
+        and (unrestricted or has_org_permission(user, organization, registered.permission))
+    ]
+
+
+def enqueue(name, params=None, user=None, organization=None, run_after=None):
+    """
+    Puts a job in the queue and returns it; workers pick it up in order.
+    """
+    registered = TASKS[name]
+    return Job.objects.create(
+        task=name,
+        params=params or {},
+        created_by=user if user is not None and user.is_authenticated else None,
+        organization=organization,
+        max_attempts=registered.max_attempts,
+        run_after=run_after or timezone.now(),
+    )
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def requeue_stale(stale_after=STALE_AFTER):
+    """
+    Puts back jobs whose worker died while running them: running jobs whose
+    heartbeat stopped more than `stale_after` ago.
+    """
+    return Job.objects.filter(
+        status=Job.STATUS_RUNNING,
+        locked_at__lt=timezone.now() - stale_after,
+    ).update(status=Job.STATUS_QUEUED, locked_by='', locked_at=None, updated_at=timezone.now())
+
+
+def claim_next(worker):
+    """
+    Claims the oldest due job for `worker`, or returns None when none is due.
+    """
+    now = timezone.now()
+    candidates = Job.objects.filter(
+        status=Job.STATUS_QUEUED,
+        run_after__lte=now,
+    ).order_by('run_after', 'id').values_list('pk', flat=True)[:CLAIM_CANDIDATES]
+    for pk in candidates:
+        # Only one worker's conditional UPDATE can move the row out of "queued".
+        claimed = Job.objects.filter(pk=pk, status=Job.STATUS_QUEUED).update(
+            status=Job.STATUS_RUNNING,
+            locked_by=worker,
+            locked_at=now,
+            started_at=now,
+            updated_at=now,
+        )
+        if claimed:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+class Heartbeat:
+    """
+    Context manager refreshing a claimed job's locked_at from a daemon thread
+    while the task runs in the worker's main thread.
+    """
+
+    def __init__(self, job, interval=HEARTBEAT_INTERVAL):
+        self.job = job
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.beat, name=f'job-{job.pk}-heartbeat', daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.thread.join()
+
+    def beat(self):
+        try:
+            while not self.stopped.wait(self.interval):
+                try:
+                    Job.objects.filter(
+                        pk=self.job.pk,
+                        status=Job.STATUS_RUNNING,
+                        locked_by=self.job.locked_by,
+                    ).update(locked_at=timezone.now())
+                except DatabaseError:
+                    # e.g. SQLite locked by the task's own transaction; the next beat retries.
+                    logger.warning("Could not refresh the heartbeat of job %s", self.job.pk, exc_info=True)
+        finally:
+            # Connections are per thread; close this thread's one.
+            connections.close_all()
+
+
+def will_retry(job, exc):
+    """
+    True if run_job() puts `job` back in the queue after `exc` ends its
+    current attempt.
+    """
+    return not isinstance(exc, ValidationError) and job.attempts < job.max_attempts
+
+
+def run_job(job):
+    """
+    Runs a claimed job and records its outcome. Failures are retried with
+    exponential backoff until max_attempts is reached; a ValidationError
+    means the input is wrong, so the job fails at once.
+    """
+    registered = get_task(job.task)
+    job.attempts += 1
+    try:
+        if registered is None:
+            raise LookupError(f"Unknown task '{job.task}'.")
+        with Heartbeat(job):
+            result = registered.func(job, **job.params)
+    except Exception as exc:
+        now = timezone.now()
+        if isinstance(exc, ValidationError):
+            message = '\n'.join(exc.messages)
+        else:
+            logger.exception("Job %s (%s) failed on attempt %s", job.pk, job.task, job.attempts)
+            message = f"{exc}\n\n{traceback.format_exc()}"
+        fields = {
+            'attempts': job.attempts,
+            'message': message,
+            'locked_by': '',
+            'locked_at': None,
+            'updated_at': now,
+        }
+        if registered is not None and will_retry(job, exc):
+            fields.update(
+                status=Job.STATUS_QUEUED,
+                run_after=now + timedelta(seconds=RETRY_BASE_DELAY * 2 ** (job.attempts - 1)),
+            )
+        else:
+            fields.update(status=Job.STATUS_FAILED, finished_at=now)
+        Job.objects.filter(pk=job.pk).update(**fields)
+        return False
+
+    now = timezone.now()
+    Job.objects.filter(pk=job.pk).update(
+        status=Job.STATUS_SUCCEEDED,
+        attempts=job.attempts,
+        result=result,
+        message='',
+        locked_by='',
+        locked_at=None,
+        finished_at=now,
+        updated_at=now,
+    )
+    return True
+
+
+def work(worker=None, once=False, sleep=2.0, max_jobs=None, stop=None):
+    """
+    Worker loop: claims and runs due jobs until stopped. With `once`, exits
+    as soon as the queue has no due job. Returns the number of jobs run.
+    """
+    worker = worker or worker_name()
+    processed = 0
+    requeue_stale()
+    while stop is None or not stop():
+        close_old_connections()
+        job = claim_next(worker)
+        if job is None:
+            if once:
+                break
+            requeue_stale()
+            time.sleep(sleep)
+            continue
+        logger.info("Worker %s running job %s (%s)", worker, job.pk, job.task)
+        run_job(job)
+        processed += 1
+        if max_jobs is not None and processed >= max_jobs:
+            break
+    return processed
+
@@ -0,0 +1,158 @@
+"""
+کارهای پس‌زمینه قابل اجرا در صف.
+
+کارهای دوره‌ای با پارامترهای organization و financial_period (شناسه‌ها) فراخوانی
+می‌شوند. ورود گروهی کارکرد فایل بارگذاری شده را از default_storage می‌خواند و
+پس از آخرین تلاش (موفق یا ناموفق) حذف می‌کند. خروجی‌های فایلی در default_storage
+زیر jobs/<شناسه کار>/ ذخیره و نام آن‌ها در نتیجه کار (result['files']) ثبت
+می‌شود تا از صفحه وضعیت کار قابل دریافت باشند.
+"""
+import os
+import shutil
+import tempfile
+import zipfile
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.utils.translation import gettext_lazy as _
+
+from organizations.models import Organization
+from settings_app.models import FinancialPeriod
+
+from .queue import task, will_retry
+
+
+
+def _organization_period(organization, financial_period):
+    return (
+        Organization.objects.get(pk=organization),
+        FinancialPeriod.objects.select_related('fiscal_year').get(pk=financial_period),
+    )
+
+
+def job_file_name(job, filename):
+    return f"jobs/{job.pk}/{filename}"
+
+
+def _store(job, path, filename):
+    with open(path, 'rb') as fileobj:
+        return default_storage.save(job_file_name(job, filename), File(fileobj))
+
+
+def _store_lines(job, lines, filename):
+    """
+    Streams text lines to a temporary file and stores it; returns the storage name.
+    """
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', newline='', delete=False) as fileobj:
+        for line in lines:
+            fileobj.write(line)
+    try:
+        return _store(job, fileobj.name, filename)
+    finally:
+        os.unlink(fileobj.name)
+
+
+@task('payroll.run', _("محاسبه حقوق دوره"), permission='salaries.add_payrollrun')
+def run_payroll_task(job, organization, financial_period):
+    from salaries.payroll import run_payroll
+
+    organization, financial_period = _organization_period(organization, financial_period)
+    job.set_progress(0, 1)
+    payroll_run = run_payroll(organization, financial_period)
+    job.set_progress(1, 1)
+    return {'payroll_run': payroll_run.pk, 'lines': payroll_run.lines.count()}
+
+
+@task('payroll.close', _("بستن دوره حقوق"), permission='salaries.change_payrollrun')
+def close_payroll_task(job, organization, financial_period):
+    from salaries.payroll import close_payroll_run, run_payroll
+
+    organization, financial_period = _organization_period(organization, financial_period)
+    job.set_progress(0, 1)
+    payroll_run = close_payroll_run(run_payroll(organization, financial_period))
+    job.set_progress(1, 1)
+    return {'payroll_run': payroll_run.pk, 'lines': payroll_run.lines.count()}
+
+
+@task('reports.payroll_register', _("لیست حقوق"), permission='salaries.view_employeesalaryitem')
+def payroll_register_task(job, organization, financial_period):
+    from reports.register import PayrollRegister
+
+    organization, financial_period = _organization_period(organization, financial_period)
+    register = PayrollRegister(organization, financial_period)
+    name = _store_lines(job, register.csv_lines(), f"{register.filename}.csv")
+    return {'files': [name]}
+
+
+@task('salaries.bank_transfer', _("فایل انتقال بانکی"), permission='salaries.view_payrollrun')
+def bank_transfer_task(job, organization, financial_period, file_format='csv'):
+    from salaries.bank_transfer import BankTransferFile, get_closed_run
+
+    organization, financial_period = _organization_period(organization, financial_period)
+    transfer = BankTransferFile(get_closed_run(organization, financial_period), file_format)
+    # Fails the job, listing the payees without a valid SHEBA, instead of
+    # storing a file that leaves them out.
+    transfer.check_payees()
+    name = _store_lines(job, transfer.lines(), transfer.filename)
+    return {'files': [name], 'count': transfer.count, 'total': transfer.total}
+
+
+@task('reports.payslips', _("صدور فیش‌های حقوقی"), permission='salaries.view_payrollrun')
+def payslips_task(job, organization, financial_period, merged=False):
+    from reports.payslips import render_payslips
+
+    organization, financial_period = _organization_period(organization, financial_period)
+    output_dir = tempfile.mkdtemp()
+    try:
+        paths, _elapsed = render_payslips(
+            organization, financial_period, output_dir,
+            merged=merged,
+            progress=lambda done, total: job.set_progress(done, total),
+        )
+        archive = os.path.join(output_dir, 'payslips.zip')
+        with zipfile.ZipFile(archive, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+            for path in paths:
+                zip_file.write(path, os.path.basename(path))
+        name = _store(job, archive, f"payslips_{organization.pk}_{financial_period.pk}.zip")
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+    return {'files': [name], 'payslips': job.progress_done}
+
+
+@task('hr.work_record_import', _("ورود گروهی کارکرد ماهیانه"), permission='hr.add_monthlyworkrecord',
+      period_task=False)
+def work_record_import_task(job, upload, filename, organization=None, financial_period=None,
+                            allowed_organization_ids=None):
+    from hr.work_record_import import import_work_records
+
+    # The upsert is idempotent, so a retried attempt re-reads the same upload;
+    # it is deleted once no attempt will follow.
+    final_attempt = True
+    try:
+        with default_storage.open(upload, 'rb') as fileobj:
+            result = import_work_records(
+                fileobj,
+                filename,
+                organization=organization,
+                financial_period=financial_period,
+                allowed_organization_ids=None if allowed_organization_ids is None else set(allowed_organization_ids),
+            )
+        # Shown on the job page as "imported / rows".
+        job.set_progress(result.imported, result.rows)
+
+        files = []
+        if result.has_errors:
+            with tempfile.NamedTemporaryFile('w', encoding='utf-8-sig', newline='', suffix='.csv',
+                                             delete=False) as fileobj:
+                result.write_errors(fileobj)
+            try:
+                files.append(_store(job, fileobj.name, 'work-record-import-errors.csv'))
+            finally:
+                os.unlink(fileobj.name)
+    except Exception as exc:
+        final_attempt = not will_retry(job, exc)
+        raise
+    finally:
+        if final_attempt:
+            default_storage.delete(upload)
+    return {'files': files, 'rows': result.rows, 'imported': result.imported, 'rejected': len(result.errors)}
@@ -0,0 +1,132 @@
+import datetime
+import tempfile
+from unittest import mock
+
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .models import Job
+from .queue import RETRY_BASE_DELAY, STALE_AFTER, claim_next, enqueue, requeue_stale, run_job, task
+
+
+CALLS = []
+
+
+@task('tests.succeed', "test", period_task=False)
+def succeed(job, value):
+    CALLS.append(value)
+    return {'value': value}
+
+
+@task('tests.fail', "test", period_task=False)
+def fail(job):
+    raise RuntimeError("boom")
+
+
+@task('tests.invalid', "test", period_task=False)
+def invalid(job):
+    raise ValidationError("bad input")
+
+
+class JobQueueTests(TestCase):
+    """
+    برداشتن کار از صف، ثبت نتیجه و تلاش دوباره کارهای ناموفق.
+    """
+
+    def setUp(self):
+        CALLS.clear()
+
+    def test_oldest_due_job_is_claimed_once(self):
+        later = enqueue('tests.succeed', {'value': 2})
+        first = enqueue('tests.succeed', {'value': 1}, run_after=timezone.now() - datetime.timedelta(minutes=1))
+        enqueue('tests.succeed', {'value': 3}, run_after=timezone.now() + datetime.timedelta(hours=1))
+
+        claimed = claim_next('worker-1')
+        self.assertEqual(claimed.pk, first.pk)
+        self.assertEqual((claimed.status, claimed.locked_by), (Job.STATUS_RUNNING, 'worker-1'))
+        self.assertEqual(claim_next('worker-2').pk, later.pk)
+        # The remaining job is not due yet.
+        self.assertIsNone(claim_next('worker-3'))
+
+    def test_success_stores_the_result(self):
+        job = enqueue('tests.succeed', {'value': 7})
+        self.assertTrue(run_job(claim_next('test')))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_SUCCEEDED)
+        self.assertEqual(job.result, {'value': 7})
+        self.assertEqual((job.attempts, job.locked_by), (1, ''))
+        self.assertEqual(CALLS, [7])
+
+    def test_failure_is_retried_with_backoff_until_max_attempts(self):
+        job = enqueue('tests.fail')
+        for attempt in range(1, job.max_attempts):
+            before = timezone.now()
+            with self.assertLogs('jobs.queue', 'ERROR'):
+                self.assertFalse(run_job(claim_next('test')))
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.attempts), (Job.STATUS_QUEUED, attempt))
+            delay = datetime.timedelta(seconds=RETRY_BASE_DELAY * 2 ** (attempt - 1))
+            self.assertGreaterEqual(job.run_after, before + delay)
+            Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+
+        with self.assertLogs('jobs.queue', 'ERROR'):
+            self.assertFalse(run_job(claim_next('test')))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.STATUS_FAILED, job.max_attempts))
+        self.assertIn("boom", job.message)
+        self.assertIsNotNone(job.finished_at)
+
+    def test_validation_error_fails_at_once(self):
+        job = enqueue('tests.invalid')
+        self.assertFalse(run_job(claim_next('test')))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.message), (Job.STATUS_FAILED, 1, "bad input"))
+
+    def test_unknown_task_fails_without_retry(self):
+        job = Job.objects.create(task='tests.missing')
+        with self.assertLogs('jobs.queue', 'ERROR'):
+            self.assertFalse(run_job(claim_next('test')))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_FAILED)
+
+    def test_stale_running_job_is_requeued(self):
+        job = enqueue('tests.succeed', {'value': 1})
+        claim_next('dead-worker')
+        self.assertEqual(requeue_stale(), 0)
+        Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - STALE_AFTER - datetime.timedelta(seconds=1))
+        self.assertEqual(requeue_stale(), 1)
+        self.assertEqual(claim_next('worker').pk, job.pk)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class WorkRecordImportTaskTests(TestCase):
+    """
+    فایل بارگذاری شده تا آخرین تلاش نگه داشته و پس از آن حذف می‌شود.
+    """
+
+    def enqueue_import(self):
+        upload = default_storage.save('imports/work_records/test.csv', ContentFile(b"national_code\n"))
+        job = enqueue('hr.work_record_import', {'upload': upload, 'filename': 'records.csv'})
+        return job, upload
+
+    def test_upload_is_kept_for_a_retry_and_deleted_after_the_last_attempt(self):
+        job, upload = self.enqueue_import()
+        with mock.patch('hr.work_record_import.import_work_records', side_effect=RuntimeError("boom")), \
+                self.assertLogs('jobs.queue', 'ERROR'):
+            for _attempt in range(job.max_attempts - 1):
+                run_job(claim_next('test'))
+                self.assertTrue(default_storage.exists(upload))
+                Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+            run_job(claim_next('test'))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_FAILED)
+        self.assertFalse(default_storage.exists(upload))
+
+    def test_upload_is_deleted_after_a_validation_error(self):
+        job, upload = self.enqueue_import()
+        with mock.patch('hr.work_record_import.import_work_records', side_effect=ValidationError("bad file")):
+            run_job(claim_next('test'))
+        self.assertFalse(default_storage.exists(upload))
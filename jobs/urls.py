@@ -0,0 +1,18 @@
+from django.urls import path
+
+from .views import JobDetailView, JobEnqueueView, JobFileView, JobListView, JobStatusView
+
+app_name = 'jobs'  # Namespace for this app's URLs
+
+urlpatterns = [
+    path('', JobListView.as_view(), name='job_list'),
+    # Queue a period task, e.g. POST /jobs/organization/1/period/5/payroll.run/
+    path(
+        'organization/<int:organization_pk>/period/<int:financial_period_pk>/<str:task>/',
+        JobEnqueueView.as_view(),
+        name='job_enqueue'
+    ),
+    path('<int:pk>/', JobDetailView.as_view(), name='job_detail'),
+    path('<int:pk>/status/', JobStatusView.as_view(), name='job_status'),
+    path('<int:pk>/files/<int:index>/', JobFileView.as_view(), name='job_file'),
+]
@@ -0,0 +1,140 @@
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, JsonResponse
+from django.shortcuts import get_object_or_404, redirect
+from django.urls import reverse
+from django.utils.translation import gettext as _
+from django.views.generic import DetailView, ListView, View
+
+from accounting_salary.mixins import OrganizationPeriodMixin, RelatedObjectsMixin
+from accounting_salary.pagination import KeysetPaginationMixin
+
+from .models import Job
+from .queue import enqueue, get_task
+
+
+# Extra POST fields a period task accepts, passed through as job parameters.
+TASK_OPTIONS = {
+    'salaries.bank_transfer': {'file_format': ('csv', 'paya')},
+    'reports.payslips': {'merged': ('0', '1')},
+}
+
+
+def job_as_dict(job):
+    files = (job.result or {}).get('files', [])
+    return {
+        'id': job.pk,
+        'task': job.task,
+        'status': job.status,
+        'status_display': job.get_status_display(),
+        'progress_done': job.progress_done,
+        'progress_total': job.progress_total,
+        'percent': job.percent,
+        'attempts': job.attempts,
+        'message': job.message if job.status == Job.STATUS_FAILED else '',
+        'finished': job.is_finished,
+        'files': [
+            {'name': name.rsplit('/', 1)[-1], 'url': reverse('jobs:job_file', kwargs={'pk': job.pk, 'index': index})}
+            for index, name in enumerate(files)
+        ],
+    }
+
+
+class JobOwnerMixin(UserPassesTestMixin):
+    """
+    Jobs are visible to the user who queued them, and to staff/superusers.
+    """
+
+    def test_func(self):
+        user = self.request.user
+        self.job = get_object_or_404(Job, pk=self.kwargs['pk'])
+        return user.is_staff or user.is_superuser or self.job.created_by_id == user.pk
+
+
+class JobEnqueueView(LoginRequiredMixin, OrganizationPeriodMixin, UserPassesTestMixin, View):
+    """
+    قرار دادن یک کار دوره‌ای (محاسبه حقوق، فیش‌ها، خروجی‌ها) در صف کارها.
+    پس از ثبت، کاربر به صفحه وضعیت کار هدایت می‌شود (یا برای درخواست JSON،
+    شناسه کار و آدرس وضعیت برگردانده می‌شود).
+    """
+    http_method_names = ['post']
+
+    def test_func(self):
+        self.task = get_task(self.kwargs['task'])
+        if self.task is None or not self.task.period_task:
+            raise Http404(_("نوع کار نامعتبر است."))
+        return super().test_func()
+
+    def get_organization_permission(self):
+        return self.task.permission
+
+    def post(self, request, *args, **kwargs):
+        params = {'organization': self.organization.pk, 'financial_period': self.financial_period.pk}
+        for name, choices in TASK_OPTIONS.get(self.task.name, {}).items():
+            value = request.POST.get(name)
+            if value in choices:
+                params[name] = value == '1' if choices == ('0', '1') else value
+        job = enqueue(self.task.name, params, user=request.user, organization=self.organization)
+
+        status_url = reverse('jobs:job_status', kwargs={'pk': job.pk})
+        if 'application/json' in request.headers.get('Accept', ''):
+            return JsonResponse({'id': job.pk, 'status_url': status_url}, status=202)
+        return redirect('jobs:job_detail', pk=job.pk)
+
+
+class JobListView(LoginRequiredMixin, RelatedObjectsMixin, KeysetPaginationMixin, ListView):
+    """
+    لیست کارهای پس‌زمینه کاربر (برای کارکنان و مدیران: همه کارها).
+    """
+    model = Job
+    template_name = 'jobs/job_list.html'
+    context_object_name = 'jobs'
+    keyset_page_size = 50
+    list_select_related = ('organization', 'created_by')
+
+    def get_queryset(self):
+        user = self.request.user
+        queryset = Job.objects.all()
+        if not (user.is_staff or user.is_superuser):
+            queryset = queryset.filter(created_by=user)
+        return queryset
+
+
+class JobDetailView(LoginRequiredMixin, JobOwnerMixin, DetailView):
+    """
+    صفحه وضعیت یک کار؛ وضعیت تا پایان کار به صورت دوره‌ای از JobStatusView خوانده می‌شود.
+    """
+    model = Job
+    template_name = 'jobs/job_detail.html'
+    context_object_name = 'job'
+
+    def get_object(self, queryset=None):
+        return self.job
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['job_data'] = job_as_dict(self.job)
+        return context
+
+
+class JobStatusView(LoginRequiredMixin, JobOwnerMixin, View):
+    """
+    وضعیت و پیشرفت یک کار به صورت JSON (برای نظرسنجی از صفحه).
+    """
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse(job_as_dict(self.job))
+
+
+class JobFileView(LoginRequiredMixin, JobOwnerMixin, View):
+    """
+    دریافت یکی از فایل‌های خروجی یک کار انجام شده.
+    """
+
+    def get(self, request, *args, **kwargs):
+        files = (self.job.result or {}).get('files', [])
+        index = self.kwargs['index']
+        if self.job.status != Job.STATUS_SUCCEEDED or index >= len(files) or not default_storage.exists(files[index]):
+            raise Http404(_("فایل یافت نشد."))
+        name = files[index]
+        return FileResponse(default_storage.open(name, 'rb'), as_attachment=True, filename=name.rsplit('/', 1)[-1])
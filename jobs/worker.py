@@ -0,0 +1,26 @@
+"""
+Entry points of worker processes started by the run_jobs command.
+
+Kept free of model imports at module level: processes are spawned, so this
+module is imported before Django is set up in the child.
+"""
+import signal
+
+
+def run_worker(**options):
+    """
+    Runs the worker loop in this process; SIGTERM lets the current job
+    finish before the worker exits.
+    """
+    from .queue import work
+
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopping.append(signum))
+    return work(stop=lambda: bool(stopping), **options)
+
+
+def worker_process(options):
+    import django
+
+    django.setup()
+    return run_worker(**options)
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from loans.models import EmployeeLoan
+from loans.schedule import generate_schedule
+
+
+class Command(BaseCommand):
+    help = "ساخت (یا بازسازی) جدول اقساط وام‌های تسویه نشده"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--organization', type=int,
+            help="Only loans of this organization pk.",
+        )
+
+    def handle(self, *args, **options):
+        loans = EmployeeLoan.objects.filter(is_settled=False).order_by('pk')
+        if options['organization']:
+            loans = loans.filter(organization_id=options['organization'])
+
+        started = time.perf_counter()
+        count = installments = 0
+        for loan in loans.iterator(chunk_size=1000):
+            installments += generate_schedule(loan)
+            count += 1
+        self.stdout.write(
+            f"Loans: {count}, unpaid installments: {installments} ({time.perf_counter() - started:.2f}s)"
+        )
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.1 on 2026-10-18 18:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('employees', '0003_delete_organization'),
+        ('organizations', '0001_initial'),
+        ('salaries', '0002_payrollresultline_loan_deductions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmployeeLoan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('loan_amount', models.DecimalField(decimal_places=2, max_digits=15, verbose_name='مبلغ وام دریافتی')),
+                ('first_installment_date', models.DateField(verbose_name='تاریخ اولین قسط')),
+                ('last_installment_date', models.DateField(verbose_name='تاریخ آخرین قسط')),
+                ('monthly_installment_amount', models.DecimalField(decimal_places=2, max_digits=15, verbose_name='مبلغ هر قسط')),
+                ('is_settled', models.BooleanField(default=False, help_text='آیا این وام به طور کامل تسویه شده است؟', verbose_name='تسویه شده؟')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='تاریخ ثبت')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='تاریخ به\u200cروزرسانی')),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='employee_loans', to='employees.employee', verbose_name='کارمند')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='employee_loans', to='organizations.organization', verbose_name='سازمان')),
+            ],
+            options={
+                'verbose_name': 'وام کارمند',
+                'verbose_name_plural': 'وام\u200cهای کارکنان',
+                'ordering': ['employee', '-first_installment_date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='LoanInstallment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('installment_number', models.PositiveIntegerField(verbose_name='شماره قسط')),
+                ('due_date', models.DateField(verbose_name='تاریخ سررسید')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=15, verbose_name='مبلغ قسط')),
+                ('is_paid', models.BooleanField(default=False, verbose_name='پرداخت شده؟')),
+                ('paid_at', models.DateTimeField(blank=True, null=True, verbose_name='زمان پرداخت')),
+                ('loan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='installments', to='loans.employeeloan', verbose_name='وام')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='loan_installments', to='organizations.organization', verbose_name='سازمان')),
+                ('payroll_run', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='loan_installments', to='salaries.payrollrun', verbose_name='اجرای حقوق کسرکننده')),
+            ],
+            options={
+                'verbose_name': 'قسط وام',
+                'verbose_name_plural': 'اقساط وام',
+                'ordering': ['loan', 'installment_number'],
+                'indexes': [models.Index(fields=['organization', 'due_date'], name='loan_inst_org_due_idx')],
+                'constraints': [models.UniqueConstraint(fields=('loan', 'installment_number'), name='unique_loan_installment_number')],
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.1 on 2026-10-18 18:05
+
+from django.db import migrations, models
+from django.db.models import Count, DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_balances(apps, schema_editor):
+    """Start existing loans from the installments already marked paid."""
+    EmployeeLoan = apps.get_model('loans', 'EmployeeLoan')
+    LoanInstallment = apps.get_model('loans', 'LoanInstallment')
+    paid = LoanInstallment.objects.filter(loan=OuterRef('pk'), is_paid=True).order_by().values('loan')
+    EmployeeLoan.objects.update(
+        outstanding_balance=F('loan_amount') - Coalesce(
+            Subquery(paid.annotate(total=Sum('amount')).values('total')),
+            Value(0),
+            output_field=DecimalField(max_digits=15, decimal_places=2),
+        ),
+        paid_installments_count=Coalesce(Subquery(paid.annotate(count=Count('pk')).values('count')), Value(0)),
+    )
+    EmployeeLoan.objects.filter(is_settled=True).update(outstanding_balance=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loans', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employeeloan',
+            name='outstanding_balance',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=15, verbose_name='مانده وام'),
+        ),
+        migrations.AddField(
+            model_name='employeeloan',
+            name='paid_installments_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='تعداد اقساط پرداخت شده'),
+        ),
+        migrations.RunPython(backfill_balances, migrations.RunPython.noop),
+    ]
@@ -41,6 +41,20 @@ class EmployeeLoan(models.Model):
         verbose_name=_("تسویه شده؟"),
         help_text=_("آیا این وام به طور کامل تسویه شده است؟")
     )
+    # Running balance, maintained by loans.schedule whenever installments are
+    # posted, so lists and reports never aggregate over installments.
+    outstanding_balance = models.DecimalField(
+        max_digits=15,
+        decimal_places=2,
+        default=0,
+        editable=False,
+        verbose_name=_("مانده وام")
+    )
+    paid_installments_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name=_("تعداد اقساط پرداخت شده")
+    )
 
     created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("تاریخ ثبت"))
     updated_at = models.DateTimeField(auto_now=True, verbose_name=_("تاریخ به‌روزرسانی"))
@@ -55,7 +69,62 @@ class EmployeeLoan(models.Model):
     def __str__(self):
         return f"وام به {self.employee} در {self.organization.name} (مبلغ: {self.loan_amount}, تسویه: {self.is_settled})"
 
-    # Optional: Add properties for calculated fields if needed, e.g., total paid, remaining balance
-    # This would require a separate model for payments if you need to track individual payments.
-    # Based on current requirements, only the total loan and installment amount are needed.
+    @property
+    def paid_amount(self):
+        return self.loan_amount - self.outstanding_balance
+
+
+class LoanInstallment(models.Model):
+    """
+    یک قسط از جدول اقساط وام کارمند.
+    جدول اقساط از روی تاریخ اولین و آخرین قسط و مبلغ هر قسط ساخته می‌شود
+    (loans.schedule) و اقساط سررسید یک دوره مالی در محاسبه حقوق به عنوان کسر
+    منظور و با بستن اجرای حقوق آن دوره پرداخت شده علامت‌گذاری می‌شوند.
+    """
+    loan = models.ForeignKey(
+        EmployeeLoan,
+        on_delete=models.CASCADE,
+        related_name='installments',
+        verbose_name=_("وام")
+    )
+    # Copied from the loan so the deductions of a period are one index range scan.
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.CASCADE,
+        related_name='loan_installments',
+        verbose_name=_("سازمان")
+    )
+    installment_number = models.PositiveIntegerField(verbose_name=_("شماره قسط"))
+    due_date = models.DateField(verbose_name=_("تاریخ سررسید"))
+    amount = models.DecimalField(
+        max_digits=15,
+        decimal_places=2,
+        verbose_name=_("مبلغ قسط")
+    )
+    is_paid = models.BooleanField(default=False, verbose_name=_("پرداخت شده؟"))
+    paid_at = models.DateTimeField(blank=True, null=True, verbose_name=_("زمان پرداخت"))
+    payroll_run = models.ForeignKey(
+        'salaries.PayrollRun',
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='loan_installments',
+        verbose_name=_("اجرای حقوق کسرکننده")
+    )
+
+    class Meta:
+        verbose_name = _("قسط وام")
+        verbose_name_plural = _("اقساط وام")
+        constraints = [
+            models.UniqueConstraint(
+                fields=['loan', 'installment_number'],
+                name='unique_loan_installment_number'
+            )
+        ]
+        indexes = [
+            models.Index(fields=['organization', 'due_date'], name='loan_inst_org_due_idx'),
+        ]
+        ordering = ['loan', 'installment_number']
 
+    def __str__(self):
+        return f"قسط {self.installment_number} {self.loan.employee}: {self.amount} ({self.due_date})"
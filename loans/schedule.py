@@ -0,0 +1,171 @@
+"""
+جدول اقساط وام‌ها و کسر آن‌ها از حقوق.
+
+اقساط یک وام یک بار (در ذخیره وام) به صورت ردیف‌های LoanInstallment ساخته
+می‌شوند؛ سررسیدها ماه به ماه شمسی از تاریخ اولین قسط تا تاریخ آخرین قسط هستند.
+پس از آن اقساط سررسید یک دوره مالی برای تمام وام‌های یک سازمان با یک کوئری
+بازه‌ای روی ایندکس (organization, due_date) به دست می‌آیند و با بستن اجرای حقوق
+دوره با یک UPDATE پرداخت شده علامت‌گذاری می‌شوند.
+
+مانده هر وام (outstanding_balance) و تعداد اقساط پرداخت شده آن روی خود وام
+نگهداری می‌شوند و در همان تراکنشی که اقساط ثبت می‌شوند به‌روز می‌شوند.
+"""
+from decimal import Decimal
+
+import jdatetime
+from django.db import transaction
+from django.db.models import Count, Exists, F, Max, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import EmployeeLoan, LoanInstallment
+
+
+ZERO = Decimal('0')
+
+
+def add_jalali_months(date, months):
+    """
+    Moves a Gregorian date by whole Jalali months, clamping the day to the
+    length of the target month (e.g. 31 Shahrivar + 1 month -> 30 Mehr).
+    """
+    jalali = jdatetime.date.fromgregorian(date=date)
+    month_index = jalali.month - 1 + months
+    year, month = jalali.year + month_index // 12, month_index % 12 + 1
+    day = jalali.day
+    while True:
+        try:
+            return jdatetime.date(year, month, day).togregorian()
+        except ValueError:
+            day -= 1
+
+
+def build_schedule(loan, paid_count=0, paid_amount=ZERO):
+    """
+    [(installment number, due date, amount)] for a loan. Every installment is
+    the monthly amount; the last one due absorbs the remainder so the schedule
+    always adds up to the loan amount.
+
+    paid_count / paid_amount: installments already paid; the schedule then
+    continues from installment paid_count + 1 with the unpaid balance.
+    """
+    schedule = []
+    remaining = loan.loan_amount - paid_amount
+    number = paid_count
+    due_date = add_jalali_months(loan.first_installment_date, number)
+    while due_date <= loan.last_installment_date and remaining > ZERO:
+        next_due_date = add_jalali_months(loan.first_installment_date, number + 1)
+        if next_due_date > loan.last_installment_date:
+            amount = remaining
+        else:
+            amount = min(loan.monthly_installment_amount, remaining)
+        number += 1
+        schedule.append((number, due_date, amount))
+        remaining -= amount
+        due_date = next_due_date
+    return schedule
+
+
+def generate_schedule(loan):
+    """
+    Rebuilds the unpaid part of the loan's schedule from the unpaid balance
+    and resets the loan's running balance; paid installments are kept as they
+    are. A settled loan has no unpaid installments and nothing outstanding.
+    Returns the number of unpaid installments created.
+    """
+    installments = LoanInstallment.objects.filter(loan=loan)
+    with transaction.atomic():
+        paid = installments.filter(is_paid=True).aggregate(
+            last_number=Max('installment_number'),
+            count=Count('pk'),
+            amount=Sum('amount'),
+        )
+        installments.filter(is_paid=False).delete()
+        loan.paid_installments_count = paid['count']
+        loan.outstanding_balance = ZERO if loan.is_settled else loan.loan_amount - (paid['amount'] or ZERO)
+        # update() rather than save(): no post_save, so this does not re-enter the signal.
+        EmployeeLoan.objects.filter(pk=loan.pk).update(
+            paid_installments_count=loan.paid_installments_count,
+            outstanding_balance=loan.outstanding_balance,
+        )
+        if loan.is_settled:
+            return 0
+        created = LoanInstallment.objects.bulk_create([
+            LoanInstallment(
+                loan=loan,
+                organization_id=loan.organization_id,
+                installment_number=number,
+                due_date=due_date,
+                amount=amount,
+            )
+            for number, due_date, amount in build_schedule(
+                loan,
+                paid_count=paid['last_number'] or 0,
+                paid_amount=paid['amount'] or ZERO,
+            )
+        ])
+    return len(created)
+
+
+def installments_due(organization, financial_period):
+    """
+    Unpaid installments of every loan of the organization falling due in the period.
+    """
+    return LoanInstallment.objects.filter(
+        organization=organization,
+        due_date__gte=financial_period.start_date,
+        due_date__lte=financial_period.end_date,
+        is_paid=False,
+    )
+
+
+def deductions_by_employee(organization, financial_period, employee_ids=None):
+    """
+    (employee id, total installment amount) pairs for the period, in one grouped query.
+    """
+    installments = installments_due(organization, financial_period)
+    if employee_ids is not None:
+        installments = installments.filter(loan__employee_id__in=employee_ids)
+    return installments.values_list('loan__employee_id').annotate(total=Sum('amount')).order_by()
+
+
+def settle_installments(payroll_run):
+    """
+    Marks the period's installments of the employees paid by `payroll_run` as
+    paid and posts them to the loans' running balances; loans with no unpaid
+    installment left are flagged as settled. Returns the number of
+    installments marked paid.
+    """
+    installments = installments_due(payroll_run.organization, payroll_run.financial_period).filter(
+        Exists(payroll_run.lines.filter(employee_id=OuterRef('loan__employee_id'))),
+    )
+    with transaction.atomic():
+        loan_ids = set(installments.values_list('loan_id', flat=True))
+        paid = installments.update(is_paid=True, paid_at=timezone.now(), payroll_run=payroll_run)
+        post_installments(payroll_run, loan_ids)
+    return paid
+
+
+def post_installments(payroll_run, loan_ids):
+    """
+    Applies the installments paid by `payroll_run` to the balances of `loan_ids`
+    with one UPDATE; must run in the transaction that marked them paid.
+    """
+    posted = LoanInstallment.objects.filter(
+        loan=OuterRef('pk'),
+        payroll_run=payroll_run,
+    ).order_by().values('loan')
+    now = timezone.now()
+    loans = EmployeeLoan.objects.filter(pk__in=loan_ids)
+    loans.update(
+        outstanding_balance=F('outstanding_balance') - Coalesce(
+            Subquery(posted.annotate(total=Sum('amount')).values('total')), ZERO,
+        ),
+        paid_installments_count=F('paid_installments_count') + Coalesce(
+            Subquery(posted.annotate(count=Count('pk')).values('count')), 0,
+        ),
+        updated_at=now,
+    )
+    loans.filter(is_settled=False).exclude(
+        Exists(LoanInstallment.objects.filter(loan=OuterRef('pk'), is_paid=False)),
+    ).update(is_settled=True, updated_at=now)
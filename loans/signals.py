@@ -0,0 +1,12 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import EmployeeLoan
+from .schedule import generate_schedule
+
+
+# جدول اقساط همیشه با مبلغ و تاریخ‌های وام هماهنگ می‌ماند؛ اقساط پرداخت شده دست نمی‌خورند.
+
+@receiver(post_save, sender=EmployeeLoan)
+def employee_loan_saved(sender, instance, **kwargs):
+    generate_schedule(instance)
@@ -1,3 +1,60 @@
+import datetime
+from decimal import Decimal
+
 from django.test import TestCase
 
-# Create your tests here.
+from accounting_salary.testing import PayrollTestDataMixin
+from salaries.payroll import close_payroll_run, run_payroll
+
+from .models import EmployeeLoan, LoanInstallment
+
+
+class ClosePayrollRunLoanTests(PayrollTestDataMixin, TestCase):
+    """
+    بستن اجرای حقوق باید اقساط سررسید دوره را پرداخت شده ثبت و مانده وام‌ها را به‌روز کند.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.employee = cls.create_employee()
+
+    def create_loan(self, loan_amount, last_installment_date):
+        # Monthly installments from 6 Farvardin 1403.
+        return EmployeeLoan.objects.create(
+            employee=self.employee,
+            organization=self.organization,
+            loan_amount=loan_amount,
+            first_installment_date=datetime.date(2024, 3, 25),
+            last_installment_date=last_installment_date,
+            monthly_installment_amount=Decimal('1000000'),
+        )
+
+    def close_period(self):
+        close_payroll_run(run_payroll(self.organization, self.financial_period))
+
+    def test_close_posts_installments_to_balance(self):
+        loan = self.create_loan(Decimal('3000000'), datetime.date(2024, 5, 26))
+        self.assertEqual(loan.installments.count(), 3)
+
+        self.close_period()
+
+        loan.refresh_from_db()
+        self.assertEqual(loan.outstanding_balance, Decimal('2000000.00'))
+        self.assertEqual(loan.paid_installments_count, 1)
+        self.assertEqual(loan.paid_amount, Decimal('1000000.00'))
+        self.assertFalse(loan.is_settled)
+        self.assertEqual(
+            list(loan.installments.filter(is_paid=True).values_list('installment_number', flat=True)), [1],
+        )
+
+    def test_close_settles_loan_paid_in_full(self):
+        loan = self.create_loan(Decimal('1000000'), datetime.date(2024, 3, 25))
+
+        self.close_period()
+
+        loan.refresh_from_db()
+        self.assertEqual(loan.outstanding_balance, Decimal('0.00'))
+        self.assertEqual(loan.paid_installments_count, 1)
+        self.assertTrue(loan.is_settled)
+        self.assertFalse(LoanInstallment.objects.filter(loan=loan, is_paid=False).exists())
@@ -20,26 +20,18 @@ from .forms import EmployeeLoanForm
 from employees.models import Employee
 from organizations.models import Organization
 
-# Import CustomUser model for permission checks
-from users.models import CustomUser # Assuming CustomUser is in users.models
+# Organization-level permission checks (resolved once per request)
+from users.permissions import has_org_permission, org_ids_with_permission
+from accounting_salary.pagination import KeysetPaginationMixin
+from accounting_salary.mixins import RelatedObjectsMixin
 from django.utils.translation import gettext as _
 
 
-# Helper function to check organization-specific permission (can be defined in users app and imported)
-def has_org_permission(user, organization, perm_name):
-    """
-    Checks if the user has the specified permission in the given organization.
-    Assumes user is an instance of CustomUser with the has_organization_permission method.
-    """
-    if not isinstance(user, CustomUser):
-        # Handle cases where user is not CustomUser (e.g., AnonymousUser)
-        return False
-    return user.has_organization_permission(organization, perm_name)
 
 
 # --- Views for EmployeeLoan ---
 
-class EmployeeLoanListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
+class EmployeeLoanListView(LoginRequiredMixin, UserPassesTestMixin, RelatedObjectsMixin, KeysetPaginationMixin, ListView):
     """
     نمایش لیست وام‌های کارکنان.
     نیاز به ورود به سیستم و مجوز مشاهده وام‌ها (در سازمان مربوطه) دارد.
@@ -48,7 +40,8 @@ class EmployeeLoanListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
     model = EmployeeLoan
     template_name = 'loans/employeeloan_list.html'
     context_object_name = 'employee_loans'
-    # paginate_by = 10
+    keyset_page_size = 50
+    list_select_related = ('employee', 'organization')
 
     def test_func(self):
         # Check if the user has the general 'view_employeeloan' permission or is staff/superuser
@@ -89,10 +82,7 @@ class EmployeeLoanListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
 
         else:
             # If no specific filter, show only loans in organizations the user has permission to view them in
-            user_accessible_org_ids = [
-                org.pk for org in Organization.objects.all() # Or a subset of organizations
-                if has_org_permission(self.request.user, org, 'loans.view_employeeloan')
-            ]
+            user_accessible_org_ids = org_ids_with_permission(self.request.user, 'loans.view_employeeloan')
             queryset = queryset.filter(organization__pk__in=user_accessible_org_ids)
 
 
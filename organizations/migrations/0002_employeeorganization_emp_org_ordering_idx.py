@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 17:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0004_employee_employee_name_idx'),
+        ('organizations', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='employeeorganization',
+            index=models.Index(fields=['organization', 'employee', 'start_date'], name='emp_org_ordering_idx'),
+        ),
+    ]
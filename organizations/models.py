@@ -2,7 +2,8 @@ from django.db import models
 from django.conf import settings # برای ارجاع به مدل User جنگو
 from django.utils.translation import gettext_lazy as _ # برای استفاده از ترجمه در verbose_name
 from django.core.exceptions import ValidationError # برای اعتبارسنجی در متد clean()
-from django.db.models import Q # برای استفاده در clean()
+
+from accounting_salary.intervals import OverlapValidator
 
 # مدل اصلی سازمان
 class Organization(models.Model):
@@ -63,6 +64,13 @@ class EmployeeOrganization(models.Model):
              # بررسی عدم همپوشانی بازه‌های زمانی در متد clean() انجام می‌شود.
         ]
         ordering = ['organization', 'employee', 'start_date'] # مرتب سازی پیش فرض
+        # The unique constraint leads with employee, so it cannot serve the
+        # per-organization lookups of payroll, the grid and the lists. Most
+        # memberships are active, so is_active is left out of the index.
+        indexes = [
+            # Organization filter + default ordering; also the period-overlap scans.
+            models.Index(fields=['organization', 'employee', 'start_date'], name='emp_org_ordering_idx'),
+        ]
 
     # def clean(self):
     #     """
@@ -104,19 +112,14 @@ class EmployeeOrganization(models.Model):
         if self.start_date and self.end_date and self.start_date > self.end_date:
             raise ValidationError(_("تاریخ شروع عضویت نمی‌تواند بعد از تاریخ پایان باشد."))
 
-        if self.employee and self.organization and self.start_date:
-            overlapping_memberships = EmployeeOrganization.objects.filter(
-                employee=self.employee,
-                organization=self.organization
-            ).filter(
-                # ترکیب صحیح شروط همپوشانی:
-                (Q(end_date__gte=self.start_date) | Q(end_date__isnull=True)) &
-                (Q(start_date__lte=self.end_date) | Q(end_date__isnull=True))
-            ).exclude(pk=self.pk)
-
-            if overlapping_memberships.exists():
-                raise ValidationError(_("این بازه عضویت با یک بازه عضویت موجود برای این کارمند در این سازمان همپوشانی دارد."))
+        membership_overlaps.validate([self])
 
     def __str__(self):
         return f"{self.employee} در {self.organization} ({self.start_date} - {self.end_date if self.end_date else 'تاکنون'})"
 
+
+membership_overlaps = OverlapValidator(
+    EmployeeOrganization,
+    key_fields=['employee', 'organization'],
+    message=_("این بازه عضویت با یک بازه عضویت موجود برای این کارمند در این سازمان همپوشانی دارد."),
+)
@@ -13,24 +13,16 @@ from django.utils.translation import gettext as _
 from .models import Organization, EmployeeOrganization
 from .forms import OrganizationForm, EmployeeOrganizationForm
 
-# Import CustomUser model to use has_organization_permission method
-from users.models import CustomUser # Assuming CustomUser is in users.models
+# Organization-level permission checks (resolved once per request)
+from users.permissions import has_org_permission, get_permission_resolver
+from accounting_salary.pagination import KeysetPaginationMixin
+from accounting_salary.mixins import RelatedObjectsMixin
 
-# Helper function to check organization-specific permission (can be defined in users app and imported)
-def has_org_permission(user, organization, perm_name):
-    """
-    Checks if the user has the specified permission in the given organization.
-    Assumes user is an instance of CustomUser with the has_organization_permission method.
-    """
-    if not isinstance(user, CustomUser):
-        # Handle cases where user is not CustomUser (e.g., AnonymousUser)
-        return False
-    return user.has_organization_permission(organization, perm_name)
 
 
 # ویوهای مدیریت سازمان‌ها (Organization)
 
-class OrganizationListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
+class OrganizationListView(LoginRequiredMixin, UserPassesTestMixin, KeysetPaginationMixin, ListView):
     """
     نمایش لیست تمامی سازمان‌ها.
     نیاز به ورود به سیستم و مجوز مشاهده سازمان‌ها دارد.
@@ -38,7 +30,7 @@ class OrganizationListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
     model = Organization
     template_name = 'organizations/organization_list.html'
     context_object_name = 'organizations'
-    # paginate_by = 10 # اضافه کردن صفحه بندی (اختیاری)
+    keyset_page_size = 50
 
     def test_func(self):
         # Check if the user has the general 'view_organization' permission or is staff/superuser
@@ -124,7 +116,7 @@ class OrganizationDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView
 
 # ویوهای مدیریت عضویت کارمند در سازمان (EmployeeOrganization)
 
-class EmployeeOrganizationListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
+class EmployeeOrganizationListView(LoginRequiredMixin, UserPassesTestMixin, RelatedObjectsMixin, KeysetPaginationMixin, ListView):
     """
     نمایش لیست عضویت‌های کارمندان در سازمان‌ها.
     نیاز به ورود به سیستم و مجوز مشاهده عضویت‌ها دارد.
@@ -133,7 +125,8 @@ class EmployeeOrganizationListView(LoginRequiredMixin, UserPassesTestMixin, List
     model = EmployeeOrganization
     template_name = 'organizations/employeeorganization_list.html'
     context_object_name = 'employee_organizations'
-    # paginate_by = 10 # اضافه کردن صفحه بندی (اختیاری)
+    keyset_page_size = 50
+    list_select_related = ('employee', 'organization')
 
     def test_func(self):
         # Check if the user has the general 'view_employeeorganization' permission or is staff/superuser
@@ -164,11 +157,8 @@ class EmployeeOrganizationListView(LoginRequiredMixin, UserPassesTestMixin, List
             # Check if user has permission to view memberships for this employee (might be complex)
             # For simplicity, let's assume if they can view the employee, they can view their memberships
             # This requires checking permission in any organization the employee belongs to.
-            user_can_view_employee = False
-            for emp_org in employee.employee_organizations.all():
-                 if has_org_permission(self.request.user, emp_org.organization, 'employees.view_employee'):
-                     user_can_view_employee = True
-                     break
+            employee_org_ids = employee.employee_organizations.values_list('organization_id', flat=True)
+            user_can_view_employee = get_permission_resolver(self.request.user).has_in_any(employee_org_ids, 'employees.view_employee')
             if not user_can_view_employee and not self.request.user.is_staff and not self.request.user.is_superuser:
                  messages.error(self.request, _("شما مجوز مشاهده عضویت‌های این کارمند را ندارید."))
                  return EmployeeOrganization.objects.none()
@@ -1,3 +1,62 @@
+from datetime import timedelta
+
 from django.contrib import admin
+from django.core.exceptions import PermissionDenied
+from django.http import JsonResponse
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from .instrumentation import summarize
+from .models import RequestMetric
 
 # Register your models here.
+
+
+class RequestMetricAdmin(admin.ModelAdmin):
+    """
+    Read-only list of the sampled requests, with a per-URL-name percentile
+    summary (summary/) and its JSON export (summary/?format=json).
+    """
+    change_list_template = 'admin/reports/requestmetric/change_list.html'
+    list_display = ['created_at', 'method', 'url_name', 'status_code', 'duration_ms', 'query_count',
+                    'db_time_ms', 'duplicate_queries', 'repeated_queries']
+    list_filter = ['method', 'status_code']
+    search_fields = ['url_name']
+    date_hierarchy = 'created_at'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        return [
+            path('summary/', self.admin_site.admin_view(self.summary_view), name='reports_requestmetric_summary'),
+        ] + super().get_urls()
+
+    def summary_view(self, request):
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        try:
+            hours = max(1, int(request.GET.get('hours', 24)))
+        except ValueError:
+            hours = 24
+        summary = summarize(
+            since=timezone.now() - timedelta(hours=hours),
+            url_name=request.GET.get('url_name') or None,
+        )
+        if request.GET.get('format') == 'json':
+            return JsonResponse({'hours': hours, 'summary': summary}, json_dumps_params={'ensure_ascii': False})
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': _("خلاصه کارایی درخواست‌ها"),
+            'hours': hours,
+            'summary': summary,
+        }
+        return TemplateResponse(request, 'admin/reports/requestmetric/summary.html', context)
+
+admin.site.register(RequestMetric, RequestMetricAdmin)
@@ -0,0 +1,262 @@
+"""
+اندازه‌گیری زمان پاسخ، تعداد و زمان کوئری‌های هر درخواست.
+
+میان‌افزار RequestMetricsMiddleware برای درصدی از درخواست‌ها
+(REQUEST_METRICS_SAMPLE_RATE) همه کوئری‌ها را با execute_wrapper می‌شمارد،
+کوئری‌های تکراری (همان SQL و همان پارامترها) و مشابه (همان SQL با پارامترهای
+دیگر، الگوی N+1) را تشخیص می‌دهد و نمونه را در یک بافر حلقوی در حافظه
+می‌گذارد. بافر هر REQUEST_METRICS_FLUSH_SIZE نمونه (یا هر
+REQUEST_METRICS_FLUSH_INTERVAL ثانیه) با یک bulk_create در جدول چرخشی
+RequestMetric نوشته می‌شود. نوشتن در یک رشته (thread) پس‌زمینه انجام می‌شود،
+پس درخواستی که بافر را پر می‌کند منتظر bulk_create و حذف ردیف‌های قدیمی
+نمی‌ماند و سربار هر درخواست فقط شمارش در حافظه است. با
+REQUEST_METRICS_BACKGROUND_FLUSH = False (مثلاً در تست‌ها) نوشتن در همان
+درخواست انجام می‌شود.
+
+summarize() صدک‌های زمان پاسخ را به تفکیک نام مسیر (مانند
+hr:monthlyworkrecord_list_by_org) محاسبه می‌کند؛ پنل ادمین RequestMetric آن را
+نمایش می‌دهد و به صورت JSON خروجی می‌دهد.
+"""
+import logging
+import random
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import ExitStack
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.utils import timezone
+
+from .models import RequestMetric
+
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = getattr(settings, 'REQUEST_METRICS_SAMPLE_RATE', 1.0)
+BUFFER_SIZE = getattr(settings, 'REQUEST_METRICS_BUFFER_SIZE', 1000)
+FLUSH_SIZE = getattr(settings, 'REQUEST_METRICS_FLUSH_SIZE', 50)
+FLUSH_INTERVAL = getattr(settings, 'REQUEST_METRICS_FLUSH_INTERVAL', 60)  # seconds
+BACKGROUND_FLUSH = getattr(settings, 'REQUEST_METRICS_BACKGROUND_FLUSH', True)
+RETENTION = getattr(settings, 'REQUEST_METRICS_RETENTION', timedelta(days=7))
+SLOW_REQUEST_MS = getattr(settings, 'REQUEST_METRICS_SLOW_MS', 1000)
+EXCLUDED_PREFIXES = getattr(settings, 'REQUEST_METRICS_EXCLUDED_PREFIXES', ('/static/', '/media/'))
+
+PERCENTILES = (50, 90, 95, 99)
+SQL_PREVIEW_LENGTH = 500
+UNRESOLVED = '<unresolved>'
+
+
+class QueryRecorder:
+    """
+    Database execute wrapper counting the queries of one request, their time
+    and how often the same statement runs again.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = Counter()
+        self.executions = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+            self.statements[sql] += 1
+            if not many:
+                self.executions[(sql, repr(params))] += 1
+
+    @property
+    def duplicate_queries(self):
+        return sum(count - 1 for count in self.executions.values() if count > 1)
+
+    @property
+    def repeated_queries(self):
+        return sum(count - 1 for count in self.statements.values() if count > 1)
+
+    def top_repeated_sql(self):
+        if not self.statements:
+            return ''
+        sql, count = self.statements.most_common(1)[0]
+        return sql[:SQL_PREVIEW_LENGTH] if count > 1 else ''
+
+
+class MetricBuffer:
+    """
+    Fixed-size in-memory ring buffer of unsaved RequestMetric rows. When it
+    overflows before a flush the oldest samples are dropped.
+
+    With `background` the writes happen on a daemon flusher thread, started
+    on first use (so after a fork in each worker process); the request
+    thread only appends and wakes it.
+    """
+
+    def __init__(self, size=BUFFER_SIZE, background=BACKGROUND_FLUSH):
+        self.samples = deque(maxlen=size)
+        self.lock = threading.Lock()
+        self.last_flush = time.monotonic()
+        self.background = background
+        self.wakeup = threading.Event()
+        self.flusher = None
+
+    def add(self, metric):
+        self.samples.append(metric)
+        if len(self.samples) >= FLUSH_SIZE or time.monotonic() - self.last_flush >= FLUSH_INTERVAL:
+            if self.background:
+                self.wake_flusher()
+            else:
+                self.flush()
+
+    def wake_flusher(self):
+        with self.lock:
+            if self.flusher is None or not self.flusher.is_alive():
+                self.flusher = threading.Thread(target=self.run_flusher, name='request-metrics-flush', daemon=True)
+                self.flusher.start()
+        self.wakeup.set()
+
+    def run_flusher(self):
+        """
+        Flusher thread loop: flushes when woken, and every FLUSH_INTERVAL
+        seconds so samples of a quiet process are written too.
+        """
+        while True:
+            self.wakeup.wait(FLUSH_INTERVAL)
+            self.wakeup.clear()
+            try:
+                self.flush()
+            finally:
+                # Connections are per thread; do not keep this one open between flushes.
+                connections.close_all()
+
+    def flush(self):
+        """
+        Writes the buffered samples and trims rows older than RETENTION.
+        Instrumentation never fails a request: database errors are logged.
+        """
+        with self.lock:
+            self.last_flush = time.monotonic()
+            batch = []
+            # popleft() is atomic, so samples appended meanwhile are kept for the next flush.
+            while self.samples:
+                batch.append(self.samples.popleft())
+        if not batch:
+            return 0
+        try:
+            RequestMetric.objects.bulk_create(batch)
+            RequestMetric.objects.filter(created_at__lt=timezone.now() - RETENTION).delete()
+        except DatabaseError:
+            logger.exception("Could not store %s request metrics", len(batch))
+            return 0
+        return len(batch)
+
+
+buffer = MetricBuffer()
+
+
+class RequestMetricsMiddleware:
+    """
+    Records latency, query count, database time and repeated queries of
+    sampled requests into the metric buffer. Place it near the top of
+    MIDDLEWARE so the measurement covers the other middleware too.
+    Streaming responses are measured up to the first byte.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if (SAMPLE_RATE <= 0 or request.path.startswith(EXCLUDED_PREFIXES)
+                or (SAMPLE_RATE < 1 and random.random() >= SAMPLE_RATE)):
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(recorder))
+            response = self.get_response(request)
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        match = getattr(request, 'resolver_match', None)
+        metric = RequestMetric(
+            # Unresolved paths (404s) share one name so scans cannot flood the table.
+            url_name=(match.view_name if match else UNRESOLVED)[:200],
+            method=request.method[:10],
+            status_code=response.status_code,
+            duration_ms=duration_ms,
+            query_count=recorder.count,
+            db_time_ms=recorder.seconds * 1000,
+            duplicate_queries=recorder.duplicate_queries,
+            repeated_queries=recorder.repeated_queries,
+            top_repeated_sql=recorder.top_repeated_sql(),
+        )
+        self.log(metric)
+        buffer.add(metric)
+        return response
+
+    def log(self, metric):
+        if metric.duration_ms >= SLOW_REQUEST_MS:
+            logger.warning(
+                "Slow request %s %s: %.0f ms, %s queries, %.0f ms in the database",
+                metric.method, metric.url_name, metric.duration_ms, metric.query_count, metric.db_time_ms,
+            )
+        if metric.duplicate_queries:
+            logger.info(
+                "%s %s ran %s duplicate queries, most repeated: %s",
+                metric.method, metric.url_name, metric.duplicate_queries, metric.top_repeated_sql[:200],
+            )
+
+
+# --- Summaries -----------------------------------------------------------------
+
+def percentile(sorted_values, percent):
+    """
+    Nearest-rank percentile of an ascending list.
+    """
+    if not sorted_values:
+        return None
+    rank = max(1, -(-percent * len(sorted_values) // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(since=None, url_name=None):
+    """
+    Per-URL-name summary of the stored samples since `since` (default: the
+    last 24 hours), slowest p95 first. Pending samples of this process are
+    flushed first.
+    """
+    buffer.flush()
+    if since is None:
+        since = timezone.now() - timedelta(hours=24)
+    rows = RequestMetric.objects.filter(created_at__gte=since)
+    if url_name:
+        rows = rows.filter(url_name=url_name)
+    grouped = defaultdict(list)
+    for row in rows.values_list(
+        'url_name', 'duration_ms', 'query_count', 'db_time_ms', 'duplicate_queries', 'repeated_queries',
+    ).order_by():
+        grouped[row[0]].append(row[1:])
+
+    summary = []
+    for name, samples in grouped.items():
+        durations = sorted(sample[0] for sample in samples)
+        queries = [sample[1] for sample in samples]
+        entry = {
+            'url_name': name,
+            'requests': len(samples),
+            **{f'p{percent}_ms': round(percentile(durations, percent), 2) for percent in PERCENTILES},
+            'max_ms': round(durations[-1], 2),
+            'avg_queries': round(sum(queries) / len(queries), 1),
+            'max_queries': max(queries),
+            'avg_db_ms': round(sum(sample[2] for sample in samples) / len(samples), 2),
+            'requests_with_duplicates': sum(1 for sample in samples if sample[3]),
+            'max_repeated_queries': max(sample[4] for sample in samples),
+        }
+        summary.append(entry)
+    summary.sort(key=lambda entry: entry['p95_ms'], reverse=True)
+    return summary
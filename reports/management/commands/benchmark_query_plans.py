@@ -0,0 +1,39 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from reports.query_plans import compare
+
+
+class Command(BaseCommand):
+    help = "مقایسه زمان و طرح اجرای کوئری‌های پرتکرار قبل و بعد از ایندکس‌های ترکیبی (بدون تغییر پایگاه داده)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--employees', type=int, default=20000,
+            help="Synthetic employees to load inside the rolled-back transaction (0: use the existing data).",
+        )
+        parser.add_argument('--repeat', type=int, default=5, help="Runs per query; the best time is reported.")
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--plans', action='store_true', help="Print the EXPLAIN output before and after.")
+
+    def handle(self, *args, **options):
+        try:
+            results = compare(
+                employees=options['employees'],
+                repeat=options['repeat'],
+                seed=options['seed'],
+                progress=self.stdout.write,
+            )
+        except ValidationError as exc:
+            raise CommandError(' '.join(exc.messages))
+
+        width = max(len(result['label']) for result in results)
+        self.stdout.write(f"{'query':{width}}  before ms  after ms  speedup")
+        for result in results:
+            speedup = result['before_ms'] / result['after_ms'] if result['after_ms'] else 0
+            self.stdout.write(
+                f"{result['label']:{width}}  {result['before_ms']:9.2f}  {result['after_ms']:8.2f}  {speedup:6.1f}x"
+            )
+            if options['plans']:
+                self.stdout.write(f"  before:\n    {result['before_plan'].replace(chr(10), chr(10) + '    ')}")
+                self.stdout.write(f"  after:\n    {result['after_plan'].replace(chr(10), chr(10) + '    ')}")
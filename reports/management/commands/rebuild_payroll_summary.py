@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from reports.summary import rebuild_period, summarized_periods
+
+
+class Command(BaseCommand):
+    help = "بازسازی جدول خلاصه حقوق از روی آیتم‌های حقوقی کارکنان"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--organization', type=int,
+            help="Only this organization pk.",
+        )
+        parser.add_argument(
+            '--period', type=int,
+            help="Only this financial period pk.",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        periods = rows = 0
+        for organization, financial_period in summarized_periods(options['organization'], options['period']):
+            period_started = time.perf_counter()
+            written = rebuild_period(organization, financial_period)
+            self.stdout.write(
+                f"  {organization.pk}/{financial_period.pk}: {written} rows ({time.perf_counter() - period_started:.2f}s)"
+            )
+            periods += 1
+            rows += written
+        self.stdout.write(f"Periods: {periods}, summary rows: {rows} ({time.perf_counter() - started:.2f}s)")
@@ -0,0 +1,79 @@
+import os
+import tempfile
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from organizations.models import Organization
+from settings_app.models import FinancialPeriod
+from reports.payslips import DEFAULT_BATCH_SIZE, render_payslips
+
+
+class Command(BaseCommand):
+    help = "صدور فیش‌های حقوقی PDF یک دوره مالی برای تمام کارکنان یک سازمان"
+
+    def add_arguments(self, parser):
+        parser.add_argument('organization_pk', type=int)
+        parser.add_argument('financial_period_pk', type=int)
+        parser.add_argument('--output', help="Directory for the PDF files.")
+        parser.add_argument(
+            '--workers', type=int, default=None,
+            help="Worker processes (default: number of CPUs; 1 renders in-process).",
+        )
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument(
+            '--merged', action='store_true',
+            help="Write one multi-page PDF per batch instead of one PDF per employee.",
+        )
+        parser.add_argument(
+            '--benchmark', action='store_true',
+            help="Render into temporary directories with 1, 2, 4, ... workers and report the speedup.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            organization = Organization.objects.get(pk=options['organization_pk'])
+            financial_period = FinancialPeriod.objects.get(pk=options['financial_period_pk'])
+        except (Organization.DoesNotExist, FinancialPeriod.DoesNotExist) as exc:
+            raise CommandError(str(exc))
+
+        render_options = {'batch_size': options['batch_size'], 'merged': options['merged']}
+        try:
+            if options['benchmark']:
+                self.benchmark(organization, financial_period, options['workers'] or os.cpu_count() or 1, render_options)
+                return
+            if not options['output']:
+                raise CommandError("--output is required unless --benchmark is given.")
+            paths, elapsed = render_payslips(
+                organization, financial_period, options['output'],
+                workers=options['workers'], progress=self.progress, **render_options
+            )
+        except ValidationError as exc:
+            raise CommandError(' '.join(exc.messages))
+        self.stdout.write(f"Wrote {len(paths)} files to {options['output']} ({elapsed:.2f}s)")
+
+    def progress(self, done, total):
+        self.stdout.write(f"  {done}/{total}")
+
+    def benchmark(self, organization, financial_period, max_workers, render_options):
+        counts = [1]
+        while counts[-1] * 2 <= max_workers:
+            counts.append(counts[-1] * 2)
+        if counts[-1] != max_workers:
+            counts.append(max_workers)
+
+        baseline = None
+        self.stdout.write("workers  seconds  payslips/s  speedup  efficiency")
+        for workers in counts:
+            rendered = {'done': 0}
+            with tempfile.TemporaryDirectory() as output_dir:
+                _paths, elapsed = render_payslips(
+                    organization, financial_period, output_dir, workers=workers,
+                    progress=lambda done, total: rendered.update(done=done), **render_options
+                )
+            baseline = baseline or elapsed
+            speedup = baseline / elapsed
+            self.stdout.write(
+                f"{workers:7d}  {elapsed:7.2f}  {rendered['done'] / elapsed:10.1f}  "
+                f"{speedup:7.2f}  {speedup / workers:10.0%}"
+            )
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.1 on 2026-10-18 18:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('hr', '0001_initial'),
+        ('organizations', '0001_initial'),
+        ('salaries', '0002_payrollresultline_loan_deductions'),
+        ('settings_app', '0002_alter_fiscalyear_organization'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PayrollSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_amount', models.DecimalField(decimal_places=2, default=0, max_digits=18, verbose_name='جمع مبالغ')),
+                ('item_count', models.IntegerField(default=0, verbose_name='تعداد آیتم\u200cها')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='تاریخ به\u200cروزرسانی')),
+                ('department', models.ForeignKey(blank=True, help_text='خالی: کارکنانی که در این دوره سابقه شغلی با دپارتمان ندارند.', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='payroll_summaries', to='hr.department', verbose_name='دپارتمان')),
+                ('financial_period', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payroll_summaries', to='settings_app.financialperiod', verbose_name='دوره مالی')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payroll_summaries', to='organizations.organization', verbose_name='سازمان')),
+                ('salary_item_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payroll_summaries', to='salaries.salaryitemtype', verbose_name='نوع آیتم حقوقی')),
+            ],
+            options={
+                'verbose_name': 'خلاصه حقوق',
+                'verbose_name_plural': 'خلاصه\u200cهای حقوق',
+                'ordering': ['organization', 'financial_period', 'department', 'salary_item_type'],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('department__isnull', False)), fields=('organization', 'financial_period', 'department', 'salary_item_type'), name='unique_payroll_summary_key'), models.UniqueConstraint(condition=models.Q(('department__isnull', True)), fields=('organization', 'financial_period', 'salary_item_type'), name='unique_payroll_summary_key_no_department')],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.1 on 2026-10-18 18:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestMetric',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url_name', models.CharField(max_length=200, verbose_name='نام مسیر')),
+                ('method', models.CharField(max_length=10, verbose_name='متد')),
+                ('status_code', models.PositiveSmallIntegerField(verbose_name='کد وضعیت')),
+                ('duration_ms', models.FloatField(verbose_name='زمان پاسخ (میلی\u200cثانیه)')),
+                ('query_count', models.PositiveIntegerField(verbose_name='تعداد کوئری\u200cها')),
+                ('db_time_ms', models.FloatField(verbose_name='زمان پایگاه داده (میلی\u200cثانیه)')),
+                ('duplicate_queries', models.PositiveIntegerField(default=0, help_text='اجرای دوباره یک کوئری با همان پارامترها.', verbose_name='کوئری\u200cهای تکراری')),
+                ('repeated_queries', models.PositiveIntegerField(default=0, help_text='اجرای دوباره یک کوئری با پارامترهای دیگر (الگوی N+1).', verbose_name='کوئری\u200cهای مشابه')),
+                ('top_repeated_sql', models.TextField(blank=True, verbose_name='پرتکرارترین کوئری')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='زمان')),
+            ],
+            options={
+                'verbose_name': 'نمونه کارایی درخواست',
+                'verbose_name_plural': 'نمونه\u200cهای کارایی درخواست\u200cها',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['created_at'], name='request_metric_created_idx'), models.Index(fields=['url_name', 'created_at'], name='request_metric_url_idx')],
+            },
+        ),
+    ]
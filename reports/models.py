@@ -1,3 +1,107 @@
 from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
 
-# Create your models here.
+from organizations.models import Organization
+from settings_app.models import FinancialPeriod
+from hr.models import Department
+from salaries.models import SalaryItemType
+
+
+class PayrollSummary(models.Model):
+    """
+    خلاصه از پیش تجمیع شده آیتم‌های حقوقی کارکنان برای هر سازمان، دوره مالی،
+    دپارتمان و نوع آیتم حقوقی. این جدول داده تکراری است و از روی
+    EmployeeSalaryItem نگهداری می‌شود (reports.summary)؛ مستقیماً ویرایش نشود.
+    """
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.CASCADE,
+        related_name='payroll_summaries',
+        verbose_name=_("سازمان")
+    )
+    financial_period = models.ForeignKey(
+        FinancialPeriod,
+        on_delete=models.CASCADE,
+        related_name='payroll_summaries',
+        verbose_name=_("دوره مالی")
+    )
+    department = models.ForeignKey(
+        Department,
+        on_delete=models.CASCADE,  # rows are merged into "no department" before the delete (reports.signals)
+        related_name='payroll_summaries',
+        verbose_name=_("دپارتمان"),
+        blank=True,
+        null=True,
+        help_text=_("خالی: کارکنانی که در این دوره سابقه شغلی با دپارتمان ندارند.")
+    )
+    salary_item_type = models.ForeignKey(
+        SalaryItemType,
+        on_delete=models.CASCADE,
+        related_name='payroll_summaries',
+        verbose_name=_("نوع آیتم حقوقی")
+    )
+    total_amount = models.DecimalField(max_digits=18, decimal_places=2, default=0, verbose_name=_("جمع مبالغ"))
+    item_count = models.IntegerField(default=0, verbose_name=_("تعداد آیتم‌ها"))
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_("تاریخ به‌روزرسانی"))
+
+    class Meta:
+        verbose_name = _("خلاصه حقوق")
+        verbose_name_plural = _("خلاصه‌های حقوق")
+        # NULL never equals NULL in a unique index, so the "no department"
+        # rows need their own partial constraint.
+        constraints = [
+            models.UniqueConstraint(
+                fields=['organization', 'financial_period', 'department', 'salary_item_type'],
+                condition=Q(department__isnull=False),
+                name='unique_payroll_summary_key'
+            ),
+            models.UniqueConstraint(
+                fields=['organization', 'financial_period', 'salary_item_type'],
+                condition=Q(department__isnull=True),
+                name='unique_payroll_summary_key_no_department'
+            ),
+        ]
+        ordering = ['organization', 'financial_period', 'department', 'salary_item_type']
+
+    def __str__(self):
+        return f"{self.organization_id} / {self.financial_period_id} / {self.department_id} / {self.salary_item_type_id}: {self.total_amount}"
+
+
+class RequestMetric(models.Model):
+    """
+    نمونه زمان پاسخ و کوئری‌های یک درخواست که میان‌افزار
+    reports.instrumentation ثبت می‌کند. جدول چرخشی است: ردیف‌های قدیمی‌تر از
+    REQUEST_METRICS_RETENTION هنگام ذخیره نمونه‌های تازه حذف می‌شوند.
+    """
+    url_name = models.CharField(max_length=200, verbose_name=_("نام مسیر"))
+    method = models.CharField(max_length=10, verbose_name=_("متد"))
+    status_code = models.PositiveSmallIntegerField(verbose_name=_("کد وضعیت"))
+    duration_ms = models.FloatField(verbose_name=_("زمان پاسخ (میلی‌ثانیه)"))
+    query_count = models.PositiveIntegerField(verbose_name=_("تعداد کوئری‌ها"))
+    db_time_ms = models.FloatField(verbose_name=_("زمان پایگاه داده (میلی‌ثانیه)"))
+    duplicate_queries = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("کوئری‌های تکراری"),
+        help_text=_("اجرای دوباره یک کوئری با همان پارامترها.")
+    )
+    repeated_queries = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("کوئری‌های مشابه"),
+        help_text=_("اجرای دوباره یک کوئری با پارامترهای دیگر (الگوی N+1).")
+    )
+    top_repeated_sql = models.TextField(blank=True, verbose_name=_("پرتکرارترین کوئری"))
+    created_at = models.DateTimeField(default=timezone.now, verbose_name=_("زمان"))
+
+    class Meta:
+        verbose_name = _("نمونه کارایی درخواست")
+        verbose_name_plural = _("نمونه‌های کارایی درخواست‌ها")
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at'], name='request_metric_created_idx'),
+            models.Index(fields=['url_name', 'created_at'], name='request_metric_url_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.method} {self.url_name}: {self.duration_ms:.1f} ms, {self.query_count} queries"
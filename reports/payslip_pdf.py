@@ -0,0 +1,116 @@
+"""
+رسم فیش حقوقی به PDF.
+
+این ماژول عمداً به جنگو و ORM وابسته نیست: در پروسه‌های کارگر
+ProcessPoolExecutor اجرا می‌شود و تمام داده‌ها را به صورت dict ساده دریافت
+می‌کند، پس در هر دو روش fork و spawn بدون راه‌اندازی جنگو قابل import است.
+reportlab فقط در هنگام رسم import می‌شود.
+
+ساختار هر فیش:
+  {'employee_id', 'personnel_code', 'national_code', 'name',
+   'earnings_items': [(name, amount)], 'deduction_items': [(name, amount)],
+   'earnings', 'deductions', 'loan_deductions', 'tax', 'net_pay'}
+و header: {'organization', 'period', 'font_path'}؛ مبالغ رشته‌اند.
+"""
+import os
+
+
+PAGE_MARGIN = 40
+LINE_HEIGHT = 16
+FONT_NAME = 'PayslipFont'
+
+
+class MissingDependency(Exception):
+    pass
+
+
+def _load_reportlab():
+    try:
+        from reportlab.lib.pagesizes import A5
+        from reportlab.pdfgen import canvas
+    except ImportError:
+        raise MissingDependency("reportlab is required to render payslips.")
+    return A5, canvas
+
+
+def _text_shaper():
+    """
+    Returns a function that shapes right-to-left Persian text for drawing, or
+    the identity when arabic_reshaper/python-bidi are not installed.
+    """
+    try:
+        import arabic_reshaper
+        from bidi.algorithm import get_display
+    except ImportError:
+        return str
+    return lambda text: get_display(arabic_reshaper.reshape(str(text)))
+
+
+def _register_font(font_path):
+    if not font_path:
+        return 'Helvetica'
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    if FONT_NAME not in pdfmetrics.getRegisteredFontNames():
+        pdfmetrics.registerFont(TTFont(FONT_NAME, font_path))
+    return FONT_NAME
+
+
+def draw_payslip(pdf, page_size, font, shape, header, payslip):
+    width, height = page_size
+    right = width - PAGE_MARGIN
+    y = height - PAGE_MARGIN
+
+    def row(label, value='', size=10):
+        nonlocal y
+        pdf.setFont(font, size)
+        pdf.drawRightString(right, y, shape(label))
+        if value != '':
+            pdf.drawString(PAGE_MARGIN, y, str(value))
+        y -= LINE_HEIGHT
+
+    row(f"{header['organization']} - {header['period']}", size=12)
+    row(payslip['name'], payslip['personnel_code'] or payslip['national_code'])
+    y -= LINE_HEIGHT / 2
+    for name, amount in payslip['earnings_items']:
+        row(name, amount)
+    row('جمع مزایا', payslip['earnings'])
+    y -= LINE_HEIGHT / 2
+    for name, amount in payslip['deduction_items']:
+        row(name, amount)
+    if payslip['loan_deductions'] != '0.00':
+        row('اقساط وام', payslip['loan_deductions'])
+    row('مالیات', payslip['tax'])
+    row('جمع کسورات', payslip['deductions'])
+    y -= LINE_HEIGHT / 2
+    row('خالص پرداختی', payslip['net_pay'], size=12)
+    pdf.showPage()
+
+
+def render_batch(header, payslips, output_dir, single_file=None):
+    """
+    Renders `payslips` into output_dir: one PDF per employee, or one
+    multi-page PDF named `single_file`. Returns the written paths.
+    Runs in worker processes; must not touch the database.
+    """
+    page_size, canvas = _load_reportlab()
+    font = _register_font(header.get('font_path'))
+    shape = _text_shaper()
+
+    if single_file:
+        path = os.path.join(output_dir, single_file)
+        pdf = canvas.Canvas(path, pagesize=page_size)
+        for payslip in payslips:
+            draw_payslip(pdf, page_size, font, shape, header, payslip)
+        pdf.save()
+        return [path]
+
+    paths = []
+    for payslip in payslips:
+        path = os.path.join(output_dir, f"payslip_{payslip['employee_id']}.pdf")
+        pdf = canvas.Canvas(path, pagesize=page_size)
+        draw_payslip(pdf, page_size, font, shape, header, payslip)
+        pdf.save()
+        paths.append(path)
+    return paths
@@ -0,0 +1,188 @@
+"""
+صدور گروهی فیش‌های حقوقی یک دوره مالی (فقط از اجرای بسته شده حقوق).
+
+داده‌های فیش‌ها (ردیف‌های نتیجه اجرای حقوق و آیتم‌های حقوقی هر کارمند) با دو
+کوئری مرتب بر اساس کارمند و به صورت iterator خوانده، ادغام و در دسته‌های
+batch_size تایی به dict ساده تبدیل می‌شوند. هر دسته در یک پروسه کارگر
+ProcessPoolExecutor به PDF تبدیل می‌شود (reports.payslip_pdf)؛ کارگرها به
+پایگاه داده دسترسی ندارند. پیشرفت کار پس از هر دسته به تابع progress گزارش
+می‌شود.
+"""
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from itertools import groupby
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.utils.translation import gettext as _
+
+from salaries.models import EmployeeSalaryItem, PayrollRun
+
+from . import payslip_pdf
+
+
+DEFAULT_BATCH_SIZE = 100
+ITERATOR_CHUNK_SIZE = 2000
+
+
+def _check_renderer():
+    try:
+        payslip_pdf._load_reportlab()
+    except payslip_pdf.MissingDependency:
+        raise ValidationError(_("برای صدور فیش حقوقی نصب بسته reportlab لازم است."))
+
+
+class PayslipBatchRenderer:
+    """
+    صدور فیش‌های حقوقی یک اجرای حقوق.
+
+    workers: تعداد پروسه‌های کارگر (پیش‌فرض: تعداد هسته‌ها)؛ 1 یعنی رسم در همین پروسه.
+    merged: به جای یک فایل برای هر کارمند، برای هر دسته یک PDF چندصفحه‌ای.
+    progress: تابع progress(done, total) که پس از اتمام هر دسته فراخوانی می‌شود.
+    """
+
+    def __init__(self, payroll_run, output_dir, workers=None, batch_size=DEFAULT_BATCH_SIZE,
+                 merged=False, progress=None):
+        self.payroll_run = payroll_run
+        self.output_dir = output_dir
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.merged = merged
+        self.progress = progress
+
+    def header(self):
+        return {
+            'organization': self.payroll_run.organization.name,
+            'period': self.payroll_run.financial_period.name,
+            'font_path': getattr(settings, 'PAYSLIP_FONT_PATH', None),
+        }
+
+    def load_lines(self):
+        return self.payroll_run.lines.order_by('employee_id').values_list(
+            'employee_id',
+            'employee__personnel_code',
+            'employee__national_code',
+            'employee__first_name',
+            'employee__last_name',
+            'earnings',
+            'deductions',
+            'loan_deductions',
+            'tax',
+            'net_pay',
+        ).iterator(chunk_size=ITERATOR_CHUNK_SIZE)
+
+    def load_items(self):
+        return EmployeeSalaryItem.objects.filter(
+            financial_period_id=self.payroll_run.financial_period_id,
+            salary_item_type__organization_id=self.payroll_run.organization_id,
+        ).order_by('employee_id', 'salary_item_type__name').values_list(
+            'employee_id',
+            'salary_item_type__name',
+            'salary_item_type__is_deduction',
+            'amount',
+        ).iterator(chunk_size=ITERATOR_CHUNK_SIZE)
+
+    def payslips(self):
+        """
+        Yields one plain dict per result line, merge-joining the two employee-ordered queries.
+        """
+        items = groupby(self.load_items(), key=lambda item: item[0])
+        current_id, current_items = next(items, (None, ()))
+        for (employee_id, personnel_code, national_code, first_name, last_name,
+             earnings, deductions, loan_deductions, tax, net_pay) in self.load_lines():
+            while current_id is not None and current_id < employee_id:
+                current_id, current_items = next(items, (None, ()))
+            employee_items = list(current_items) if current_id == employee_id else []
+            yield {
+                'employee_id': employee_id,
+                'personnel_code': personnel_code or '',
+                'national_code': national_code,
+                'name': f"{first_name} {last_name}",
+                'earnings_items': [(name, str(amount)) for _e, name, is_deduction, amount in employee_items if not is_deduction],
+                'deduction_items': [(name, str(amount)) for _e, name, is_deduction, amount in employee_items if is_deduction],
+                'earnings': str(earnings),
+                'deductions': str(deductions),
+                'loan_deductions': str(loan_deductions),
+                'tax': str(tax),
+                'net_pay': str(net_pay),
+            }
+
+    def batches(self):
+        batch = []
+        for payslip in self.payslips():
+            batch.append(payslip)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _single_file(self, index):
+        if not self.merged:
+            return None
+        return f"payslips_{self.payroll_run.organization_id}_{self.payroll_run.financial_period_id}_{index:04d}.pdf"
+
+    def _report(self, done, total):
+        if self.progress is not None:
+            self.progress(done, total)
+
+    def run(self):
+        """
+        Renders every payslip and returns the list of written PDF paths.
+        """
+        _check_renderer()
+        os.makedirs(self.output_dir, exist_ok=True)
+        header = self.header()
+        total = self.payroll_run.lines.count()
+        done = 0
+        paths = []
+
+        if self.workers == 1:
+            for index, batch in enumerate(self.batches()):
+                paths += payslip_pdf.render_batch(header, batch, self.output_dir, self._single_file(index))
+                done += len(batch)
+                self._report(done, total)
+            return paths
+
+        # At most two batches per worker are in flight, so memory does not
+        # grow with the number of employees. Workers are spawned rather than
+        # forked so they never inherit the open database connection.
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=context) as executor:
+            pending = {}
+            for index, batch in enumerate(self.batches()):
+                if len(pending) >= self.workers * 2:
+                    finished, _running = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        paths += future.result()
+                        done += pending.pop(future)
+                        self._report(done, total)
+                future = executor.submit(
+                    payslip_pdf.render_batch, header, batch, self.output_dir, self._single_file(index),
+                )
+                pending[future] = len(batch)
+            for future in as_completed(pending):
+                paths += future.result()
+                done += pending[future]
+                self._report(done, total)
+        return sorted(paths)
+
+
+def render_payslips(organization, financial_period, output_dir, **options):
+    """
+    Renders the payslips of the period's closed payroll run; returns (paths, seconds).
+    A draft run may still have dirty lines, so it is refused like the bank file.
+    """
+    payroll_run = PayrollRun.objects.select_related('organization', 'financial_period').filter(
+        organization=organization,
+        financial_period=financial_period,
+    ).first()
+    if payroll_run is None:
+        raise ValidationError(_("برای این دوره هنوز حقوق محاسبه نشده است."))
+    if not payroll_run.is_closed:
+        raise ValidationError(_("فیش حقوقی فقط برای اجرای بسته شده حقوق این دوره قابل صدور است."))
+    started = time.perf_counter()
+    paths = PayslipBatchRenderer(payroll_run, output_dir, **options).run()
+    return paths, time.perf_counter() - started
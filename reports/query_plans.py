@@ -0,0 +1,162 @@
+"""
+مقایسه زمان و طرح اجرای (EXPLAIN) کوئری‌های پرتکرار با و بدون ایندکس‌های ترکیبی.
+
+همه کارها در یک تراکنش انجام و در پایان rollback می‌شود: داده آزمایشی ساخته
+می‌شود (یا داده موجود استفاده می‌شود)، ایندکس‌های Meta.indexes مدل‌های زیر حذف و
+کوئری‌ها اندازه‌گیری می‌شوند («قبل»)، سپس ایندکس‌ها ساخته و دوباره اندازه‌گیری
+می‌شوند («بعد»). پایگاه داده پس از اجرا دست نخورده باقی می‌ماند؛ به همین دلیل
+فقط روی پایگاه‌هایی که DDL تراکنشی دارند (SQLite، PostgreSQL) قابل اجراست.
+"""
+import time
+
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils.translation import gettext as _
+
+from benchmarks.synthetic import DatasetGenerator
+from employees.models import Employee
+from hr.models import EmploymentHistory, MonthlyWorkRecord
+from hr.org_chart import in_effect
+from organizations.models import EmployeeOrganization, Organization
+from salaries.models import EmployeeSalaryItem
+from settings_app.models import FinancialPeriod
+
+
+INDEXED_MODELS = [Employee, EmployeeOrganization, EmployeeSalaryItem, MonthlyWorkRecord, EmploymentHistory]
+PAGE_SIZE = 50
+
+
+def model_indexes():
+    return [(model, index) for model in INDEXED_MODELS for index in model._meta.indexes]
+
+
+def _existing_index_names(model):
+    with connection.cursor() as cursor:
+        return set(connection.introspection.get_constraints(cursor, model._meta.db_table))
+
+
+def _set_indexes(enabled):
+    """
+    Creates or drops the Meta.indexes of INDEXED_MODELS. Runs the DDL through
+    a plain cursor because the SQLite schema editor refuses to open inside a
+    transaction; the surrounding transaction makes it reversible.
+    """
+    editor = connection.schema_editor()
+    with connection.cursor() as cursor:
+        for model, index in model_indexes():
+            present = index.name in _existing_index_names(model)
+            if enabled and not present:
+                cursor.execute(str(index.create_sql(model, editor)))
+            elif not enabled and present:
+                cursor.execute(editor.sql_delete_index % {
+                    'table': editor.quote_name(model._meta.db_table),
+                    'name': editor.quote_name(index.name),
+                })
+    # Let the planner see the new statistics.
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+def load_dataset(employees, seed=1):
+    """
+    Loads a synthetic dataset (benchmarks.synthetic) and returns its first
+    organization, period and employee.
+    """
+    generator = DatasetGenerator(employees=employees, organizations=4, seed=seed, summary=False)
+    generator.run()
+    organization = generator.organizations[0]
+    return organization, generator.periods[organization.pk][0], Employee.objects.filter(
+        employee_organizations__organization=organization,
+    ).order_by('pk').first()
+
+
+def benchmark_queries(organization, financial_period, employee):
+    """
+    (label, queryset) pairs mirroring the filters and orderings of the views,
+    payroll and validation code. Lists are ordered like KeysetPaginationMixin
+    orders them: Meta.ordering on the foreign-key columns, then pk.
+    """
+    period_overlap = Q(start_date__lte=financial_period.end_date) & (
+        Q(end_date__gte=financial_period.start_date) | Q(end_date__isnull=True)
+    )
+    return [
+        ("employee list (ordering)",
+         Employee.objects.order_by('last_name', 'first_name', 'pk')[:PAGE_SIZE]),
+        ("payroll members (organization, is_active)",
+         EmployeeOrganization.objects.filter(period_overlap, organization=organization, is_active=True)
+         .order_by('employee_id').values_list('employee_id', flat=True)),
+        ("membership list by organization",
+         EmployeeOrganization.objects.filter(organization=organization)
+         .order_by('organization_id', 'employee_id', 'start_date', 'pk')[:PAGE_SIZE]),
+        ("salary items of a period",
+         EmployeeSalaryItem.objects.filter(financial_period=financial_period)
+         .order_by('employee_id').values_list('employee_id', 'amount')),
+        ("salary items of an employee in a period",
+         EmployeeSalaryItem.objects.filter(employee=employee, financial_period=financial_period)),
+        ("work records by organization and period",
+         MonthlyWorkRecord.objects.filter(organization=organization, financial_period=financial_period)
+         .order_by('financial_period_id', 'employee_id', 'pk')[:PAGE_SIZE]),
+        ("work record of an employee",
+         MonthlyWorkRecord.objects.filter(organization=organization, financial_period=financial_period, employee=employee)),
+        ("employment history list (ordering)",
+         EmploymentHistory.objects.order_by('employee_id', '-start_date', '-end_date', 'pk')[:PAGE_SIZE]),
+        ("employment history by organization",
+         EmploymentHistory.objects.filter(organization=organization)
+         .order_by('employee_id', '-start_date', '-end_date', 'pk')[:PAGE_SIZE]),
+        ("current position of an employee",
+         EmploymentHistory.objects.filter(employee=employee, organization=organization, is_current=True)),
+        ("history overlap check (clean)",
+         EmploymentHistory.objects.filter(employee=employee, organization=organization).filter(
+             (Q(end_date__gte=financial_period.start_date) | Q(end_date__isnull=True))
+             & Q(start_date__lte=financial_period.end_date))),
+        ("org chart as of a date",
+         EmploymentHistory.objects.filter(in_effect(financial_period.end_date), organization=organization)
+         .values('department_id').order_by()),
+    ]
+
+
+def _measure(queryset, repeat):
+    best = None
+    for _n in range(repeat):
+        started = time.perf_counter()
+        list(queryset.all())
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000, queryset.explain()
+
+
+def compare(employees=20000, repeat=5, seed=1, progress=None):
+    """
+    Runs the before/after comparison and rolls everything back. Returns one
+    dict per query: label, before_ms, after_ms, before_plan, after_plan.
+    """
+    report = progress or (lambda message: None)
+    results = []
+    with transaction.atomic():
+        if employees:
+            started = time.perf_counter()
+            organization, financial_period, employee = load_dataset(employees, seed=seed)
+            report(f"Loaded {employees} employees in {time.perf_counter() - started:.1f}s")
+        else:
+            organization = Organization.objects.order_by('pk').first()
+            financial_period = FinancialPeriod.objects.filter(fiscal_year__organization=organization).order_by('pk').first()
+            employee = Employee.objects.filter(employee_organizations__organization=organization).order_by('pk').first()
+            if employee is None or financial_period is None:
+                raise ValidationError(_("پایگاه داده داده‌ای برای مقایسه ندارد؛ تعداد کارکنان آزمایشی را مشخص کنید."))
+        queries = benchmark_queries(organization, financial_period, employee)
+
+        _set_indexes(False)
+        before = [_measure(queryset, repeat) for _label, queryset in queries]
+        _set_indexes(True)
+        after = [_measure(queryset, repeat) for _label, queryset in queries]
+        for (label, _queryset), (before_ms, before_plan), (after_ms, after_plan) in zip(queries, before, after):
+            results.append({
+                'label': label,
+                'before_ms': before_ms,
+                'after_ms': after_ms,
+                'before_plan': before_plan,
+                'after_plan': after_plan,
+            })
+        transaction.set_rollback(True)
+    return results
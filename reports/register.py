@@ -0,0 +1,108 @@
+"""
+لیست حقوق (payroll register) یک سازمان در یک دوره مالی.
+
+یک ردیف برای هر کارمند و یک ستون برای هر نوع آیتم حقوقی دوره. چرخش (pivot)
+در پایگاه داده با یک کوئری گروهی و جمع‌های شرطی (SUM ... FILTER) انجام می‌شود
+و نتیجه با iterator() خوانده می‌شود، پس مصرف حافظه مستقل از تعداد کارکنان است.
+ستون‌های جمع مزایا، کسورات، مالیات و خالص پرداختی از ردیف‌های نتیجه اجرای بسته
+شده حقوق دوره (PayrollResultLine) خوانده می‌شوند؛ تا دوره بسته نشده، نتایج ممکن
+است کهنه باشند و این ستون‌ها نمایش داده نمی‌شوند.
+"""
+import tempfile
+
+from django.core.exceptions import ValidationError
+from django.db.models import OuterRef, Q, Subquery, Sum
+from django.utils.translation import gettext as _
+
+from accounting_salary.streaming import iter_csv
+from salaries.models import EmployeeSalaryItem, SalaryItemType
+from salaries.payroll import period_result_lines
+
+
+ITERATOR_CHUNK_SIZE = 2000
+EMPLOYEE_FIELDS = ['employee__personnel_code', 'employee__national_code', 'employee__first_name', 'employee__last_name']
+RESULT_FIELDS = ['earnings', 'deductions', 'tax', 'net_pay']
+
+
+class PayrollRegister:
+    """
+    لیست حقوق یک سازمان در یک دوره مالی به صورت ردیف‌های جریانی.
+    """
+
+    def __init__(self, organization, financial_period):
+        self.organization = organization
+        self.financial_period = financial_period
+        self.item_types = list(
+            SalaryItemType.objects.filter(
+                organization=organization,
+                financial_period=financial_period,
+            ).order_by('is_deduction', 'name').values_list('pk', 'name')
+        )
+        # None while the period is open.
+        self.result_lines = period_result_lines(organization, financial_period)
+
+    @property
+    def filename(self):
+        return f"payroll_register_{self.organization.pk}_{self.financial_period.pk}"
+
+    def header(self):
+        header = [
+            _("کد پرسنلی"), _("کد ملی"), _("نام"), _("نام خانوادگی"),
+        ] + [name for _pk, name in self.item_types]
+        if self.result_lines is not None:
+            header += [_("جمع مزایا"), _("جمع کسورات"), _("مالیات"), _("خالص پرداختی")]
+        return header
+
+    def get_queryset(self):
+        """
+        One grouped row per employee with a conditional SUM per item type.
+        """
+        totals = {
+            f'type_{pk}': Sum('amount', filter=Q(salary_item_type_id=pk))
+            for pk, _name in self.item_types
+        }
+        queryset = EmployeeSalaryItem.objects.filter(
+            financial_period=self.financial_period,
+            salary_item_type__organization=self.organization,
+        ).values('employee_id', *EMPLOYEE_FIELDS).annotate(**totals)
+        fields = EMPLOYEE_FIELDS + list(totals)
+        if self.result_lines is not None:
+            line = self.result_lines.filter(employee_id=OuterRef('employee_id'))
+            queryset = queryset.annotate(**{
+                f'result_{field}': Subquery(line.values(field)[:1]) for field in RESULT_FIELDS
+            })
+            fields += [f'result_{field}' for field in RESULT_FIELDS]
+        return queryset.order_by('employee_id').values_list(*fields)
+
+    def rows(self):
+        """
+        Yields the header, then one list per employee, reading the database in chunks.
+        """
+        yield self.header()
+        for row in self.get_queryset().iterator(chunk_size=ITERATOR_CHUNK_SIZE):
+            yield ['' if value is None else value for value in row]
+
+    def csv_lines(self):
+        # The BOM lets Excel open the UTF-8 file with Persian text intact.
+        yield '\ufeff'
+        yield from iter_csv(self.rows())
+
+    def write_xlsx(self):
+        """
+        Writes the register to a temporary XLSX file and returns it, rewound.
+        openpyxl's write-only mode flushes each row, so memory stays flat; an
+        XLSX is a zip archive and cannot be sent before it is complete.
+        """
+        try:
+            from openpyxl import Workbook
+        except ImportError:
+            raise ValidationError(_("برای تهیه فایل XLSX نصب بسته openpyxl لازم است."))
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet(title=str(self.financial_period.name)[:31])
+        for row in self.rows():
+            sheet.append(row)
+        fileobj = tempfile.TemporaryFile()
+        workbook.save(fileobj)
+        fileobj.seek(0)
+        return fileobj
@@ -0,0 +1,168 @@
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from hr.models import Department, EmploymentHistory
+from salaries.models import EmployeeSalaryItem, SalaryItemType
+from settings_app.models import FinancialPeriod
+
+from . import summary
+
+
+# جدول خلاصه حقوق (reports.summary) با هر تغییر آیتم حقوقی یا سابقه شغلی به صورت
+# افزایشی به‌روز می‌شود. در حذف‌های آبشاری (حذف کارمند یا سازمان) همه
+# pre_delete ها پیش از اولین حذف فرستاده می‌شوند، پس کسر آیتم‌ها در pre_delete
+# با دپارتمان درست انجام می‌شود؛ جابه‌جایی‌هایی که ممکن است ردیف تازه بسازند
+# (حذف سابقه شغلی یا دپارتمان) به پس از commit موکول می‌شوند تا برای داده‌های
+# حذف شده ردیفی ساخته نشود.
+
+def _item_scope(financial_period_id, salary_item_type_id):
+    organization_id = SalaryItemType.objects.filter(pk=salary_item_type_id).values_list(
+        'organization_id', flat=True,
+    ).first()
+    financial_period = FinancialPeriod.objects.filter(pk=financial_period_id).first()
+    return organization_id, financial_period
+
+
+def _apply_item_change(employee_id, financial_period_id, salary_item_type_id, amount, count):
+    organization_id, financial_period = _item_scope(financial_period_id, salary_item_type_id)
+    if organization_id is not None and financial_period is not None:
+        summary.apply_item_changes(
+            organization_id, financial_period, [(employee_id, salary_item_type_id, amount, count)],
+        )
+
+
+@receiver(pre_save, sender=EmployeeSalaryItem)
+def employee_salary_item_saving(sender, instance, raw=False, **kwargs):
+    instance._summary_previous = None
+    if instance.pk and not raw:
+        instance._summary_previous = EmployeeSalaryItem.objects.filter(pk=instance.pk).values_list(
+            'employee_id', 'financial_period_id', 'salary_item_type_id', 'amount',
+        ).first()
+
+
+@receiver(post_save, sender=EmployeeSalaryItem)
+def employee_salary_item_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_summary_previous', None)
+    current = (instance.employee_id, instance.financial_period_id, instance.salary_item_type_id,
+               Decimal(str(instance.amount)))
+    if previous is not None and previous[:3] == current[:3]:
+        if previous[3] != current[3]:
+            _apply_item_change(*current[:3], current[3] - previous[3], 0)
+        return
+    if previous is not None:
+        _apply_item_change(*previous[:3], -previous[3], -1)
+    _apply_item_change(*current, 1)
+
+
+@receiver(pre_delete, sender=EmployeeSalaryItem)
+def employee_salary_item_deleting(sender, instance, **kwargs):
+    # Runs before the cascade removes the employee's history, so the department still resolves.
+    organization_id, financial_period = _item_scope(instance.financial_period_id, instance.salary_item_type_id)
+    if organization_id is None or financial_period is None:
+        return
+    summary.apply_item_changes(
+        organization_id, financial_period,
+        [(instance.employee_id, instance.salary_item_type_id, -Decimal(str(instance.amount)), -1)],
+    )
+
+
+def _history_periods(instance, previous):
+    """
+    (organization_id, financial_period) pairs whose department of the employee
+    the old or new version of the history row can decide.
+    """
+    ranges = [(instance.organization_id, instance.start_date, instance.end_date)]
+    if previous is not None:
+        ranges.append(previous)
+    pairs = []
+    for organization_id in {organization_id for organization_id, _start, _end in ranges}:
+        overlap = Q()
+        for each_organization_id, start_date, end_date in ranges:
+            if each_organization_id != organization_id or start_date is None:
+                continue
+            condition = Q(end_date__gte=start_date)
+            if end_date is not None:
+                condition &= Q(start_date__lte=end_date)
+            overlap |= condition
+        if not overlap:
+            continue
+        periods = FinancialPeriod.objects.filter(
+            overlap,
+            employee_salary_items__employee_id=instance.employee_id,
+            employee_salary_items__salary_item_type__organization_id=organization_id,
+        ).distinct()
+        pairs += [(organization_id, period) for period in periods]
+    return pairs
+
+
+def _departments(employee_id, pairs):
+    return {
+        (organization_id, period.pk): summary.employee_departments(
+            organization_id, period, [employee_id],
+        ).get(employee_id)
+        for organization_id, period in pairs
+    }
+
+
+def _history_changing(instance):
+    previous = None
+    if instance.pk:
+        previous = EmploymentHistory.objects.filter(pk=instance.pk).values_list(
+            'organization_id', 'start_date', 'end_date',
+        ).first()
+    pairs = _history_periods(instance, previous)
+    instance._summary_before = (pairs, _departments(instance.employee_id, pairs))
+
+
+def _history_changed(instance, deferred=False):
+    pairs, before = getattr(instance, '_summary_before', ([], {}))
+    employee_id = instance.employee_id
+
+    def apply():
+        after = _departments(employee_id, pairs)
+        for organization_id, period in pairs:
+            key = (organization_id, period.pk)
+            if before[key] != after[key]:
+                summary.move_employee(employee_id, organization_id, period, before[key], after[key])
+
+    if deferred:
+        # When the employee itself is being deleted their items are gone by then and nothing moves.
+        transaction.on_commit(apply)
+    else:
+        apply()
+
+
+@receiver(pre_save, sender=EmploymentHistory)
+def employment_history_saving(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _history_changing(instance)
+
+
+@receiver(post_save, sender=EmploymentHistory)
+def employment_history_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _history_changed(instance)
+
+
+@receiver(pre_delete, sender=EmploymentHistory)
+def employment_history_deleting(sender, instance, **kwargs):
+    _history_changing(instance)
+
+
+@receiver(post_delete, sender=EmploymentHistory)
+def employment_history_deleted(sender, instance, **kwargs):
+    _history_changed(instance, deferred=True)
+
+
+@receiver(pre_delete, sender=Department)
+def department_deleting(sender, instance, **kwargs):
+    # The history rows only lose their department (SET_NULL, no signals), so
+    # its totals move to the "no department" rows once the delete is committed.
+    rows = summary.department_rows(instance)
+    transaction.on_commit(lambda: summary.merge_into_no_department(rows))
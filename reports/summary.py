@@ -0,0 +1,238 @@
+"""
+جدول خلاصه حقوق (PayrollSummary).
+
+برای هر (سازمان، دوره مالی، دپارتمان، نوع آیتم حقوقی) جمع مبالغ و تعداد
+آیتم‌های حقوقی کارکنان نگه داشته می‌شود تا داشبوردها به جای تجمیع همه ردیف‌های
+EmployeeSalaryItem فقط چند صد ردیف از پیش تجمیع شده را بخوانند.
+
+دپارتمان کارمند در یک دوره، دپارتمان آخرین سابقه شغلی او در همان سازمان است
+که با بازه دوره هم‌پوشانی دارد؛ کارمند بدون چنین سابقه‌ای در ردیف «بدون
+دپارتمان» (department خالی) شمرده می‌شود.
+
+جدول با سیگنال‌ها (reports.signals) به صورت افزایشی و با UPDATE های F() به‌روز
+می‌شود؛ نوشتن‌های گروهی که سیگنال نمی‌فرستند (جدول ویرایش آیتم‌ها، انتقال به
+دوره بعد) خودشان apply_item_changes() یا rebuild_period() را فراخوانی می‌کنند.
+هر تغییری که از این مسیرها نگذرد با فرمان rebuild_payroll_summary اصلاح می‌شود.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from django.utils import timezone
+
+from hr.models import EmploymentHistory
+from organizations.models import Organization
+from salaries.models import EmployeeSalaryItem, SalaryItemType
+from settings_app.models import FinancialPeriod
+
+from .models import PayrollSummary
+
+
+BATCH_SIZE = 1000
+
+
+def overlapping_history(start_date, end_date):
+    """
+    Q matching employment history rows that overlap [start_date, end_date].
+    """
+    return Q(start_date__lte=end_date) & (Q(end_date__isnull=True) | Q(end_date__gte=start_date))
+
+
+def department_subquery(organization_id, financial_period):
+    """
+    The employee's department in the period, for EmployeeSalaryItem querysets.
+    """
+    return Subquery(
+        EmploymentHistory.objects.filter(
+            overlapping_history(financial_period.start_date, financial_period.end_date),
+            employee_id=OuterRef('employee_id'),
+            organization_id=organization_id,
+        ).order_by('-start_date', '-pk').values('department_id')[:1]
+    )
+
+
+def employee_departments(organization_id, financial_period, employee_ids):
+    """
+    {employee_id: department_id} for the given employees in the period;
+    employees without an overlapping history are left out (no department).
+    """
+    rows = EmploymentHistory.objects.filter(
+        overlapping_history(financial_period.start_date, financial_period.end_date),
+        organization_id=organization_id,
+        employee_id__in=employee_ids,
+    ).order_by('employee_id', '-start_date', '-pk').values_list('employee_id', 'department_id')
+    departments = {}
+    for employee_id, department_id in rows:
+        departments.setdefault(employee_id, department_id)
+    return departments
+
+
+def apply_delta(organization_id, financial_period_id, department_id, salary_item_type_id, amount, count):
+    """
+    Adds `amount` and `count` to one summary row, creating it when missing.
+    Rows whose count drops to zero are removed.
+    """
+    rows = PayrollSummary.objects.filter(
+        organization_id=organization_id,
+        financial_period_id=financial_period_id,
+        department_id=department_id,
+        salary_item_type_id=salary_item_type_id,
+    )
+    fields = {
+        'total_amount': F('total_amount') + amount,
+        'item_count': F('item_count') + count,
+        'updated_at': timezone.now(),
+    }
+    if rows.update(**fields):
+        if count < 0:
+            rows.filter(item_count__lte=0).delete()
+        return
+    if count <= 0:
+        # Nothing to subtract from: the row went away with its item type or a rebuild.
+        return
+    try:
+        with transaction.atomic():
+            PayrollSummary.objects.create(
+                organization_id=organization_id,
+                financial_period_id=financial_period_id,
+                department_id=department_id,
+                salary_item_type_id=salary_item_type_id,
+                total_amount=amount,
+                item_count=count,
+            )
+    except IntegrityError:
+        # Another writer created the row in the meantime.
+        rows.update(**fields)
+
+
+def apply_item_changes(organization_id, financial_period, changes):
+    """
+    Applies (employee_id, salary_item_type_id, amount_delta, count_delta)
+    changes of one organization and period, one UPDATE per affected row.
+    """
+    changes = list(changes)
+    if not changes:
+        return
+    departments = employee_departments(organization_id, financial_period, {change[0] for change in changes})
+    deltas = defaultdict(lambda: [Decimal('0'), 0])
+    for employee_id, salary_item_type_id, amount, count in changes:
+        delta = deltas[(departments.get(employee_id), salary_item_type_id)]
+        delta[0] += amount
+        delta[1] += count
+    with transaction.atomic():
+        for (department_id, salary_item_type_id), (amount, count) in deltas.items():
+            if amount or count:
+                apply_delta(organization_id, financial_period.pk, department_id, salary_item_type_id, amount, count)
+
+
+def move_employee(employee_id, organization_id, financial_period, from_department_id, to_department_id):
+    """
+    Moves an employee's items of the period from one department row to another.
+    """
+    items = EmployeeSalaryItem.objects.filter(
+        employee_id=employee_id,
+        financial_period_id=financial_period.pk,
+        salary_item_type__organization_id=organization_id,
+    ).values('salary_item_type_id').annotate(total=Sum('amount'), count=Count('pk'))
+    with transaction.atomic():
+        for row in items:
+            apply_delta(organization_id, financial_period.pk, from_department_id,
+                        row['salary_item_type_id'], -row['total'], -row['count'])
+            apply_delta(organization_id, financial_period.pk, to_department_id,
+                        row['salary_item_type_id'], row['total'], row['count'])
+
+
+def department_rows(department):
+    """
+    The department's summary rows as (organization_id, financial_period_id,
+    salary_item_type_id, total_amount, item_count) tuples.
+    """
+    return list(PayrollSummary.objects.filter(department=department).values_list(
+        'organization_id', 'financial_period_id', 'salary_item_type_id', 'total_amount', 'item_count',
+    ))
+
+
+def merge_into_no_department(rows):
+    """
+    Adds the rows of a deleted department to the "no department" rows.
+    """
+    with transaction.atomic():
+        for organization_id, financial_period_id, salary_item_type_id, amount, count in rows:
+            apply_delta(organization_id, financial_period_id, None, salary_item_type_id, amount, count)
+
+
+def rebuild_period(organization, financial_period):
+    """
+    Recomputes the summary of one organization and period from the salary
+    items with a single grouped query. Returns the number of rows written.
+    """
+    grouped = EmployeeSalaryItem.objects.filter(
+        financial_period=financial_period,
+        salary_item_type__organization=organization,
+    ).annotate(
+        summary_department=department_subquery(organization.pk, financial_period),
+    ).values('summary_department', 'salary_item_type_id').annotate(
+        total=Sum('amount'),
+        count=Count('pk'),
+    ).order_by()
+    summaries = [
+        PayrollSummary(
+            organization=organization,
+            financial_period=financial_period,
+            department_id=row['summary_department'],
+            salary_item_type_id=row['salary_item_type_id'],
+            total_amount=row['total'],
+            item_count=row['count'],
+        )
+        for row in grouped
+    ]
+    with transaction.atomic():
+        PayrollSummary.objects.filter(organization=organization, financial_period=financial_period).delete()
+        PayrollSummary.objects.bulk_create(summaries, batch_size=BATCH_SIZE)
+    return len(summaries)
+
+
+def summarized_periods(organization=None, financial_period=None):
+    """
+    (organization, financial_period) pairs that have salary item types.
+    """
+    pairs = SalaryItemType.objects.all()
+    if organization is not None:
+        pairs = pairs.filter(organization=organization)
+    if financial_period is not None:
+        pairs = pairs.filter(financial_period=financial_period)
+    pairs = pairs.order_by('organization_id', 'financial_period_id').values_list(
+        'organization_id', 'financial_period_id',
+    ).distinct()
+    pairs = list(pairs)
+    periods = FinancialPeriod.objects.in_bulk({period_id for _organization_id, period_id in pairs})
+    organizations = Organization.objects.in_bulk({organization_id for organization_id, _period_id in pairs})
+    return [(organizations[organization_id], periods[period_id]) for organization_id, period_id in pairs]
+
+
+def department_totals(organization, financial_period):
+    """
+    Earnings and deductions of a period per department, from the summary rows.
+    """
+    return PayrollSummary.objects.filter(
+        organization=organization,
+        financial_period=financial_period,
+    ).values('department_id', 'department__name').annotate(
+        earnings=Sum('total_amount', filter=Q(salary_item_type__is_deduction=False), default=Decimal('0')),
+        deductions=Sum('total_amount', filter=Q(salary_item_type__is_deduction=True), default=Decimal('0')),
+        items=Sum('item_count'),
+    ).order_by('department__name')
+
+
+def item_type_totals(organization, financial_period):
+    """
+    Total amount and item count of a period per salary item type, from the summary rows.
+    """
+    return PayrollSummary.objects.filter(
+        organization=organization,
+        financial_period=financial_period,
+    ).values('salary_item_type_id', 'salary_item_type__name', 'salary_item_type__is_deduction').annotate(
+        total=Sum('total_amount'),
+        items=Sum('item_count'),
+    ).order_by('salary_item_type__is_deduction', 'salary_item_type__name')
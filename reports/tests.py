@@ -1,3 +1,205 @@
+import csv
+import datetime
+import io
+import os
+import tempfile
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
 from django.test import TestCase
 
-# Create your tests here.
+from accounting_salary.testing import PayrollTestDataMixin
+from hr.models import Department, EmploymentHistory
+from salaries.models import EmployeeSalaryItem, PayrollRun, SalaryItemType
+from salaries.payroll import close_payroll_run, run_payroll
+
+from .models import PayrollSummary
+from .payslips import PayslipBatchRenderer, render_payslips
+from .register import PayrollRegister
+from .summary import rebuild_period
+
+
+class RenderPayslipsTests(PayrollTestDataMixin, TestCase):
+    """
+    فیش حقوقی فقط از اجرای بسته شده صادر می‌شود.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.employees = [cls.create_employee(number) for number in (1, 2, 3)]
+        base = SalaryItemType.objects.create(
+            organization=cls.organization, financial_period=cls.financial_period,
+            name="حقوق پایه", is_base_salary=True,
+        )
+        for employee in cls.employees:
+            EmployeeSalaryItem.objects.create(
+                employee=employee, financial_period=cls.financial_period,
+                salary_item_type=base, amount=Decimal('1000000'),
+            )
+        cls.payroll_run = PayrollRun.objects.create(organization=cls.organization, financial_period=cls.financial_period)
+
+    def test_draft_run_is_refused(self):
+        with self.assertRaises(ValidationError):
+            render_payslips(self.organization, self.financial_period, '/nonexistent')
+
+    def test_one_pdf_per_employee(self):
+        close_payroll_run(run_payroll(self.organization, self.financial_period))
+        with tempfile.TemporaryDirectory() as output_dir:
+            paths, _elapsed = render_payslips(self.organization, self.financial_period, output_dir, workers=1)
+            self.assertEqual(
+                [os.path.basename(path) for path in paths],
+                [f"payslip_{employee.pk}.pdf" for employee in self.employees],
+            )
+            for path in paths:
+                with open(path, 'rb') as pdf:
+                    self.assertEqual(pdf.read(5), b'%PDF-')
+
+    def test_merged_batches_across_processes(self):
+        close_payroll_run(run_payroll(self.organization, self.financial_period))
+        progress = []
+        with tempfile.TemporaryDirectory() as output_dir:
+            paths, _elapsed = render_payslips(
+                self.organization, self.financial_period, output_dir,
+                workers=2, batch_size=2, merged=True, progress=lambda done, total: progress.append((done, total)),
+            )
+            self.assertEqual(len(paths), 2)
+        self.assertEqual(progress[-1], (3, 3))
+
+    def test_merged_file_name_includes_organization(self):
+        renderer = PayslipBatchRenderer(self.payroll_run, '/nonexistent', merged=True)
+        self.assertEqual(
+            renderer._single_file(3),
+            f"payslips_{self.organization.pk}_{self.financial_period.pk}_0003.pdf",
+        )
+
+
+class PayrollRegisterTests(PayrollTestDataMixin, TestCase):
+    """
+    ستون‌های نتیجه لیست حقوق فقط از اجرای بسته شده خوانده می‌شوند.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        EmployeeSalaryItem.objects.create(
+            employee=cls.create_employee(), financial_period=cls.financial_period,
+            salary_item_type=SalaryItemType.objects.create(
+                organization=cls.organization, financial_period=cls.financial_period,
+                name="حقوق پایه", is_base_salary=True,
+            ),
+            amount=Decimal('1000000'),
+        )
+
+    def rows(self):
+        return list(PayrollRegister(self.organization, self.financial_period).rows())
+
+    def test_open_run_has_no_result_columns(self):
+        run_payroll(self.organization, self.financial_period)
+        header, row = self.rows()
+        self.assertEqual(len(header), 5)
+        self.assertEqual(len(row), 5)
+
+    def test_closed_run_adds_stored_results(self):
+        close_payroll_run(run_payroll(self.organization, self.financial_period))
+        header, row = self.rows()
+        self.assertEqual(len(header), 9)
+        # Earnings and net pay of the stored result line.
+        self.assertEqual(row[5], Decimal('1000000.00'))
+        self.assertEqual(row[-1], Decimal('1000000.00'))
+
+    def test_csv_and_xlsx_hold_the_same_rows(self):
+        from openpyxl import load_workbook
+
+        close_payroll_run(run_payroll(self.organization, self.financial_period))
+        register = PayrollRegister(self.organization, self.financial_period)
+        csv_rows = list(csv.reader(io.StringIO(''.join(register.csv_lines()).lstrip('\ufeff'))))
+        with register.write_xlsx() as fileobj:
+            sheet = load_workbook(fileobj, read_only=True).active
+            self.assertEqual(sheet.title, self.financial_period.name)
+            xlsx_rows = [['' if value is None else str(value) for value in row] for row in sheet.values]
+        self.assertEqual(len(csv_rows), 2)
+        self.assertEqual(len(xlsx_rows), 2)
+        self.assertEqual(xlsx_rows[0], csv_rows[0])
+
+
+class PayrollSummaryTests(PayrollTestDataMixin, TestCase):
+    """
+    جدول خلاصه حقوق با هر تغییر آیتم یا سابقه شغلی همان نتیجه بازسازی کامل را دارد.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.finance = Department.objects.create(organization=cls.organization, name="مالی")
+        cls.sales = Department.objects.create(organization=cls.organization, name="فروش")
+        cls.employee, cls.unassigned = cls.create_employee(1), cls.create_employee(2)
+        cls.history = EmploymentHistory.objects.create(
+            employee=cls.employee, organization=cls.organization, department=cls.finance,
+            start_date=datetime.date(2024, 1, 1),
+        )
+        cls.base = SalaryItemType.objects.create(
+            organization=cls.organization, financial_period=cls.financial_period,
+            name="حقوق پایه", is_base_salary=True,
+        )
+        cls.bonus = SalaryItemType.objects.create(
+            organization=cls.organization, financial_period=cls.financial_period, name="پاداش",
+        )
+
+    def create_item(self, employee, item_type, amount):
+        return EmployeeSalaryItem.objects.create(
+            employee=employee, financial_period=self.financial_period,
+            salary_item_type=item_type, amount=Decimal(amount),
+        )
+
+    def summary(self):
+        # Rows brought back to zero by deltas are equivalent to missing rows.
+        return {
+            (row.department_id, row.salary_item_type_id): (row.total_amount, row.item_count)
+            for row in PayrollSummary.objects.filter(organization=self.organization)
+            if row.total_amount or row.item_count
+        }
+
+    def assertSummary(self, expected):
+        expected = {key: (Decimal(total), count) for key, (total, count) in expected.items()}
+        self.assertEqual(self.summary(), expected)
+        # The maintained rows must match a rebuild from the salary items.
+        rebuild_period(self.organization, self.financial_period)
+        self.assertEqual(self.summary(), expected)
+
+    def test_new_items_are_added_per_department(self):
+        self.create_item(self.employee, self.base, '1000')
+        self.create_item(self.unassigned, self.base, '500')
+        self.create_item(self.employee, self.bonus, '200')
+        self.assertSummary({
+            (self.finance.pk, self.base.pk): ('1000', 1),
+            (None, self.base.pk): ('500', 1),
+            (self.finance.pk, self.bonus.pk): ('200', 1),
+        })
+
+    def test_changed_amount_and_item_type_apply_deltas(self):
+        item = self.create_item(self.employee, self.base, '1000')
+        item.amount = Decimal('1500')
+        item.save()
+        self.assertSummary({(self.finance.pk, self.base.pk): ('1500', 1)})
+        item.salary_item_type = self.bonus
+        item.save()
+        self.assertSummary({(self.finance.pk, self.bonus.pk): ('1500', 1)})
+
+    def test_deleted_item_is_subtracted(self):
+        self.create_item(self.employee, self.base, '1000')
+        self.create_item(self.unassigned, self.base, '500').delete()
+        self.assertSummary({(self.finance.pk, self.base.pk): ('1000', 1)})
+
+    def test_department_change_moves_the_employee_items(self):
+        self.create_item(self.employee, self.base, '1000')
+        self.history.department = self.sales
+        self.history.save()
+        self.assertSummary({(self.sales.pk, self.base.pk): ('1000', 1)})
+
+    def test_deleted_department_merges_into_no_department(self):
+        self.create_item(self.employee, self.base, '1000')
+        self.create_item(self.unassigned, self.base, '500')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.finance.delete()
+        self.assertSummary({(None, self.base.pk): ('1500', 2)})
@@ -0,0 +1,22 @@
+from django.urls import path
+
+from .views import PayrollRegisterExport, PayrollSummaryView
+
+app_name = 'reports'  # Namespace for this app's URLs
+
+urlpatterns = [
+    # Payroll register of an organization in a financial period (CSV or XLSX)
+    # Example: /reports/organization/1/period/5/payroll-register/?file_format=xlsx
+    path(
+        'organization/<int:organization_pk>/period/<int:financial_period_pk>/payroll-register/',
+        PayrollRegisterExport.as_view(),
+        name='payroll_register'
+    ),
+    # Per-department and per-item-type totals of a period, from the summary table
+    # Example: /reports/organization/1/period/5/summary/
+    path(
+        'organization/<int:organization_pk>/period/<int:financial_period_pk>/summary/',
+        PayrollSummaryView.as_view(),
+        name='payroll_summary'
+    ),
+]
@@ -1,3 +1,57 @@
-from django.shortcuts import render
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.core.exceptions import ValidationError
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.views.generic import TemplateView, View
 
-# Create your views here.
+from accounting_salary.mixins import OrganizationPeriodMixin
+
+from .register import PayrollRegister
+from .summary import department_totals, item_type_totals
+
+
+class PayrollRegisterExport(LoginRequiredMixin, OrganizationPeriodMixin, UserPassesTestMixin, View):
+    """
+    دریافت لیست حقوق یک سازمان در یک دوره مالی (?file_format=csv یا xlsx).
+    CSV به صورت جریانی ارسال می‌شود؛ XLSX ابتدا در یک فایل موقت نوشته می‌شود.
+    """
+    organization_permission = 'salaries.view_employeesalaryitem'
+
+    def get(self, request, *args, **kwargs):
+        register = PayrollRegister(self.organization, self.financial_period)
+        if request.GET.get('file_format') == 'xlsx':
+            try:
+                fileobj = register.write_xlsx()
+            except ValidationError as exc:
+                return HttpResponse(' '.join(exc.messages), status=400, content_type='text/plain; charset=utf-8')
+            return FileResponse(
+                fileobj,
+                as_attachment=True,
+                filename=f"{register.filename}.xlsx",
+                content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            )
+
+        response = StreamingHttpResponse(register.csv_lines(), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{register.filename}.csv"'
+        return response
+
+
+class PayrollSummaryView(LoginRequiredMixin, OrganizationPeriodMixin, UserPassesTestMixin, TemplateView):
+    """
+    داشبورد جمع آیتم‌های حقوقی یک دوره به تفکیک دپارتمان و نوع آیتم،
+    خوانده شده از جدول خلاصه حقوق (PayrollSummary).
+    """
+    template_name = 'reports/payroll_summary.html'
+    organization_permission = 'salaries.view_employeesalaryitem'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        departments = list(department_totals(self.organization, self.financial_period))
+        context.update({
+            'organization': self.organization,
+            'financial_period': self.financial_period,
+            'department_totals': departments,
+            'item_type_totals': item_type_totals(self.organization, self.financial_period),
+            'total_earnings': sum(row['earnings'] for row in departments),
+            'total_deductions': sum(row['deductions'] for row in departments),
+        })
+        return context
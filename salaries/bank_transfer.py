@@ -0,0 +1,230 @@
+"""
+فایل انتقال بانکی خالص پرداختی (شبا / پایا / ساتنا).
+
+ردیف‌های نتیجه یک اجرای بسته شده حقوق به همراه حساب بانکی فعال هر کارمند با
+یک کوئری خوانده می‌شوند و با iterator() ردیف به ردیف به فایل یا پاسخ HTTP
+نوشته می‌شوند؛ هیچ‌گاه همه ردیف‌ها در حافظه نگه داشته نمی‌شوند، پس مصرف حافظه
+برای ده‌ها هزار دریافت‌کننده ثابت است. جمع مبالغ و تعداد ردیف‌ها در رکورد
+پایانی فایل (trailer) نوشته می‌شوند.
+
+دریافت‌کنندگان بدون شبای معتبر در فایل نوشته نمی‌شوند؛ check_payees() آن‌ها را
+پیش از تولید فایل (بدون خواندن سایر ستون‌ها) پیدا می‌کند و با ValidationError
+نامشان را برمی‌گرداند. نما، کار پس‌زمینه و دستور مدیریتی همگی پیش از نوشتن
+فایل آن را فراخوانی می‌کنند تا به جای فایلی که کامل به نظر می‌رسد خطا بدهند.
+
+قالب‌ها:
+  csv     یک ردیف عنوان و یک ردیف برای هر دریافت‌کننده
+  paya    رکوردهای با طول ثابت (طول فیلدها بر حسب بایت در UTF-8؛ هر حرف نام
+          فارسی دو بایت است و هیچ حرفی نصفه بریده نمی‌شود):
+            H | کد سازمان (10) | شناسه دوره (10) | تاریخ ایجاد YYYYMMDD (8)
+            D | ردیف (6) | شبا (26) | مبلغ به ریال (15، با صفر در ابتدا) | کد ملی (10) | نام (35)
+            T | تعداد ردیف‌ها (6) | جمع مبالغ (18)
+"""
+import re
+from decimal import ROUND_HALF_UP
+
+from django.core.exceptions import ValidationError
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+from django.utils.translation import gettext as _
+
+from accounting_salary.streaming import iter_csv
+from employees.models import BankAccount, Employee
+
+from .models import PayrollRun, PayrollResultLine
+
+
+FORMAT_CSV = 'csv'
+FORMAT_PAYA = 'paya'
+FORMATS = (FORMAT_CSV, FORMAT_PAYA)
+
+CSV_HEADER = ['row', 'sheba', 'amount', 'national_code', 'personnel_code', 'name', 'bank_name', 'account_number']
+
+SHEBA_RE = re.compile(r'^IR\d{24}$')
+ITERATOR_CHUNK_SIZE = 2000
+SKIPPED_LISTED = 200  # payees named in the check_payees() error
+
+
+FILE_ENCODING = 'utf-8'
+
+
+def _fixed(value, width, fill=' ', align='left'):
+    """
+    `value` cut and padded to exactly `width` bytes in FILE_ENCODING, without
+    splitting a multibyte character. `fill` must be a single-byte character.
+    """
+    value = str(value or '').encode(FILE_ENCODING)[:width].decode(FILE_ENCODING, 'ignore')
+    padding = fill * (width - len(value.encode(FILE_ENCODING)))
+    return value + padding if align == 'left' else padding + value
+
+
+def check_sheba(sheba):
+    """
+    (normalized SHEBA, None) for a payable account, or (None, reason) when the
+    payee has to be left out of the file.
+    """
+    sheba = (sheba or '').replace(' ', '').upper()
+    if not sheba:
+        return None, _("حساب بانکی فعال با شماره شبا ثبت نشده است.")
+    if not SHEBA_RE.match(sheba):
+        return None, _("شماره شبا «%(sheba)s» نامعتبر است.") % {'sheba': sheba}
+    return sheba, None
+
+
+def get_closed_run(organization, financial_period):
+    payroll_run = PayrollRun.objects.filter(
+        organization=organization,
+        financial_period=financial_period,
+    ).select_related('organization', 'financial_period').first()
+    if payroll_run is None or not payroll_run.is_closed:
+        raise ValidationError(_("فایل بانکی فقط برای اجرای بسته شده حقوق این دوره قابل تهیه است."))
+    return payroll_run
+
+
+class BankTransferFile:
+    """
+    تولید فایل انتقال بانکی یک اجرای حقوق به صورت جریانی.
+    پس از پیمایش کامل lines()، count و total جمع ردیف‌های نوشته شده و skipped
+    فهرست (شناسه کارمند، دلیل) ردیف‌های کنار گذاشته شده است.
+    """
+
+    def __init__(self, payroll_run, file_format=FORMAT_CSV):
+        if file_format not in FORMATS:
+            raise ValidationError(_("قالب فایل بانکی نامعتبر است."))
+        self.payroll_run = payroll_run
+        self.file_format = file_format
+        self.count = 0
+        self.total = 0
+        self.skipped = []
+
+    @property
+    def filename(self):
+        extension = 'csv' if self.file_format == FORMAT_CSV else 'txt'
+        return f"bank_transfer_{self.payroll_run.organization_id}_{self.payroll_run.financial_period_id}.{extension}"
+
+    def get_queryset(self):
+        """
+        Positive net-pay lines with the employee's most recently updated active
+        bank account, as flat value tuples.
+        """
+        account = BankAccount.objects.filter(
+            employee_id=OuterRef('employee_id'),
+            is_active=True,
+        ).order_by('-updated_at', '-pk')
+        return PayrollResultLine.objects.filter(
+            payroll_run=self.payroll_run,
+            net_pay__gt=0,
+        ).annotate(
+            sheba=Subquery(account.values('sheba_number')[:1]),
+            bank_name=Subquery(account.values('bank_name')[:1]),
+            account_number=Subquery(account.values('account_number')[:1]),
+        ).order_by('employee_id').values_list(
+            'employee_id',
+            'net_pay',
+            'employee__national_code',
+            'employee__personnel_code',
+            'employee__first_name',
+            'employee__last_name',
+            'sheba',
+            'bank_name',
+            'account_number',
+        )
+
+    def find_skipped(self):
+        """
+        The (employee id, reason) pairs the file would leave out, found
+        without generating it; also stored in `skipped`.
+        """
+        rows = self.get_queryset().values_list('employee_id', 'sheba').iterator(chunk_size=ITERATOR_CHUNK_SIZE)
+        self.skipped = []
+        for employee_id, sheba in rows:
+            sheba, reason = check_sheba(sheba)
+            if reason is not None:
+                self.skipped.append((employee_id, reason))
+        return self.skipped
+
+    def check_payees(self, listed=SKIPPED_LISTED):
+        """
+        Raises ValidationError naming the payees the file would leave out
+        (the first `listed` of them, one message each).
+        """
+        skipped = self.find_skipped()
+        if not skipped:
+            return
+        employees = Employee.objects.only('first_name', 'last_name', 'national_code').in_bulk(
+            [employee_id for employee_id, _reason in skipped[:listed]]
+        )
+        messages = [_("فایل بانکی تهیه نشد: %(count)s دریافت‌کننده حساب بانکی با شماره شبای معتبر ندارد.") % {
+            'count': len(skipped),
+        }]
+        for employee_id, reason in skipped[:listed]:
+            employee = employees[employee_id]
+            messages.append(f"{employee} ({employee.national_code}): {reason}")
+        if len(skipped) > listed:
+            messages.append(_("و %(count)s مورد دیگر.") % {'count': len(skipped) - listed})
+        raise ValidationError(messages)
+
+    def payees(self):
+        """
+        Yields one dict per payable line; lines without a valid SHEBA are skipped.
+        """
+        self.count, self.total, self.skipped = 0, 0, []
+        rows = self.get_queryset().iterator(chunk_size=ITERATOR_CHUNK_SIZE)
+        for (employee_id, net_pay, national_code, personnel_code, first_name, last_name,
+             sheba, bank_name, account_number) in rows:
+            sheba, reason = check_sheba(sheba)
+            if reason is not None:
+                self.skipped.append((employee_id, reason))
+                continue
+            amount = int(net_pay.quantize(1, rounding=ROUND_HALF_UP))
+            self.count += 1
+            self.total += amount
+            yield {
+                'row': self.count,
+                'sheba': sheba,
+                'amount': amount,
+                'national_code': national_code,
+                'personnel_code': personnel_code or '',
+                'name': f"{first_name} {last_name}",
+                'bank_name': bank_name or '',
+                'account_number': account_number or '',
+            }
+
+    def lines(self):
+        """
+        Yields the file's text lines (newline included), one payee at a time.
+        """
+        if self.file_format == FORMAT_CSV:
+            rows = ([payee[column] for column in CSV_HEADER] for payee in self.payees())
+            yield from iter_csv([CSV_HEADER])
+            yield from iter_csv(rows)
+            return
+
+        yield ''.join([
+            'H',
+            _fixed(self.payroll_run.organization.code or self.payroll_run.organization_id, 10),
+            _fixed(self.payroll_run.financial_period_id, 10, '0', 'right'),
+            timezone.localdate().strftime('%Y%m%d'),
+        ]) + '\r\n'
+        for payee in self.payees():
+            yield ''.join([
+                'D',
+                _fixed(payee['row'], 6, '0', 'right'),
+                _fixed(payee['sheba'], 26),
+                _fixed(payee['amount'], 15, '0', 'right'),
+                _fixed(payee['national_code'], 10, '0', 'right'),
+                _fixed(payee['name'], 35),
+            ]) + '\r\n'
+        yield ''.join([
+            'T',
+            _fixed(self.count, 6, '0', 'right'),
+            _fixed(self.total, 18, '0', 'right'),
+        ]) + '\r\n'
+
+    def write(self, fileobj):
+        """
+        Writes the whole file to a text file object; returns the payee count.
+        """
+        for line in self.lines():
+            fileobj.write(line)
+        return self.count
@@ -0,0 +1,228 @@
+"""
+ویرایشگر جدولی آیتم‌های حقوقی یک دوره مالی.
+
+سطرها کارکنان سازمان و ستون‌ها انواع آیتم‌های حقوقی دوره هستند. بارگذاری جدول
+مستقل از تعداد کارکنان با سه کوئری انجام می‌شود و تغییرات ارسالی کاربر (فقط
+خانه‌های تغییر کرده) در یک تراکنش با یک bulk_create(update_conflicts=True) روی
+قید یکتای unique_employee_salary_item_per_period اعمال می‌شوند.
+"""
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q
+from django.utils.translation import gettext as _
+
+from organizations.models import EmployeeOrganization
+from reports.summary import apply_item_changes
+
+from .models import EmployeeSalaryItem, SalaryItemType
+from .payroll import mark_dirty
+
+
+UNIQUE_FIELDS = ['employee', 'financial_period', 'salary_item_type']
+DELETE_BATCH_SIZE = 500
+
+
+def period_members(organization, financial_period):
+    """
+    Employees of the organization whose membership overlaps the period.
+    """
+    return EmployeeOrganization.objects.filter(
+        organization=organization,
+        start_date__lte=financial_period.end_date,
+    ).filter(
+        Q(end_date__gte=financial_period.start_date) | Q(end_date__isnull=True)
+    )
+
+
+class SalaryItemGrid:
+    """
+    جدول کارکنان × انواع آیتم حقوقی یک سازمان در یک دوره مالی.
+    """
+
+    def __init__(self, organization, financial_period):
+        self.organization = organization
+        self.financial_period = financial_period
+
+    def load_item_types(self):
+        return list(
+            SalaryItemType.objects.filter(
+                organization=self.organization,
+                financial_period=self.financial_period,
+            ).order_by('name').values('pk', 'name', 'item_type', 'is_deduction')
+        )
+
+    def load_employees(self):
+        return list(
+            period_members(self.organization, self.financial_period).order_by(
+                'employee__last_name', 'employee__first_name', 'employee_id',
+            ).values_list(
+                'employee_id', 'employee__first_name', 'employee__last_name', 'employee__personnel_code',
+            ).distinct()
+        )
+
+    def load_amounts(self):
+        return EmployeeSalaryItem.objects.filter(
+            financial_period=self.financial_period,
+            salary_item_type__organization=self.organization,
+        ).values_list('employee_id', 'salary_item_type_id', 'amount')
+
+    def as_dict(self):
+        """
+        JSON-ready grid: {"columns": [...], "rows": [{"employee": id, "cells": {type id: amount}}]}.
+        """
+        rows = {}
+        for employee_id, first_name, last_name, personnel_code in self.load_employees():
+            rows[employee_id] = {
+                'employee': employee_id,
+                'name': f"{first_name} {last_name}",
+                'personnel_code': personnel_code or '',
+                'cells': {},
+            }
+        for employee_id, item_type_id, amount in self.load_amounts():
+            row = rows.get(employee_id)
+            if row is not None:
+                row['cells'][str(item_type_id)] = str(amount)
+        return {
+            'organization': self.organization.pk,
+            'financial_period': self.financial_period.pk,
+            'columns': [
+                {
+                    'id': item_type['pk'],
+                    'name': item_type['name'],
+                    'item_type': item_type['item_type'],
+                    'is_deduction': item_type['is_deduction'],
+                }
+                for item_type in self.load_item_types()
+            ],
+            'rows': list(rows.values()),
+        }
+
+
+def _parse_change(change, amount_field):
+    """
+    Returns (employee id, item type id, Decimal amount or None for deletion).
+    """
+    if not isinstance(change, dict):
+        raise ValidationError(_("قالب تغییر نامعتبر است."))
+    try:
+        employee_id = int(change['employee'])
+        item_type_id = int(change['item_type'])
+    except (KeyError, TypeError, ValueError):
+        raise ValidationError(_("کارمند و نوع آیتم حقوقی باید مشخص شوند."))
+    amount = change.get('amount')
+    if amount is None or amount == '':
+        return employee_id, item_type_id, None
+    return employee_id, item_type_id, amount_field.clean(str(amount), None)
+
+
+def current_amounts(financial_period, cells):
+    """
+    {(employee_id, item_type_id): amount} of the given cells that already have an item.
+    """
+    cells = set(cells)
+    if not cells:
+        return {}
+    rows = EmployeeSalaryItem.objects.filter(
+        financial_period=financial_period,
+        employee_id__in={employee_id for employee_id, _item_type_id in cells},
+        salary_item_type_id__in={item_type_id for _employee_id, item_type_id in cells},
+    ).values_list('employee_id', 'salary_item_type_id', 'amount')
+    return {
+        (employee_id, item_type_id): amount
+        for employee_id, item_type_id, amount in rows
+        if (employee_id, item_type_id) in cells
+    }
+
+
+def apply_grid_changes(organization, financial_period, changes):
+    """
+    Applies a batch of cell changes in one transaction and returns
+    {"saved": n, "deleted": n}. Each change is
+    {"employee": id, "item_type": id, "amount": "1500000.00" | null};
+    a null/empty amount deletes the cell.
+
+    The batch is all-or-nothing: any invalid change raises a ValidationError
+    whose message dict is keyed by the change's index in `changes`.
+    """
+    amount_field = EmployeeSalaryItem._meta.get_field('amount')
+    allowed_types = set(
+        SalaryItemType.objects.filter(
+            organization=organization,
+            financial_period=financial_period,
+        ).values_list('pk', flat=True)
+    )
+
+    parsed = []
+    errors = {}
+    for index, change in enumerate(changes):
+        try:
+            parsed.append(_parse_change(change, amount_field))
+        except ValidationError as exc:
+            errors[str(index)] = exc.messages
+            parsed.append(None)
+
+    employee_ids = {cell[0] for cell in parsed if cell is not None}
+    members = set(
+        period_members(organization, financial_period).filter(
+            employee_id__in=employee_ids,
+        ).values_list('employee_id', flat=True)
+    )
+    for index, cell in enumerate(parsed):
+        if cell is None:
+            continue
+        employee_id, item_type_id, _amount = cell
+        if employee_id not in members:
+            errors.setdefault(str(index), []).append(_("کارمند در این دوره عضو سازمان نیست."))
+        if item_type_id not in allowed_types:
+            errors.setdefault(str(index), []).append(_("نوع آیتم حقوقی متعلق به این سازمان و دوره نیست."))
+    if errors:
+        raise ValidationError(errors)
+
+    # The last change to a cell wins.
+    cells = {}
+    for employee_id, item_type_id, amount in parsed:
+        cells[(employee_id, item_type_id)] = amount
+    upserts = [
+        EmployeeSalaryItem(
+            employee_id=employee_id,
+            financial_period=financial_period,
+            salary_item_type_id=item_type_id,
+            amount=amount,
+        )
+        for (employee_id, item_type_id), amount in cells.items()
+        if amount is not None
+    ]
+    deletions = [key for key, amount in cells.items() if amount is None]
+
+    deleted = 0
+    with transaction.atomic():
+        if upserts:
+            previous = current_amounts(financial_period, [(item.employee_id, item.salary_item_type_id) for item in upserts])
+            EmployeeSalaryItem.objects.bulk_create(
+                upserts,
+                update_conflicts=True,
+                unique_fields=UNIQUE_FIELDS,
+                update_fields=['amount', 'updated_at'],
+            )
+            # Deletions below send signals; the upserts update the summary here.
+            apply_item_changes(organization.pk, financial_period, [
+                (
+                    item.employee_id,
+                    item.salary_item_type_id,
+                    item.amount - previous.get((item.employee_id, item.salary_item_type_id), 0),
+                    0 if (item.employee_id, item.salary_item_type_id) in previous else 1,
+                )
+                for item in upserts
+            ])
+        for start in range(0, len(deletions), DELETE_BATCH_SIZE):
+            condition = Q()
+            for employee_id, item_type_id in deletions[start:start + DELETE_BATCH_SIZE]:
+                condition |= Q(employee_id=employee_id, salary_item_type_id=item_type_id)
+            deleted += EmployeeSalaryItem.objects.filter(condition, financial_period=financial_period).delete()[0]
+        # bulk_create sends no post_save signals; flag the payroll lines here.
+        mark_dirty(
+            financial_period_id=financial_period.pk,
+            organization_id=organization.pk,
+            employee_ids={employee_id for employee_id, _item_type_id in cells},
+        )
+    return {'saved': len(upserts), 'deleted': deleted}
@@ -0,0 +1,77 @@
+import time
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from organizations.models import Organization
+from settings_app.models import FinancialPeriod
+from salaries.models import PayrollRun
+from salaries.payroll import close_payroll_run, compute_period_payroll, recompute_dirty, run_payroll
+from salaries.proration import prorate_period
+
+
+class Command(BaseCommand):
+    help = "محاسبه حقوق یک دوره مالی برای تمام کارکنان یک سازمان"
+
+    def add_arguments(self, parser):
+        parser.add_argument('organization_pk', type=int)
+        parser.add_argument('financial_period_pk', type=int)
+        parser.add_argument(
+            '--save', action='store_true',
+            help="Store the results as the payroll run snapshot of the period.",
+        )
+        parser.add_argument(
+            '--incremental', action='store_true',
+            help="Recompute only the dirty lines of the existing payroll run.",
+        )
+        parser.add_argument(
+            '--prorate', action='store_true',
+            help="Recompute the work-record based salary items (daily items, overtime, deficit) first.",
+        )
+        parser.add_argument(
+            '--close', action='store_true',
+            help="Freeze the payroll run snapshot after computing.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            organization = Organization.objects.get(pk=options['organization_pk'])
+            financial_period = FinancialPeriod.objects.select_related('fiscal_year').get(
+                pk=options['financial_period_pk']
+            )
+        except (Organization.DoesNotExist, FinancialPeriod.DoesNotExist) as exc:
+            raise CommandError(str(exc))
+
+        started = time.perf_counter()
+        try:
+            if options['prorate']:
+                result = prorate_period(organization, financial_period)
+                self.stdout.write(
+                    f"Prorated {len(result)} work records into {result.lines} salary items "
+                    f"({time.perf_counter() - started:.2f}s)"
+                )
+            if options['incremental']:
+                try:
+                    payroll_run = PayrollRun.objects.get(organization=organization, financial_period=financial_period)
+                except PayrollRun.DoesNotExist:
+                    raise CommandError("No payroll run exists for this period yet; run with --save first.")
+                count = recompute_dirty(payroll_run)
+                self.stdout.write(f"Recomputed {count} dirty lines ({time.perf_counter() - started:.2f}s)")
+            elif options['save'] or options['close']:
+                payroll_run = run_payroll(organization, financial_period)
+                self.stdout.write(
+                    f"Stored {payroll_run.lines.count()} lines ({time.perf_counter() - started:.2f}s)"
+                )
+            else:
+                result = compute_period_payroll(organization, financial_period)
+                elapsed = time.perf_counter() - started
+                self.stdout.write(f"Employees: {len(result)} ({elapsed:.2f}s)")
+                for column, total in result.totals().items():
+                    self.stdout.write(f"  {column}: {total}")
+                return
+
+            if options['close']:
+                close_payroll_run(payroll_run)
+                self.stdout.write("Payroll run closed.")
+        except ValidationError as exc:
+            raise CommandError(' '.join(exc.messages))
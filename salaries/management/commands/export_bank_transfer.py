@@ -0,0 +1,44 @@
+import time
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from organizations.models import Organization
+from settings_app.models import FinancialPeriod
+from salaries.bank_transfer import FORMAT_CSV, FORMATS, BankTransferFile, get_closed_run
+
+
+class Command(BaseCommand):
+    help = "تهیه فایل انتقال بانکی خالص پرداختی اجرای بسته شده حقوق یک دوره"
+
+    def add_arguments(self, parser):
+        parser.add_argument('organization_pk', type=int)
+        parser.add_argument('financial_period_pk', type=int)
+        parser.add_argument('--format', choices=FORMATS, default=FORMAT_CSV, dest='file_format')
+        parser.add_argument(
+            '--output',
+            help="File to write; defaults to standard output.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            organization = Organization.objects.get(pk=options['organization_pk'])
+            financial_period = FinancialPeriod.objects.get(pk=options['financial_period_pk'])
+        except (Organization.DoesNotExist, FinancialPeriod.DoesNotExist) as exc:
+            raise CommandError(str(exc))
+
+        started = time.perf_counter()
+        try:
+            transfer = BankTransferFile(get_closed_run(organization, financial_period), options['file_format'])
+            transfer.check_payees()
+            if options['output']:
+                with open(options['output'], 'w', encoding='utf-8', newline='') as fileobj:
+                    transfer.write(fileobj)
+            else:
+                transfer.write(self.stdout)
+        except ValidationError as exc:
+            raise CommandError('\n'.join(exc.messages))
+
+        self.stderr.write(
+            f"Payees: {transfer.count}, total: {transfer.total} ({time.perf_counter() - started:.2f}s)"
+        )
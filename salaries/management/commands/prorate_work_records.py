@@ -0,0 +1,45 @@
+import time
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from organizations.models import Organization
+from settings_app.models import FinancialPeriod
+from salaries.proration import compute_proration, prorate_period
+
+
+class Command(BaseCommand):
+    help = "محاسبه مبلغ آیتم‌های روزانه، اضافه کاری و کسر کار از کارکرد ماهیانه یک دوره مالی"
+
+    def add_arguments(self, parser):
+        parser.add_argument('organization_pk', type=int)
+        parser.add_argument('financial_period_pk', type=int)
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help="Compute and print the totals without writing salary items.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            organization = Organization.objects.get(pk=options['organization_pk'])
+            financial_period = FinancialPeriod.objects.select_related('fiscal_year').get(
+                pk=options['financial_period_pk']
+            )
+        except (Organization.DoesNotExist, FinancialPeriod.DoesNotExist) as exc:
+            raise CommandError(str(exc))
+
+        started = time.perf_counter()
+        try:
+            if options['dry_run']:
+                result = compute_proration(organization, financial_period)
+            else:
+                result = prorate_period(organization, financial_period)
+        except ValidationError as exc:
+            raise CommandError(' '.join(exc.messages))
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"Employees: {len(result)} ({elapsed:.2f}s)")
+        for column, total in result.totals().items():
+            self.stdout.write(f"  {column}: {total}")
+        if not options['dry_run']:
+            self.stdout.write(f"Derived salary items written: {result.lines}")
@@ -0,0 +1,83 @@
+import time
+from decimal import Decimal, InvalidOperation
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from organizations.models import Organization
+from settings_app.models import FinancialPeriod
+from salaries.rollforward import roll_forward
+
+
+def _adjustment(value):
+    try:
+        item_type_id, percent = value.split(':', 1)
+        return int(item_type_id), Decimal(percent)
+    except (ValueError, InvalidOperation):
+        raise CommandError(f"Invalid --adjust value '{value}', expected <item type pk>:<percent>.")
+
+
+class Command(BaseCommand):
+    help = "انتقال انواع آیتم‌های حقوقی و آیتم‌های حقوقی کارکنان از یک دوره مالی به دوره دیگر"
+
+    def add_arguments(self, parser):
+        parser.add_argument('organization_pk', type=int)
+        parser.add_argument('source_period_pk', type=int)
+        parser.add_argument('target_period_pk', type=int)
+        parser.add_argument(
+            '--percent', type=Decimal, default=Decimal('0'),
+            help="Adjust every copied amount by this percentage (e.g. 5 or -2.5).",
+        )
+        parser.add_argument(
+            '--adjust', action='append', default=[], metavar='TYPE_PK:PERCENT',
+            help="Per item type adjustment overriding --percent; may be repeated.",
+        )
+        parser.add_argument(
+            '--exclude-type', action='append', type=int, default=[], metavar='TYPE_PK',
+            help="Source item type not to copy; may be repeated.",
+        )
+        parser.add_argument(
+            '--exclude-employee', action='append', type=int, default=[], metavar='EMPLOYEE_PK',
+            help="Employee whose items are not copied; may be repeated.",
+        )
+        parser.add_argument(
+            '--types-only', action='store_true',
+            help="Copy item types but not employee items.",
+        )
+        parser.add_argument(
+            '--active-only', action='store_true',
+            help="Copy items only for employees who are members during the target period.",
+        )
+        parser.add_argument(
+            '--overwrite', action='store_true',
+            help="Replace items that already exist in the target period.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            organization = Organization.objects.get(pk=options['organization_pk'])
+            periods = FinancialPeriod.objects.select_related('fiscal_year')
+            source_period = periods.get(pk=options['source_period_pk'])
+            target_period = periods.get(pk=options['target_period_pk'])
+        except (Organization.DoesNotExist, FinancialPeriod.DoesNotExist) as exc:
+            raise CommandError(str(exc))
+
+        started = time.perf_counter()
+        try:
+            summary = roll_forward(
+                organization, source_period, target_period,
+                percent=options['percent'],
+                adjustments=dict(_adjustment(value) for value in options['adjust']),
+                exclude_item_type_ids=options['exclude_type'],
+                exclude_employee_ids=options['exclude_employee'],
+                copy_items=not options['types_only'],
+                active_only=options['active_only'],
+                overwrite=options['overwrite'],
+            )
+        except ValidationError as exc:
+            raise CommandError(' '.join(exc.messages))
+
+        self.stdout.write(
+            f"Item types created: {summary['item_types']}, items copied: {summary['items']}, "
+            f"replaced: {summary['replaced']} ({time.perf_counter() - started:.2f}s)"
+        )
@@ -0,0 +1,109 @@
+# Generated by Django 5.2.1 on 2026-10-18 16:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('employees', '0003_delete_organization'),
+        ('organizations', '0001_initial'),
+        ('settings_app', '0002_alter_fiscalyear_organization'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PayrollRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('draft', 'پیش\u200cنویس'), ('closed', 'بسته شده')], default='draft', max_length=10, verbose_name='وضعیت')),
+                ('computed_at', models.DateTimeField(blank=True, null=True, verbose_name='زمان آخرین محاسبه')),
+                ('closed_at', models.DateTimeField(blank=True, null=True, verbose_name='زمان بستن دوره')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='تاریخ ایجاد')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='تاریخ به\u200cروزرسانی')),
+                ('financial_period', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payroll_runs', to='settings_app.financialperiod', verbose_name='دوره مالی')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payroll_runs', to='organizations.organization', verbose_name='سازمان')),
+            ],
+            options={
+                'verbose_name': 'اجرای محاسبه حقوق',
+                'verbose_name_plural': 'اجراهای محاسبه حقوق',
+                'ordering': ['organization', 'financial_period'],
+            },
+        ),
+        migrations.CreateModel(
+            name='PayrollResultLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('earnings', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='جمع مزایا')),
+                ('deductions', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='جمع کسورات')),
+                ('taxable_income', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='درآمد مشمول مالیات')),
+                ('tax', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='مالیات')),
+                ('net_pay', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='خالص پرداختی')),
+                ('is_dirty', models.BooleanField(default=False, help_text='پس از تغییر ورودی\u200cهای این کارمند علامت\u200cگذاری می\u200cشود.', verbose_name='نیازمند محاسبه مجدد؟')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='تاریخ ایجاد')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='تاریخ به\u200cروزرسانی')),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payroll_result_lines', to='employees.employee', verbose_name='کارمند')),
+                ('payroll_run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lines', to='salaries.payrollrun', verbose_name='اجرای محاسبه حقوق')),
+            ],
+            options={
+                'verbose_name': 'ردیف نتیجه حقوق',
+                'verbose_name_plural': 'ردیف\u200cهای نتیجه حقوق',
+                'ordering': ['payroll_run', 'employee'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SalaryItemType',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='نام آیتم حقوقی')),
+                ('item_type', models.CharField(choices=[('monthly', 'ماهیانه'), ('daily', 'روزانه'), ('other', 'سایر')], default='monthly', max_length=10, verbose_name='نوع محاسبه')),
+                ('is_base_salary', models.BooleanField(default=False, help_text='آیا این آیتم بخشی از حقوق پایه کارمند محسوب می\u200cشود؟', verbose_name='جز حقوق پایه است؟')),
+                ('is_deduction', models.BooleanField(default=False, help_text='آیا این آیتم باعث کسر از حقوق کارمند می\u200cشود؟ (مانند مالیات یا بیمه)', verbose_name='کسر از حقوق است؟')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='تاریخ ایجاد')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='تاریخ به\u200cروزرسانی')),
+                ('financial_period', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='salary_item_types', to='settings_app.financialperiod', verbose_name='دوره مالی')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='salary_item_types', to='organizations.organization', verbose_name='سازمان')),
+            ],
+            options={
+                'verbose_name': 'نوع آیتم حقوقی',
+                'verbose_name_plural': 'انواع آیتم\u200cهای حقوقی',
+                'ordering': ['organization', 'financial_period', 'name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='EmployeeSalaryItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=15, verbose_name='مبلغ')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='تاریخ ایجاد')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='تاریخ به\u200cروزرسانی')),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='salary_items', to='employees.employee', verbose_name='کارمند')),
+                ('financial_period', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='employee_salary_items', to='settings_app.financialperiod', verbose_name='دوره مالی')),
+                ('salary_item_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='employee_salary_items', to='salaries.salaryitemtype', verbose_name='نوع آیتم حقوقی')),
+            ],
+            options={
+                'verbose_name': 'آیتم حقوقی کارمند',
+                'verbose_name_plural': 'آیتم\u200cهای حقوقی کارکنان',
+                'ordering': ['financial_period', 'employee', 'salary_item_type__name'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='payrollrun',
+            constraint=models.UniqueConstraint(fields=('organization', 'financial_period'), name='unique_payroll_run_per_org_period'),
+        ),
+        migrations.AddConstraint(
+            model_name='payrollresultline',
+            constraint=models.UniqueConstraint(fields=('payroll_run', 'employee'), name='unique_payroll_result_line_per_run_employee'),
+        ),
+        migrations.AddConstraint(
+            model_name='salaryitemtype',
+            constraint=models.UniqueConstraint(fields=('organization', 'financial_period', 'name'), name='unique_salary_item_type_per_org_period'),
+        ),
+        migrations.AddConstraint(
+            model_name='employeesalaryitem',
+            constraint=models.UniqueConstraint(fields=('employee', 'financial_period', 'salary_item_type'), name='unique_employee_salary_item_per_period'),
+        ),
+    ]
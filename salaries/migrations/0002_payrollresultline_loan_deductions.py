@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 17:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('salaries', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payrollresultline',
+            name='loan_deductions',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='بخشی از جمع کسورات که از اقساط وام سررسید دوره است.', max_digits=15, verbose_name='اقساط وام'),
+        ),
+    ]
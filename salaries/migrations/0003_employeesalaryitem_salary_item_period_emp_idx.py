@@ -0,0 +1,19 @@
+# Generated by Django 5.2.1 on 2026-10-18 17:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0004_employee_employee_name_idx'),
+        ('salaries', '0002_payrollresultline_loan_deductions'),
+        ('settings_app', '0002_alter_fiscalyear_organization'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='employeesalaryitem',
+            index=models.Index(fields=['financial_period', 'employee'], name='salary_item_period_emp_idx'),
+        ),
+    ]
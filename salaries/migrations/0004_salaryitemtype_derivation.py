@@ -0,0 +1,24 @@
+# Generated by Django 5.2.1 on 2026-10-18 17:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('salaries', '0003_employeesalaryitem_salary_item_period_emp_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='salaryitemtype',
+            name='derivation',
+            field=models.CharField(blank=True, choices=[('daily', 'مبلغ آیتم روزانه بر اساس روزهای کارکرد'), ('overtime', 'اضافه کاری بر اساس ساعات کارکرد'), ('deficit', 'کسر کار بر اساس ساعات کارکرد')], default='', help_text='برای آیتم\u200cهایی که از کارکرد ماهیانه محاسبه می\u200cشوند؛ آیتم\u200cهای دستی خالی هستند.', max_length=10, verbose_name='محاسبه از کارکرد'),
+        ),
+        migrations.AddField(
+            model_name='salaryitemtype',
+            name='source_item_type',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='derived_item_types', to='salaries.salaryitemtype', verbose_name='آیتم روزانه مبنا'),
+        ),
+    ]
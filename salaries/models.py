@@ -53,6 +53,32 @@ class SalaryItemType(models.Model):
     # Note: The default amount could be added here if needed,
     # but the requirement implies the amount is specific to the employee and period.
 
+    # آیتم‌هایی که مرحله محاسبه کارکرد (salaries.proration) از کارکرد ماهیانه می‌سازد
+    DERIVATION_DAILY = 'daily'
+    DERIVATION_OVERTIME = 'overtime'
+    DERIVATION_DEFICIT = 'deficit'
+    DERIVATION_CHOICES = [
+        (DERIVATION_DAILY, _('مبلغ آیتم روزانه بر اساس روزهای کارکرد')),
+        (DERIVATION_OVERTIME, _('اضافه کاری بر اساس ساعات کارکرد')),
+        (DERIVATION_DEFICIT, _('کسر کار بر اساس ساعات کارکرد')),
+    ]
+    derivation = models.CharField(
+        max_length=10,
+        choices=DERIVATION_CHOICES,
+        blank=True,
+        default='',
+        verbose_name=_("محاسبه از کارکرد"),
+        help_text=_("برای آیتم‌هایی که از کارکرد ماهیانه محاسبه می‌شوند؛ آیتم‌های دستی خالی هستند.")
+    )
+    source_item_type = models.ForeignKey(
+        'self',
+        on_delete=models.CASCADE,
+        related_name='derived_item_types',
+        verbose_name=_("آیتم روزانه مبنا"),
+        blank=True,
+        null=True
+    )
+
     created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("تاریخ ایجاد"))
     updated_at = models.DateTimeField(auto_now=True, verbose_name=_("تاریخ به‌روزرسانی"))
 
@@ -115,10 +141,120 @@ class EmployeeSalaryItem(models.Model):
             )
         ]
         ordering = ['financial_period', 'employee', 'salary_item_type__name']
+        # (employee, financial_period) lookups use the unique constraint's prefix.
+        indexes = [
+            # Period-wide reads (payroll, grid, register, roll forward) in employee order.
+            models.Index(fields=['financial_period', 'employee'], name='salary_item_period_emp_idx'),
+        ]
 
     def __str__(self):
         return f"{self.employee} - {self.salary_item_type.name} ({self.financial_period.name}): {self.amount}"
 
+class PayrollRun(models.Model):
+    """
+    اجرای محاسبه حقوق یک سازمان در یک دوره مالی.
+    نتایج هر کارمند در PayrollResultLine ذخیره می‌شود تا پس از ویرایش یک آیتم
+    فقط ردیف‌های کثیف دوباره محاسبه شوند. پس از بستن دوره، نتایج ثابت می‌مانند.
+    """
+
+    STATUS_DRAFT = 'draft'
+    STATUS_CLOSED = 'closed'
+    STATUS_CHOICES = [
+        (STATUS_DRAFT, _('پیش‌نویس')),
+        (STATUS_CLOSED, _('بسته شده')),
+    ]
+
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.CASCADE,
+        related_name='payroll_runs',
+        verbose_name=_("سازمان")
+    )
+    financial_period = models.ForeignKey(
+        FinancialPeriod,
+        on_delete=models.CASCADE,
+        related_name='payroll_runs',
+        verbose_name=_("دوره مالی")
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=STATUS_DRAFT,
+        verbose_name=_("وضعیت")
+    )
+    computed_at = models.DateTimeField(blank=True, null=True, verbose_name=_("زمان آخرین محاسبه"))
+    closed_at = models.DateTimeField(blank=True, null=True, verbose_name=_("زمان بستن دوره"))
+
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("تاریخ ایجاد"))
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_("تاریخ به‌روزرسانی"))
+
+    class Meta:
+        verbose_name = _("اجرای محاسبه حقوق")
+        verbose_name_plural = _("اجراهای محاسبه حقوق")
+        constraints = [
+            models.UniqueConstraint(
+                fields=['organization', 'financial_period'],
+                name='unique_payroll_run_per_org_period'
+            )
+        ]
+        ordering = ['organization', 'financial_period']
+
+    @property
+    def is_closed(self):
+        return self.status == self.STATUS_CLOSED
+
+    def __str__(self):
+        return f"{self.organization.name} - {self.financial_period.name} ({self.get_status_display()})"
+
+
+class PayrollResultLine(models.Model):
+    """
+    نتیجه محاسبه حقوق یک کارمند در یک اجرای محاسبه حقوق.
+    """
+    payroll_run = models.ForeignKey(
+        PayrollRun,
+        on_delete=models.CASCADE,
+        related_name='lines',
+        verbose_name=_("اجرای محاسبه حقوق")
+    )
+    employee = models.ForeignKey(
+        Employee,
+        on_delete=models.CASCADE,
+        related_name='payroll_result_lines',
+        verbose_name=_("کارمند")
+    )
+    earnings = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name=_("جمع مزایا"))
+    deductions = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name=_("جمع کسورات"))
+    loan_deductions = models.DecimalField(
+        max_digits=15, decimal_places=2, default=0, verbose_name=_("اقساط وام"),
+        help_text=_("بخشی از جمع کسورات که از اقساط وام سررسید دوره است.")
+    )
+    taxable_income = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name=_("درآمد مشمول مالیات"))
+    tax = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name=_("مالیات"))
+    net_pay = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name=_("خالص پرداختی"))
+    is_dirty = models.BooleanField(
+        default=False,
+        verbose_name=_("نیازمند محاسبه مجدد؟"),
+        help_text=_("پس از تغییر ورودی‌های این کارمند علامت‌گذاری می‌شود.")
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("تاریخ ایجاد"))
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_("تاریخ به‌روزرسانی"))
+
+    class Meta:
+        verbose_name = _("ردیف نتیجه حقوق")
+        verbose_name_plural = _("ردیف‌های نتیجه حقوق")
+        constraints = [
+            models.UniqueConstraint(
+                fields=['payroll_run', 'employee'],
+                name='unique_payroll_result_line_per_run_employee'
+            )
+        ]
+        ordering = ['payroll_run', 'employee']
+
+    def __str__(self):
+        return f"{self.employee} - {self.payroll_run}: {self.net_pay}"
+
 # Versioning (Requirement 6) - Mentioned as an enhancement
 # Implementing versioning requires additional logic or libraries like django-reversion.
 # This would involve registering the models (SalaryItemType, EmployeeSalaryItem)
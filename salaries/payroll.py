@@ -0,0 +1,338 @@
+"""
+موتور محاسبه حقوق و دستمزد یک دوره مالی برای تمام کارکنان یک سازمان.
+
+تمام ورودی‌ها (اعضای سازمان، آیتم‌های حقوقی، کارکرد ماهیانه و سطوح مالیاتی)
+با تعداد ثابتی کوئری گروهی بارگذاری می‌شوند و محاسبات روی ستون‌هایی
+(لیست‌های هم‌اندازه که با اندیس کارمند آدرس‌دهی می‌شوند) انجام می‌شود،
+نه با فراخوانی ORM برای تک‌تک کارکنان.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q, Sum
+from django.utils import timezone
+from django.utils.translation import gettext as _
+
+from organizations.models import EmployeeOrganization
+from hr.models import MonthlyWorkRecord
+from loans.schedule import deductions_by_employee, settle_installments
+from settings_app.tax import get_tax_table
+
+from .models import EmployeeSalaryItem, PayrollRun, PayrollResultLine, SalaryItemType
+
+
+ZERO = Decimal('0')
+CENT = Decimal('0.01')
+
+
+def _quantize(value):
+    return value.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+class PayrollResult:
+    """
+    نتیجه محاسبه حقوق یک دوره به صورت ستونی.
+    هر ستون یک لیست است و اندیس i در همه ستون‌ها به employee_ids[i] تعلق دارد.
+    """
+
+    COLUMNS = ('earnings', 'deductions', 'loan_deductions', 'taxable_income', 'tax', 'net_pay')
+
+    def __init__(self, organization, financial_period, employee_ids):
+        self.organization = organization
+        self.financial_period = financial_period
+        self.employee_ids = employee_ids
+        size = len(employee_ids)
+        for column in self.COLUMNS:
+            setattr(self, column, [ZERO] * size)
+
+    def __len__(self):
+        return len(self.employee_ids)
+
+    def rows(self):
+        """
+        Yields one dict per employee; convenient for templates and persistence.
+        """
+        columns = [getattr(self, column) for column in self.COLUMNS]
+        for index, employee_id in enumerate(self.employee_ids):
+            row = {'employee_id': employee_id}
+            for name, column in zip(self.COLUMNS, columns):
+                row[name] = column[index]
+            yield row
+
+    def totals(self):
+        return {column: sum(getattr(self, column), ZERO) for column in self.COLUMNS}
+
+
+class PayrollEngine:
+    """
+    محاسبه‌گر حقوق یک دوره مالی برای تمام کارکنان یک سازمان در یک مرحله.
+
+    کوئری‌ها (مستقل از تعداد کارکنان):
+      1. کارکنان عضو سازمان در بازه دوره
+      2. جمع آیتم‌های حقوقی به تفکیک کارمند، نوع محاسبه/کسر و مشتق بودن از کارکرد
+      3. روزهای کارکرد از کارکرد ماهیانه
+      4. جمع اقساط وام سررسید دوره به تفکیک کارمند
+      5. سطوح مالیاتی سال مالی دوره (فقط در اولین استفاده؛ جدول کامپایل‌شده کش می‌شود)
+    """
+
+    def __init__(self, organization, financial_period, employee_ids=None):
+        self.organization = organization
+        self.financial_period = financial_period
+        # Optional subset of employees (used for incremental recomputation).
+        self.employee_ids = employee_ids
+
+    def _restrict(self, queryset):
+        if self.employee_ids is not None:
+            queryset = queryset.filter(employee_id__in=self.employee_ids)
+        return queryset
+
+    # --- Bulk loaders -------------------------------------------------------
+
+    def load_employee_ids(self):
+        period = self.financial_period
+        return list(
+            self._restrict(EmployeeOrganization.objects.filter(
+                organization=self.organization,
+                is_active=True,
+                start_date__lte=period.end_date,
+            )).filter(
+                Q(end_date__gte=period.start_date) | Q(end_date__isnull=True)
+            ).order_by('employee_id').values_list('employee_id', flat=True).distinct()
+        )
+
+    def load_item_totals(self):
+        return (
+            self._restrict(EmployeeSalaryItem.objects.filter(
+                financial_period=self.financial_period,
+                salary_item_type__organization=self.organization,
+            )).values_list(
+                'employee_id',
+                'salary_item_type__item_type',
+                'salary_item_type__is_deduction',
+                'salary_item_type__derivation',
+            ).annotate(total=Sum('amount')).order_by()
+        )
+
+    def load_working_days(self):
+        return self._restrict(MonthlyWorkRecord.objects.filter(
+            organization=self.organization,
+            financial_period=self.financial_period,
+        )).values_list('employee_id', 'working_days_in_month')
+
+    def load_loan_deductions(self):
+        return deductions_by_employee(self.organization, self.financial_period, self.employee_ids)
+
+    def load_tax_table(self):
+        return get_tax_table(self.financial_period.fiscal_year_id)
+
+    # --- Computation --------------------------------------------------------
+
+    def run(self):
+        employee_ids = self.load_employee_ids()
+        index = {employee_id: i for i, employee_id in enumerate(employee_ids)}
+        item_rows = list(self.load_item_totals())
+
+        # Employees with salary items but no (active) membership are still paid.
+        for employee_id, _item_type, _is_deduction, _derivation, _total in item_rows:
+            if employee_id not in index:
+                index[employee_id] = len(employee_ids)
+                employee_ids.append(employee_id)
+
+        size = len(employee_ids)
+        monthly_earnings = [ZERO] * size
+        daily_rates = [ZERO] * size
+        # Daily item amounts written by the proration stage (salaries.proration).
+        prorated_daily = [None] * size
+        deductions = [ZERO] * size
+        working_days = [ZERO] * size
+
+        for employee_id, item_type, is_deduction, derivation, total in item_rows:
+            i = index[employee_id]
+            if is_deduction:
+                deductions[i] += total
+            elif derivation == SalaryItemType.DERIVATION_DAILY:
+                prorated_daily[i] = (prorated_daily[i] or ZERO) + total
+            elif item_type == 'daily':
+                daily_rates[i] += total
+            else:
+                monthly_earnings[i] += total
+
+        for employee_id, days in self.load_working_days():
+            i = index.get(employee_id)
+            if i is not None:
+                working_days[i] = days
+
+        # Installments are deducted only from employees who are paid this period.
+        loan_deductions = [ZERO] * size
+        for employee_id, total in self.load_loan_deductions():
+            i = index.get(employee_id)
+            if i is not None:
+                loan_deductions[i] = total
+
+        tax_table = self.load_tax_table()
+
+        result = PayrollResult(self.organization, self.financial_period, employee_ids)
+        result.earnings = [
+            _quantize(monthly + (rate * days if prorated is None else prorated))
+            for monthly, rate, days, prorated in zip(monthly_earnings, daily_rates, working_days, prorated_daily)
+        ]
+        result.loan_deductions = [_quantize(value) for value in loan_deductions]
+        result.deductions = [
+            _quantize(value) + loan for value, loan in zip(deductions, result.loan_deductions)
+        ]
+        result.taxable_income = list(result.earnings)
+        result.tax = [_quantize(tax) for tax in tax_table.tax_many(result.taxable_income)]
+        result.net_pay = [
+            earning - deduction - tax
+            for earning, deduction, tax in zip(result.earnings, result.deductions, result.tax)
+        ]
+        return result
+
+
+def compute_period_payroll(organization, financial_period, employee_ids=None):
+    """
+    Computes payroll for every employee of `organization` in `financial_period`
+    (or only for `employee_ids` when given). Returns a columnar PayrollResult.
+    """
+    return PayrollEngine(organization, financial_period, employee_ids).run()
+
+
+# --- Persisted runs ------------------------------------------------------------
+
+LINE_UPDATE_FIELDS = list(PayrollResult.COLUMNS) + ['is_dirty', 'updated_at']
+
+
+def _save_lines(payroll_run, result, stale_employee_ids):
+    """
+    Upserts the lines of `result` and removes lines of `stale_employee_ids`
+    that are no longer part of the result (e.g. membership ended).
+    """
+    lines = [
+        PayrollResultLine(payroll_run=payroll_run, is_dirty=False, **row)
+        for row in result.rows()
+    ]
+    with transaction.atomic():
+        PayrollResultLine.objects.bulk_create(
+            lines,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['payroll_run', 'employee'],
+            update_fields=LINE_UPDATE_FIELDS,
+        )
+        computed = set(result.employee_ids)
+        removed = [employee_id for employee_id in stale_employee_ids if employee_id not in computed]
+        if removed:
+            payroll_run.lines.filter(employee_id__in=removed).delete()
+        payroll_run.computed_at = timezone.now()
+        payroll_run.save(update_fields=['computed_at', 'updated_at'])
+
+
+def _ensure_open(payroll_run):
+    if payroll_run.is_closed:
+        raise ValidationError(_("این دوره بسته شده است و نتایج آن قابل تغییر نیست."))
+
+
+def run_payroll(organization, financial_period):
+    """
+    Computes the whole organization for the period and stores the snapshot.
+    """
+    payroll_run, _created = PayrollRun.objects.get_or_create(
+        organization=organization,
+        financial_period=financial_period,
+    )
+    _ensure_open(payroll_run)
+    result = compute_period_payroll(organization, financial_period)
+    existing = payroll_run.lines.values_list('employee_id', flat=True)
+    _save_lines(payroll_run, result, list(existing))
+    return payroll_run
+
+
+def recompute_dirty(payroll_run):
+    """
+    Recomputes only the lines marked dirty since the last computation.
+    Returns the number of employees that were recomputed.
+    """
+    _ensure_open(payroll_run)
+    dirty_ids = list(payroll_run.lines.filter(is_dirty=True).values_list('employee_id', flat=True))
+    if not dirty_ids:
+        return 0
+    result = compute_period_payroll(payroll_run.organization, payroll_run.financial_period, dirty_ids)
+    _save_lines(payroll_run, result, dirty_ids)
+    return len(dirty_ids)
+
+
+def close_payroll_run(payroll_run):
+    """
+    Brings dirty lines up to date, freezes the snapshot of the period and
+    marks the loan installments it deducted as paid.
+    """
+    with transaction.atomic():
+        recompute_dirty(payroll_run)
+        payroll_run.status = PayrollRun.STATUS_CLOSED
+        payroll_run.closed_at = timezone.now()
+        payroll_run.save(update_fields=['status', 'closed_at', 'updated_at'])
+        settle_installments(payroll_run)
+    return payroll_run
+
+
+def mark_dirty(employee_id=None, financial_period_id=None, organization_id=None, fiscal_year_id=None,
+               employee_ids=None):
+    """
+    Flags the result lines affected by a change in payroll inputs.
+    Only open (draft) runs are touched; closed snapshots stay frozen.
+    When an employee has no line yet in a matching run, a dirty placeholder
+    line is created so the next incremental recompute picks them up.
+    `employee_ids` does the same for many employees at once (bulk writes).
+    """
+    runs = PayrollRun.objects.filter(status=PayrollRun.STATUS_DRAFT)
+    if financial_period_id is not None:
+        runs = runs.filter(financial_period_id=financial_period_id)
+    if organization_id is not None:
+        runs = runs.filter(organization_id=organization_id)
+    if fiscal_year_id is not None:
+        runs = runs.filter(financial_period__fiscal_year_id=fiscal_year_id)
+
+    lines = PayrollResultLine.objects.filter(payroll_run__in=runs)
+    if employee_ids is not None:
+        employee_ids = set(employee_ids)
+        run_ids = list(runs.values_list('pk', flat=True))
+        if not run_ids or not employee_ids:
+            return 0
+        updated = lines.filter(employee_id__in=employee_ids).update(is_dirty=True)
+        # Existing lines conflict and are skipped; only missing placeholders are added.
+        PayrollResultLine.objects.bulk_create(
+            [
+                PayrollResultLine(payroll_run_id=run_id, employee_id=each_id, is_dirty=True)
+                for run_id in run_ids
+                for each_id in employee_ids
+            ],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+        return updated
+    if employee_id is None:
+        return lines.update(is_dirty=True)
+
+    updated = lines.filter(employee_id=employee_id).update(is_dirty=True)
+    run_ids = list(runs.exclude(lines__employee_id=employee_id).values_list('pk', flat=True))
+    if run_ids:
+        PayrollResultLine.objects.bulk_create(
+            [PayrollResultLine(payroll_run_id=run_id, employee_id=employee_id, is_dirty=True) for run_id in run_ids],
+            ignore_conflicts=True,
+        )
+    return updated + len(run_ids)
+
+
+def period_result_lines(organization, financial_period):
+    """
+    Precomputed lines of a closed period, for reports; None while the period is open.
+    """
+    payroll_run = PayrollRun.objects.filter(
+        organization=organization,
+        financial_period=financial_period,
+        status=PayrollRun.STATUS_CLOSED,
+    ).first()
+    if payroll_run is None:
+        return None
+    return payroll_run.lines.all()
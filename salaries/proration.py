@@ -0,0 +1,310 @@
+"""
+مرحله محاسبه کارکرد (proration) یک دوره مالی برای تمام کارکنان یک سازمان.
+
+کارکرد ماهیانه دوره با یک کوئری در ستون‌هایی (لیست‌های هم‌اندازه که با اندیس
+کارمند آدرس‌دهی می‌شوند) خوانده می‌شود و نرخ آیتم‌های روزانه و حقوق پایه با
+یک کوئری دیگر؛ سپس برای همه کارکنان:
+  مبلغ هر آیتم روزانه = نرخ روزانه × روزهای کارکرد
+  اضافه کاری = نرخ ساعتی × ساعات اضافه کاری × ضریب اضافه کاری
+  کسر کار = نرخ ساعتی × ساعات کسر کار
+که نرخ ساعتی = حقوق پایه ماهیانه ÷ ساعت استاندارد ماه (از کارکرد) است.
+
+نتیجه به صورت آیتم‌های حقوقی مشتق نوشته می‌شود (نوع‌هایی با
+SalaryItemType.derivation که در اولین اجرا برای دوره ساخته می‌شوند): آیتم‌های
+مشتق قبلی دوره حذف و آیتم‌های جدید با bulk_create درج می‌شوند، پس اجرای دوباره
+پس از ویرایش کارکرد یا نرخ‌ها نتیجه را جایگزین می‌کند. موتور حقوق
+(salaries.payroll) برای کارمندی که آیتم روزانه مشتق دارد همان مبلغ را به جای
+نرخ × روز به کار می‌برد.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils.translation import gettext as _
+
+from hr.models import MonthlyWorkRecord
+from reports.summary import rebuild_period
+
+from .models import EmployeeSalaryItem, PayrollRun, SalaryItemType
+from .payroll import mark_dirty
+
+
+ZERO = Decimal('0')
+CENT = Decimal('0.01')
+
+OVERTIME_FACTOR = getattr(settings, 'PAYROLL_OVERTIME_FACTOR', Decimal('1.4'))
+# Used when a work record has no standard hours.
+DEFAULT_STANDARD_HOURS = getattr(settings, 'PAYROLL_STANDARD_HOURS', Decimal('176'))
+# A daily base wage counts as this many days of monthly base salary.
+DAYS_PER_MONTH = 30
+
+OVERTIME_NAME = "اضافه کاری (کارکرد)"
+DEFICIT_NAME = "کسر کار (کارکرد)"
+DAILY_NAME = "%(name)s (کارکرد)"
+
+BATCH_SIZE = 1000
+
+
+def _quantize(value):
+    return value.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+class ProrationResult:
+    """
+    نتیجه محاسبه کارکرد یک دوره به صورت ستونی.
+    هر ستون یک لیست است و اندیس i در همه ستون‌ها به employee_ids[i] تعلق دارد؛
+    daily_lines مبلغ هر آیتم روزانه را به صورت (اندیس، نوع آیتم مبنا، مبلغ) نگه می‌دارد.
+    """
+
+    COLUMNS = ('daily_amount', 'overtime_pay', 'deficit_deduction')
+
+    def __init__(self, organization, financial_period, employee_ids):
+        self.organization = organization
+        self.financial_period = financial_period
+        self.employee_ids = employee_ids
+        size = len(employee_ids)
+        for column in self.COLUMNS:
+            setattr(self, column, [ZERO] * size)
+        self.daily_lines = []
+
+    def __len__(self):
+        return len(self.employee_ids)
+
+    def totals(self):
+        return {column: sum(getattr(self, column), ZERO) for column in self.COLUMNS}
+
+
+class ProrationEngine:
+    """
+    محاسبه‌گر کارکرد یک دوره مالی برای تمام کارکنان یک سازمان در یک مرحله.
+
+    کوئری‌ها (مستقل از تعداد کارکنان):
+      1. کارکرد ماهیانه کارکنان در دوره
+      2. نرخ آیتم‌های روزانه (مزایا) و آیتم‌های حقوق پایه به تفکیک کارمند و نوع آیتم
+    """
+
+    def __init__(self, organization, financial_period, employee_ids=None):
+        self.organization = organization
+        self.financial_period = financial_period
+        # Optional subset of employees.
+        self.employee_ids = employee_ids
+
+    def _restrict(self, queryset):
+        if self.employee_ids is not None:
+            queryset = queryset.filter(employee_id__in=self.employee_ids)
+        return queryset
+
+    # --- Bulk loaders -------------------------------------------------------
+
+    def load_work_records(self):
+        return self._restrict(MonthlyWorkRecord.objects.filter(
+            organization=self.organization,
+            financial_period=self.financial_period,
+        )).order_by('employee_id').values_list(
+            'employee_id',
+            'working_days_in_month',
+            'standard_hours_in_month',
+            'overtime_hours',
+            'deficit_hours',
+        )
+
+    def load_rates(self):
+        # Derived items are outputs of this stage, never its inputs.
+        return self._restrict(EmployeeSalaryItem.objects.filter(
+            Q(salary_item_type__item_type='daily') | Q(salary_item_type__is_base_salary=True),
+            financial_period=self.financial_period,
+            salary_item_type__is_deduction=False,
+            salary_item_type__organization=self.organization,
+            salary_item_type__derivation='',
+        )).values_list(
+            'employee_id',
+            'salary_item_type_id',
+            'salary_item_type__item_type',
+            'salary_item_type__is_base_salary',
+            'amount',
+        ).order_by()
+
+    # --- Computation --------------------------------------------------------
+
+    def run(self):
+        records = list(self.load_work_records())
+        employee_ids = [record[0] for record in records]
+        index = {employee_id: i for i, employee_id in enumerate(employee_ids)}
+        working_days = [record[1] for record in records]
+        standard_hours = [record[2] or DEFAULT_STANDARD_HOURS for record in records]
+        overtime_hours = [record[3] for record in records]
+        deficit_hours = [record[4] for record in records]
+
+        result = ProrationResult(self.organization, self.financial_period, employee_ids)
+        base_salary = [ZERO] * len(employee_ids)
+        daily_rates = []
+        for employee_id, item_type_id, item_type, is_base, amount in self.load_rates():
+            # Without a work record there is nothing to prorate.
+            i = index.get(employee_id)
+            if i is None:
+                continue
+            if item_type == 'daily':
+                daily_rates.append((i, item_type_id, amount))
+                if is_base:
+                    base_salary[i] += amount * DAYS_PER_MONTH
+            elif is_base:
+                base_salary[i] += amount
+
+        for i, item_type_id, rate in daily_rates:
+            amount = _quantize(rate * working_days[i])
+            if amount:
+                result.daily_lines.append((i, item_type_id, amount))
+                result.daily_amount[i] += amount
+
+        hourly_rates = [base / hours for base, hours in zip(base_salary, standard_hours)]
+        result.overtime_pay = [
+            _quantize(rate * hours * OVERTIME_FACTOR) for rate, hours in zip(hourly_rates, overtime_hours)
+        ]
+        result.deficit_deduction = [
+            _quantize(rate * hours) for rate, hours in zip(hourly_rates, deficit_hours)
+        ]
+        return result
+
+
+def compute_proration(organization, financial_period, employee_ids=None):
+    """
+    Computes the work-record based amounts of every employee with a work
+    record in the period (or only `employee_ids`). Nothing is written.
+    """
+    return ProrationEngine(organization, financial_period, employee_ids).run()
+
+
+# --- Derived salary lines ------------------------------------------------------
+
+def derived_item_types(organization, financial_period, source_item_type_ids):
+    """
+    {(derivation, source item type id or None): SalaryItemType} of the period,
+    creating the missing derived types (overtime, deficit and one per daily
+    source type).
+    """
+    types = {
+        (item_type.derivation, item_type.source_item_type_id): item_type
+        for item_type in SalaryItemType.objects.filter(
+            organization=organization,
+            financial_period=financial_period,
+        ).exclude(derivation='')
+    }
+    wanted = [
+        (SalaryItemType.DERIVATION_OVERTIME, None, OVERTIME_NAME, False),
+        (SalaryItemType.DERIVATION_DEFICIT, None, DEFICIT_NAME, True),
+    ] + [
+        (SalaryItemType.DERIVATION_DAILY, source.pk, (DAILY_NAME % {'name': source.name})[:100], False)
+        for source in SalaryItemType.objects.filter(pk__in=set(source_item_type_ids)).exclude(
+            pk__in=[key[1] for key in types if key[1] is not None]
+        )
+    ]
+    missing = [item for item in wanted if (item[0], item[1]) not in types]
+    if missing:
+        taken = set(SalaryItemType.objects.filter(
+            organization=organization,
+            financial_period=financial_period,
+            name__in=[name for _derivation, _source, name, _deduction in missing],
+        ).values_list('name', flat=True))
+        if taken:
+            raise ValidationError(
+                _("نوع آیتم حقوقی «%(name)s» از قبل به صورت دستی تعریف شده است.") % {'name': sorted(taken)[0]}
+            )
+        for item_type in SalaryItemType.objects.bulk_create([
+            SalaryItemType(
+                organization=organization,
+                financial_period=financial_period,
+                name=name,
+                item_type='other',
+                is_deduction=is_deduction,
+                derivation=derivation,
+                source_item_type_id=source_id,
+            )
+            for derivation, source_id, name, is_deduction in missing
+        ]):
+            types[(item_type.derivation, item_type.source_item_type_id)] = item_type
+    return types
+
+
+def _delete_derived_items(organization, financial_period, employee_ids=None):
+    """
+    Removes the period's derived items with one DELETE (no per-row signals)
+    and returns the ids of the employees who had any.
+    """
+    derived = EmployeeSalaryItem.objects.filter(
+        financial_period=financial_period,
+        salary_item_type__organization=organization,
+    ).exclude(salary_item_type__derivation='')
+    if employee_ids is not None:
+        derived = derived.filter(employee_id__in=employee_ids)
+    affected = set(derived.values_list('employee_id', flat=True).distinct())
+    if not affected:
+        return affected
+
+    quote = connection.ops.quote_name
+    items = quote(EmployeeSalaryItem._meta.db_table)
+    types = quote(SalaryItemType._meta.db_table)
+    sql = (
+        f"DELETE FROM {items} WHERE financial_period_id = %s AND salary_item_type_id IN ("
+        f"SELECT id FROM {types} WHERE organization_id = %s AND financial_period_id = %s AND derivation <> '')"
+    )
+    params = [financial_period.pk, organization.pk, financial_period.pk]
+    if employee_ids is not None:
+        sql += f" AND employee_id IN ({', '.join(['%s'] * len(affected))})"
+        params.extend(affected)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+    return affected
+
+
+def prorate_period(organization, financial_period, employee_ids=None):
+    """
+    Computes the proration of the period and replaces its derived salary
+    lines (daily item amounts, overtime pay, deficit deductions). Returns
+    the ProrationResult with `lines` set to the number of lines written.
+    """
+    if financial_period.fiscal_year.organization_id != organization.pk:
+        raise ValidationError(
+            _("دوره مالی «%(period)s» متعلق به این سازمان نیست.") % {'period': financial_period.name}
+        )
+    if PayrollRun.objects.filter(
+        organization=organization,
+        financial_period=financial_period,
+        status=PayrollRun.STATUS_CLOSED,
+    ).exists():
+        raise ValidationError(_("این دوره بسته شده است و نتایج آن قابل تغییر نیست."))
+
+    result = compute_proration(organization, financial_period, employee_ids)
+    with transaction.atomic():
+        types = derived_item_types(organization, financial_period, {line[1] for line in result.daily_lines})
+        overtime_type = types[(SalaryItemType.DERIVATION_OVERTIME, None)]
+        deficit_type = types[(SalaryItemType.DERIVATION_DEFICIT, None)]
+
+        def line(i, item_type, amount):
+            return EmployeeSalaryItem(
+                employee_id=result.employee_ids[i],
+                financial_period=financial_period,
+                salary_item_type=item_type,
+                amount=amount,
+            )
+
+        lines = [
+            line(i, types[(SalaryItemType.DERIVATION_DAILY, source_id)], amount)
+            for i, source_id, amount in result.daily_lines
+        ]
+        lines += [line(i, overtime_type, amount) for i, amount in enumerate(result.overtime_pay) if amount]
+        lines += [line(i, deficit_type, amount) for i, amount in enumerate(result.deficit_deduction) if amount]
+
+        replaced = _delete_derived_items(organization, financial_period, employee_ids)
+        EmployeeSalaryItem.objects.bulk_create(lines, batch_size=BATCH_SIZE)
+        # Raw deletes and bulk inserts send no signals; flag the payroll lines
+        # and recompute the summary rows of the period.
+        mark_dirty(
+            financial_period_id=financial_period.pk,
+            organization_id=organization.pk,
+            employee_ids=replaced | {item.employee_id for item in lines},
+        )
+        rebuild_period(organization, financial_period)
+    result.lines = len(lines)
+    return result
@@ -0,0 +1,187 @@
+"""
+انتقال (roll forward) انواع آیتم‌های حقوقی و آیتم‌های حقوقی کارکنان از یک دوره
+مالی به دوره بعد.
+
+انواع آیتم‌ها (چند ده ردیف) با bulk_create کپی می‌شوند و آیتم‌های کارکنان
+(ده‌ها هزار ردیف) با یک دستور INSERT ... SELECT در خود پایگاه داده؛ هیچ ردیفی
+به پایتون منتقل نمی‌شود. نوع مقصد متناظر هر نوع مبدأ از روی نام آن پیدا می‌شود.
+"""
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.translation import gettext as _
+
+from organizations.models import EmployeeOrganization
+from reports.summary import rebuild_period
+
+from .models import EmployeeSalaryItem, SalaryItemType
+from .payroll import mark_dirty
+
+
+HUNDRED = Decimal('100')
+
+
+def _multiplier(percent):
+    return 1 + Decimal(str(percent)) / HUNDRED
+
+
+def _check_period(organization, financial_period):
+    if financial_period.fiscal_year.organization_id != organization.pk:
+        raise ValidationError(
+            _("دوره مالی «%(period)s» متعلق به این سازمان نیست.") % {'period': financial_period.name}
+        )
+
+
+def copy_item_types(organization, source_period, target_period, exclude_item_type_ids=()):
+    """
+    Clones the source period's item types into the target period (types that
+    already exist there by name are kept). Returns the number of new types.
+    """
+    # Derived types are recreated by the target period's proration (salaries.proration).
+    source_types = SalaryItemType.objects.filter(
+        organization=organization,
+        financial_period=source_period,
+        derivation='',
+    ).exclude(pk__in=exclude_item_type_ids)
+    existing = set(
+        SalaryItemType.objects.filter(
+            organization=organization,
+            financial_period=target_period,
+        ).values_list('name', flat=True)
+    )
+    new_types = [
+        SalaryItemType(
+            organization=organization,
+            financial_period=target_period,
+            name=item_type.name,
+            item_type=item_type.item_type,
+            is_base_salary=item_type.is_base_salary,
+            is_deduction=item_type.is_deduction,
+        )
+        for item_type in source_types
+        if item_type.name not in existing
+    ]
+    SalaryItemType.objects.bulk_create(new_types, ignore_conflicts=True)
+    return len(new_types)
+
+
+def copy_employee_items(organization, source_period, target_period, percent=0, adjustments=None,
+                        exclude_item_type_ids=(), exclude_employee_ids=(), active_only=False,
+                        overwrite=False):
+    """
+    Copies employee items of the source period to the matching item types of
+    the target period with one INSERT ... SELECT.
+
+    percent: adjustment applied to every amount (e.g. 5 for +5%).
+    adjustments: {source item type id: percent} overriding `percent` per type.
+    active_only: copy only employees whose membership overlaps the target period.
+    overwrite: replace target items that already exist; otherwise they are kept.
+
+    Returns (inserted, replaced) row counts.
+    """
+    quote = connection.ops.quote_name
+    items = quote(EmployeeSalaryItem._meta.db_table)
+    types = quote(SalaryItemType._meta.db_table)
+    memberships = quote(EmployeeOrganization._meta.db_table)
+
+    # Amount expression: per-type multipliers via CASE, rounded to the column scale.
+    adjustments = adjustments or {}
+    params = []
+    amount_sql = 'src.amount'
+    if adjustments or percent:
+        cases = []
+        for item_type_id, type_percent in adjustments.items():
+            cases.append('WHEN %s THEN %s')
+            params.extend([item_type_id, _multiplier(type_percent)])
+        default = _multiplier(percent)
+        if cases:
+            amount_sql = f"ROUND(src.amount * CASE src.salary_item_type_id {' '.join(cases)} ELSE %s END, 2)"
+        else:
+            amount_sql = 'ROUND(src.amount * %s, 2)'
+        params.append(default)
+
+    conditions = []
+    condition_params = []
+    if exclude_item_type_ids:
+        conditions.append(f"src.salary_item_type_id NOT IN ({', '.join(['%s'] * len(exclude_item_type_ids))})")
+        condition_params.extend(exclude_item_type_ids)
+    if exclude_employee_ids:
+        conditions.append(f"src.employee_id NOT IN ({', '.join(['%s'] * len(exclude_employee_ids))})")
+        condition_params.extend(exclude_employee_ids)
+    if active_only:
+        conditions.append(
+            f"EXISTS (SELECT 1 FROM {memberships} m WHERE m.employee_id = src.employee_id"
+            f" AND m.organization_id = %s AND m.start_date <= %s"
+            f" AND (m.end_date IS NULL OR m.end_date >= %s))"
+        )
+        condition_params.extend([organization.pk, target_period.end_date, target_period.start_date])
+
+    # Source items joined to the same-named item type of the target period.
+    matched = (
+        f"FROM {items} src"
+        f" JOIN {types} st ON st.id = src.salary_item_type_id"
+        f" JOIN {types} tt ON tt.organization_id = st.organization_id"
+        f" AND tt.name = st.name AND tt.financial_period_id = %s"
+        f" WHERE src.financial_period_id = %s AND st.organization_id = %s AND st.derivation = ''"
+        + ''.join(f" AND {condition}" for condition in conditions)
+    )
+    matched_params = [target_period.pk, source_period.pk, organization.pk, *condition_params]
+
+    now = timezone.now()
+    with transaction.atomic(), connection.cursor() as cursor:
+        replaced = 0
+        if overwrite:
+            # Remove the target rows that the copy is about to replace.
+            cursor.execute(
+                f"DELETE FROM {items} WHERE financial_period_id = %s AND EXISTS ("
+                f"SELECT 1 {matched} AND src.employee_id = {items}.employee_id"
+                f" AND tt.id = {items}.salary_item_type_id)",
+                [target_period.pk, *matched_params],
+            )
+            replaced = cursor.rowcount
+
+        cursor.execute(
+            f"INSERT INTO {items}"
+            f" (employee_id, financial_period_id, salary_item_type_id, amount, created_at, updated_at)"
+            f" SELECT src.employee_id, %s, tt.id, {amount_sql}, %s, %s {matched}"
+            f" AND NOT EXISTS (SELECT 1 FROM {items} dst"
+            f" WHERE dst.employee_id = src.employee_id AND dst.salary_item_type_id = tt.id"
+            f" AND dst.financial_period_id = tt.financial_period_id)",
+            [target_period.pk, *params, now, now, *matched_params],
+        )
+        inserted = cursor.rowcount
+    return inserted, replaced
+
+
+def roll_forward(organization, source_period, target_period, percent=0, adjustments=None,
+                 exclude_item_type_ids=(), exclude_employee_ids=(), copy_items=True,
+                 active_only=False, overwrite=False):
+    """
+    Clones item types and (optionally) employee items from `source_period`
+    to `target_period` of the same organization. Returns a summary dict.
+    """
+    _check_period(organization, source_period)
+    _check_period(organization, target_period)
+    if source_period.pk == target_period.pk:
+        raise ValidationError(_("دوره مبدأ و مقصد نمی‌توانند یکسان باشند."))
+
+    summary = {'item_types': 0, 'items': 0, 'replaced': 0}
+    with transaction.atomic():
+        summary['item_types'] = copy_item_types(organization, source_period, target_period, exclude_item_type_ids)
+        if copy_items:
+            summary['items'], summary['replaced'] = copy_employee_items(
+                organization, source_period, target_period,
+                percent=percent,
+                adjustments=adjustments,
+                exclude_item_type_ids=exclude_item_type_ids,
+                exclude_employee_ids=exclude_employee_ids,
+                active_only=active_only,
+                overwrite=overwrite,
+            )
+            # Raw SQL sends no signals; flag the target period's payroll lines
+            # and recompute its summary rows.
+            mark_dirty(financial_period_id=target_period.pk, organization_id=organization.pk)
+            rebuild_period(organization, target_period)
+    return summary
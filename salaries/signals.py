@@ -0,0 +1,41 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from hr.models import MonthlyWorkRecord
+from loans.models import EmployeeLoan
+from settings_app.models import TaxLevel
+
+from .models import EmployeeSalaryItem
+from .payroll import mark_dirty
+
+
+# هر تغییر در ورودی‌های حقوق، ردیف‌های نتیجه کارمند مربوطه را در اجراهای باز
+# (پیش‌نویس) کثیف می‌کند تا محاسبه مجدد فقط همان ردیف‌ها را شامل شود.
+
+@receiver([post_save, post_delete], sender=EmployeeSalaryItem)
+def employee_salary_item_changed(sender, instance, **kwargs):
+    mark_dirty(
+        employee_id=instance.employee_id,
+        financial_period_id=instance.financial_period_id,
+        organization_id=instance.salary_item_type.organization_id,
+    )
+
+
+@receiver([post_save, post_delete], sender=MonthlyWorkRecord)
+def monthly_work_record_changed(sender, instance, **kwargs):
+    mark_dirty(
+        employee_id=instance.employee_id,
+        financial_period_id=instance.financial_period_id,
+        organization_id=instance.organization_id,
+    )
+
+
+@receiver([post_save, post_delete], sender=EmployeeLoan)
+def employee_loan_changed(sender, instance, **kwargs):
+    mark_dirty(employee_id=instance.employee_id, organization_id=instance.organization_id)
+
+
+@receiver([post_save, post_delete], sender=TaxLevel)
+def tax_level_changed(sender, instance, **kwargs):
+    # A bracket change affects every employee of every open period in the fiscal year.
+    mark_dirty(fiscal_year_id=instance.fiscal_year_id)
@@ -1,3 +1,229 @@
-from django.test import TestCase
+import io
+from decimal import Decimal
 
-# Create your tests here.
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from accounting_salary.testing import PayrollTestDataMixin, QueryBudgetMixin
+from employees.models import BankAccount, Employee
+from hr.models import MonthlyWorkRecord
+from jobs.models import Job
+from jobs.queue import claim_next, enqueue, run_job
+from organizations.models import Organization
+from users.models import CustomUser
+
+from .models import EmployeeSalaryItem, PayrollRun, SalaryItemType
+from .payroll import close_payroll_run, compute_period_payroll, run_payroll
+from .proration import prorate_period
+from .views import SalaryItemTypeList
+
+
+class SalaryItemTypeListQueryBudgetTests(PayrollTestDataMixin, QueryBudgetMixin, TestCase):
+    """
+    تعداد کوئری‌های لیست انواع آیتم‌های حقوقی نباید با تعداد ردیف‌ها رشد کند.
+    """
+
+    # Organizations the user may see, the page itself and nothing per row.
+    QUERY_BUDGET = 3
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = CustomUser.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def create_item_types(self, count):
+        SalaryItemType.objects.bulk_create([
+            SalaryItemType(organization=self.organization, financial_period=self.financial_period, name=f"آیتم {i}")
+            for i in range(count)
+        ])
+
+    def render_rows(self):
+        request = RequestFactory().get('/')
+        request.user = self.user
+        response = SalaryItemTypeList.as_view()(request)
+        # __str__ follows organization and financial_period, like the template does.
+        return [str(item_type) for item_type in response.context_data['salary_item_types']]
+
+    def test_budget_holds_for_few_rows(self):
+        self.create_item_types(3)
+        with self.assertMaxQueries(self.QUERY_BUDGET):
+            rows = self.render_rows()
+        self.assertEqual(len(rows), 3)
+
+    def test_budget_holds_for_a_full_page(self):
+        self.create_item_types(SalaryItemTypeList.keyset_page_size + 10)
+        with self.assertMaxQueries(self.QUERY_BUDGET):
+            rows = self.render_rows()
+        self.assertEqual(len(rows), SalaryItemTypeList.keyset_page_size)
+
+
+class ProrationTests(PayrollTestDataMixin, TestCase):
+    """
+    محاسبه کارکرد باید آیتم‌های مشتق را بنویسد و با موتور حقوق هم‌خوان باشد.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.employee = cls.create_employee()
+        base = SalaryItemType.objects.create(
+            organization=cls.organization, financial_period=cls.financial_period,
+            name="حقوق پایه", is_base_salary=True,
+        )
+        mission = SalaryItemType.objects.create(
+            organization=cls.organization, financial_period=cls.financial_period,
+            name="حق ماموریت", item_type='daily',
+        )
+        for item_type, amount in [(base, Decimal('176000000')), (mission, Decimal('1000000'))]:
+            EmployeeSalaryItem.objects.create(
+                employee=cls.employee, financial_period=cls.financial_period,
+                salary_item_type=item_type, amount=amount,
+            )
+        MonthlyWorkRecord.objects.create(
+            employee=cls.employee, organization=cls.organization, financial_period=cls.financial_period,
+            working_days_in_month=Decimal('20'), standard_hours_in_month=Decimal('176'),
+            overtime_hours=Decimal('10'), deficit_hours=Decimal('2'),
+        )
+
+    def derived_amounts(self):
+        return dict(
+            EmployeeSalaryItem.objects.filter(financial_period=self.financial_period)
+            .exclude(salary_item_type__derivation='')
+            .values_list('salary_item_type__derivation', 'amount')
+        )
+
+    def test_writes_derived_lines(self):
+        prorate_period(self.organization, self.financial_period)
+        # Hourly rate 1,000,000: 10 overtime hours at 1.4 and 2 deficit hours.
+        self.assertEqual(self.derived_amounts(), {
+            SalaryItemType.DERIVATION_DAILY: Decimal('20000000.00'),
+            SalaryItemType.DERIVATION_OVERTIME: Decimal('14000000.00'),
+            SalaryItemType.DERIVATION_DEFICIT: Decimal('2000000.00'),
+        })
+
+    def test_rerun_replaces_lines(self):
+        prorate_period(self.organization, self.financial_period)
+        MonthlyWorkRecord.objects.update(overtime_hours=Decimal('0'))
+        prorate_period(self.organization, self.financial_period)
+        self.assertNotIn(SalaryItemType.DERIVATION_OVERTIME, self.derived_amounts())
+
+    def test_payroll_uses_prorated_daily_items(self):
+        before = compute_period_payroll(self.organization, self.financial_period)
+        prorate_period(self.organization, self.financial_period)
+        after = compute_period_payroll(self.organization, self.financial_period)
+        # The daily item is not counted twice; only overtime and deficit are added.
+        self.assertEqual(after.earnings[0] - before.earnings[0], Decimal('14000000.00'))
+        self.assertEqual(after.deductions[0] - before.deductions[0], Decimal('2000000.00'))
+
+
+class SalaryInputSignalTests(PayrollTestDataMixin, TestCase):
+    """
+    تغییر آیتم حقوقی فقط ردیف‌های اجرای باز سازمان همان آیتم را کثیف می‌کند.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.employee = cls.create_employee()
+        cls.item_type = SalaryItemType.objects.create(
+            organization=cls.organization, financial_period=cls.financial_period,
+            name="حقوق پایه", is_base_salary=True,
+        )
+
+    def test_item_change_marks_only_its_organization(self):
+        own_run = PayrollRun.objects.create(organization=self.organization, financial_period=self.financial_period)
+        other_run = PayrollRun.objects.create(
+            organization=Organization.objects.create(name="سازمان دیگر"),
+            financial_period=self.financial_period,
+        )
+        EmployeeSalaryItem.objects.create(
+            employee=self.employee, financial_period=self.financial_period,
+            salary_item_type=self.item_type, amount=Decimal('1000000'),
+        )
+        self.assertTrue(own_run.lines.get(employee=self.employee).is_dirty)
+        self.assertFalse(other_run.lines.exists())
+
+
+class PayrollBankTransferExportTests(PayrollTestDataMixin, TestCase):
+    """
+    فایل بانکی نباید دریافت‌کنندگان بدون شبای معتبر را بی‌صدا کنار بگذارد.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = CustomUser.objects.create_superuser('admin', 'admin@example.com', 'password')
+        base = SalaryItemType.objects.create(
+            organization=cls.organization, financial_period=cls.financial_period,
+            name="حقوق پایه", is_base_salary=True,
+        )
+        cls.employees = [cls.create_employee(number) for number in (1, 2)]
+        for employee in cls.employees:
+            EmployeeSalaryItem.objects.create(
+                employee=employee, financial_period=cls.financial_period,
+                salary_item_type=base, amount=Decimal('100000000'),
+            )
+        BankAccount.objects.create(
+            employee=cls.employees[0], bank_name="ملی", account_number="1",
+            sheba_number="IR" + "1" * 24,
+        )
+        close_payroll_run(run_payroll(cls.organization, cls.financial_period))
+        cls.url = reverse('salaries:payroll_bank_transfer', kwargs={
+            'organization_pk': cls.organization.pk,
+            'financial_period_pk': cls.financial_period.pk,
+        })
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_payee_without_sheba_fails_the_download(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("0000000002", response.content.decode())
+        self.assertNotIn("0000000001", response.content.decode())
+
+    def test_complete_file_is_streamed(self):
+        BankAccount.objects.create(
+            employee=self.employees[1], bank_name="ملی", account_number="2",
+            sheba_number="IR" + "2" * 24,
+        )
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 3)
+
+    def test_queued_export_fails_with_the_skipped_list(self):
+        job = enqueue('salaries.bank_transfer', {
+            'organization': self.organization.pk,
+            'financial_period': self.financial_period.pk,
+        })
+        self.assertFalse(run_job(claim_next('test')))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_FAILED)
+        self.assertIn("0000000002", job.message)
+        self.assertIsNone(job.result)
+
+    def test_command_refuses_to_write_the_file(self):
+        stdout = io.StringIO()
+        with self.assertRaisesMessage(CommandError, "0000000002"):
+            call_command(
+                'export_bank_transfer', self.organization.pk, self.financial_period.pk,
+                stdout=stdout, stderr=io.StringIO(),
+            )
+        self.assertEqual(stdout.getvalue(), '')
+
+    def test_paya_records_have_fixed_byte_widths(self):
+        BankAccount.objects.create(
+            employee=self.employees[1], bank_name="ملی", account_number="2",
+            sheba_number="IR" + "2" * 24,
+        )
+        Employee.objects.filter(pk=self.employees[1].pk).update(last_name="نام خانوادگی بسیار طولانی" * 2)
+        response = self.client.get(self.url, {'file_format': 'paya'})
+        lines = b''.join(response.streaming_content).split(b'\r\n')[:-1]
+        # Persian names take two bytes per letter in UTF-8.
+        self.assertEqual([len(line) for line in lines], [29, 93, 93, 25])
+        self.assertEqual(lines[1][58:].decode('utf-8'), "کارمند 1" + " " * 21)
+        # The long name is cut at a character boundary, so the field still decodes.
+        self.assertEqual(lines[2][58:].decode('utf-8'), "کارمند نام خانوادگ ")
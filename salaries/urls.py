@@ -10,6 +10,8 @@ from .views import (
     EmployeeSalaryItemCreate,
     EmployeeSalaryItemUpdate,
     EmployeeSalaryItemDelete,
+    EmployeeSalaryItemGrid,
+    PayrollBankTransferExport,
     # Import DetailViews if you create them later
     # SalaryItemTypeDetail,
     # EmployeeSalaryItemDetail,
@@ -80,6 +82,18 @@ urlpatterns = [
         EmployeeSalaryItemDelete.as_view(),
         name='employeesalaryitem_delete'
     ),
+    path(
+        'organization/<int:organization_pk>/period/<int:financial_period_pk>/items/grid/',
+        EmployeeSalaryItemGrid.as_view(),
+        name='employeesalaryitem_grid'
+    ),
+    # Bank transfer file (CSV or Paya fixed-width) of the period's closed payroll run
+    # Example: /salaries/organization/1/period/5/bank-transfer/?file_format=paya
+    path(
+        'organization/<int:organization_pk>/period/<int:financial_period_pk>/bank-transfer/',
+        PayrollBankTransferExport.as_view(),
+        name='payroll_bank_transfer'
+    ),
     # Detail view for EmployeeSalaryItem (Optional)
     # path('items/<int:pk>/', EmployeeSalaryItemDetail.as_view(), name='employeesalaryitem_detail'),
 
@@ -1,6 +1,10 @@
+import json
+
 from django.shortcuts import render, get_object_or_404, redirect
-from django.http import HttpResponse
+from django.core.exceptions import ValidationError
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.views.generic import (
+    View,
     ListView,
     DetailView,
     CreateView,
@@ -16,32 +20,27 @@ from django.db.models import Q
 # Import models and forms from the current app
 from .models import SalaryItemType, EmployeeSalaryItem
 from .forms import SalaryItemTypeForm, EmployeeSalaryItemForm
+from .grid import SalaryItemGrid, apply_grid_changes
+from .bank_transfer import FORMAT_CSV, BankTransferFile, get_closed_run
 
 # Import necessary models from other apps for filtering or context
 from organizations.models import Organization
 from employees.models import Employee
 from settings_app.models import FinancialPeriod
 
-# Import CustomUser model for permission checks
-from users.models import CustomUser # Assuming CustomUser is in users.models
+# Organization-level permission checks (resolved once per request)
+from users.permissions import has_org_permission, org_ids_with_permission
+from accounting_salary.pagination import KeysetPaginationMixin
+from accounting_salary.mixins import OrganizationPeriodMixin, RelatedObjectsMixin
+from jobs.queue import available_tasks
 from django.utils.translation import gettext as _
 
 
-# Helper function to check organization-specific permission (can be defined in users app and imported)
-def has_org_permission(user, organization, perm_name):
-    """
-    Checks if the user has the specified permission in the given organization.
-    Assumes user is an instance of CustomUser with the has_organization_permission method.
-    """
-    if not isinstance(user, CustomUser):
-        # Handle cases where user is not CustomUser (e.g., AnonymousUser)
-        return False
-    return user.has_organization_permission(organization, perm_name)
 
 
 # --- Views for SalaryItemType (Management of Salary Item Types) ---
 
-class SalaryItemTypeList(LoginRequiredMixin, UserPassesTestMixin, ListView):
+class SalaryItemTypeList(LoginRequiredMixin, UserPassesTestMixin, RelatedObjectsMixin, KeysetPaginationMixin, ListView):
     """
     نمایش لیست انواع آیتم‌های حقوقی.
     نیاز به ورود به سیستم و مجوز مشاهده انواع آیتم‌های حقوقی (در سازمان مربوطه) دارد.
@@ -50,7 +49,8 @@ class SalaryItemTypeList(LoginRequiredMixin, UserPassesTestMixin, ListView):
     model = SalaryItemType
     template_name = 'salaries/salaryitemtype_list.html'
     context_object_name = 'salary_item_types'
-    # paginate_by = 10
+    keyset_page_size = 50
+    list_select_related = ('organization', 'financial_period')
 
     def test_func(self):
         # Check if the user has the general 'view_salaryitemtype' permission or is staff/superuser
@@ -91,10 +91,7 @@ class SalaryItemTypeList(LoginRequiredMixin, UserPassesTestMixin, ListView):
 
         else:
             # If no specific filter, show only types in organizations the user has permission to view them in
-            user_accessible_org_ids = [
-                org.pk for org in Organization.objects.all() # Or a subset of organizations
-                if has_org_permission(self.request.user, org, 'salaries.view_salaryitemtype')
-            ]
+            user_accessible_org_ids = org_ids_with_permission(self.request.user, 'salaries.view_salaryitemtype')
             queryset = queryset.filter(organization__pk__in=user_accessible_org_ids)
 
 
@@ -106,6 +103,8 @@ class SalaryItemTypeList(LoginRequiredMixin, UserPassesTestMixin, ListView):
             context['organization'] = self.organization
         if hasattr(self, 'financial_period'):
             context['financial_period'] = self.financial_period
+        if hasattr(self, 'organization') and hasattr(self, 'financial_period'):
+            context['period_tasks'] = available_tasks(self.request.user, self.organization)
         return context
 
 
@@ -205,7 +204,7 @@ class SalaryItemTypeDelete(LoginRequiredMixin, UserPassesTestMixin, SuccessMessa
 
 # --- Views for EmployeeSalaryItem (Management of Employee Salary Items) ---
 
-class EmployeeSalaryItemListByEmployee(LoginRequiredMixin, UserPassesTestMixin, ListView):
+class EmployeeSalaryItemListByEmployee(LoginRequiredMixin, UserPassesTestMixin, RelatedObjectsMixin, KeysetPaginationMixin, ListView):
     """
     نمایش لیست آیتم‌های حقوقی برای یک کارمند خاص در یک دوره مالی خاص.
     نیاز به ورود به سیستم و مجوز مشاهده آیتم‌های حقوقی کارمند (در سازمان مربوطه) دارد.
@@ -213,13 +212,14 @@ class EmployeeSalaryItemListByEmployee(LoginRequiredMixin, UserPassesTestMixin,
     model = EmployeeSalaryItem
     template_name = 'salaries/employeesalaryitem_list_by_employee.html'
     context_object_name = 'employee_salary_items'
-    # paginate_by = 10
+    keyset_page_size = 50
+    list_select_related = ('employee', 'salary_item_type', 'financial_period')
 
     def test_func(self):
         # Check if the user has the 'view_employeesalaryitem' permission in the organization of the financial period
         financial_period = get_object_or_404(FinancialPeriod, pk=self.kwargs['financial_period_pk'])
         return self.request.user.is_staff or self.request.user.is_superuser or \
-               has_org_permission(self.request.user, financial_period.organization, 'salaries.view_employeesalaryitem')
+               has_org_permission(self.request.user, financial_period.fiscal_year.organization, 'salaries.view_employeesalaryitem')
 
 
     def get_queryset(self):
@@ -231,7 +231,7 @@ class EmployeeSalaryItemListByEmployee(LoginRequiredMixin, UserPassesTestMixin,
 
         # Check if the employee is associated with the organization of the financial period
         # This is a sanity check, data integrity should ideally prevent this mismatch
-        if not self.employee.employee_organizations.filter(organization=self.financial_period.organization).exists():
+        if not self.employee.employee_organizations.filter(organization=self.financial_period.fiscal_year.organization).exists():
              messages.error(self.request, _("کارمند مورد نظر به سازمان مرتبط با این دوره مالی تعلق ندارد."))
              return EmployeeSalaryItem.objects.none() # Return empty queryset
 
@@ -245,7 +245,7 @@ class EmployeeSalaryItemListByEmployee(LoginRequiredMixin, UserPassesTestMixin,
         context = super().get_context_data(**kwargs)
         context['employee'] = self.employee
         context['financial_period'] = self.financial_period
-        context['organization'] = self.financial_period.organization # Add organization to context
+        context['organization'] = self.financial_period.fiscal_year.organization # Add organization to context
         return context
 
 
@@ -367,3 +367,75 @@ class EmployeeSalaryItemDelete(LoginRequiredMixin, UserPassesTestMixin, SuccessM
         return super().delete(request, *args, **kwargs)
 
 # Note: Detail Views can be added for both models if needed.
+
+
+# --- Period-wide grid editor for EmployeeSalaryItem ---
+
+class EmployeeSalaryItemGrid(LoginRequiredMixin, OrganizationPeriodMixin, UserPassesTestMixin, View):
+    """
+    ویرایش جدولی آیتم‌های حقوقی همه کارکنان یک سازمان در یک دوره مالی.
+    GET جدول را (به صورت صفحه یا با ?format=json به صورت JSON) برمی‌گرداند و POST
+    دسته‌ای از تغییرات خانه‌ها را به صورت JSON دریافت و یکجا ذخیره می‌کند.
+    """
+    template_name = 'salaries/employeesalaryitem_grid.html'
+    organization_permission = 'salaries.view_employeesalaryitem'
+
+    def can_change(self):
+        user = self.request.user
+        return user.is_staff or user.is_superuser or (
+            has_org_permission(user, self.organization, 'salaries.add_employeesalaryitem') and
+            has_org_permission(user, self.organization, 'salaries.change_employeesalaryitem')
+        )
+
+    def get(self, request, *args, **kwargs):
+        grid = SalaryItemGrid(self.organization, self.financial_period).as_dict()
+        if request.GET.get('format') == 'json':
+            return JsonResponse(grid)
+        return render(request, self.template_name, {
+            'organization': self.organization,
+            'financial_period': self.financial_period,
+            'grid': grid,
+            'can_change': self.can_change(),
+        })
+
+    def post(self, request, *args, **kwargs):
+        if not self.can_change():
+            return JsonResponse({'errors': {'__all__': [_("شما مجوز ویرایش آیتم‌های حقوقی در این سازمان را ندارید.")]}}, status=403)
+        try:
+            payload = json.loads(request.body)
+            changes = payload['changes']
+            if not isinstance(changes, list):
+                raise TypeError(changes)
+        except (ValueError, KeyError, TypeError):
+            return JsonResponse({'errors': {'__all__': [_("داده ارسالی نامعتبر است.")]}}, status=400)
+
+        try:
+            result = apply_grid_changes(self.organization, self.financial_period, changes)
+        except ValidationError as exc:
+            return JsonResponse({'errors': exc.message_dict}, status=400)
+        return JsonResponse(result)
+
+
+# --- Bank transfer file of a closed payroll run ---
+
+class PayrollBankTransferExport(LoginRequiredMixin, OrganizationPeriodMixin, UserPassesTestMixin, View):
+    """
+    دریافت فایل انتقال بانکی خالص پرداختی یک دوره (?file_format=csv یا paya).
+    فایل به صورت جریانی تولید می‌شود و کل ردیف‌ها در حافظه بارگذاری نمی‌شوند.
+    اگر دریافت‌کننده‌ای شبای معتبر نداشته باشد فایل تولید نمی‌شود و پاسخ 400
+    فهرست این کارکنان را برمی‌گرداند.
+    """
+    organization_permission = 'salaries.view_payrollrun'
+
+    def get(self, request, *args, **kwargs):
+        try:
+            payroll_run = get_closed_run(self.organization, self.financial_period)
+            transfer = BankTransferFile(payroll_run, request.GET.get('file_format', FORMAT_CSV))
+            transfer.check_payees()
+        except ValidationError as exc:
+            return HttpResponse('\n'.join(exc.messages), status=400, content_type='text/plain; charset=utf-8')
+
+        content_type = 'text/csv' if transfer.file_format == FORMAT_CSV else 'text/plain'
+        response = StreamingHttpResponse(transfer.lines(), content_type=f'{content_type}; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{transfer.filename}"'
+        return response
@@ -1,10 +1,11 @@
 from django.db import models
 # اطمینان از import مدل Organization از اپ organizations
 from organizations.models import Organization # <--- این خط تغییر می‌کند
-from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _ # برای استفاده از ترجمه در verbose_name
 from django.db.models import Q, F # برای استفاده در CheckConstraint و clean
 
+from accounting_salary.intervals import OverlapValidator
+
 
 class FiscalYear(models.Model):
     """
@@ -38,20 +39,18 @@ class FiscalYear(models.Model):
         """
         اعتبارسنجی برای اطمینان از عدم همپوشانی با سال‌های مالی موجود برای همان سازمان.
         """
-        if self.organization and self.start_date and self.end_date:
-            overlapping_years = FiscalYear.objects.filter(
-                organization=self.organization,
-                start_date__lte=self.end_date,
-                end_date__gte=self.start_date
-            ).exclude(pk=self.pk) # exclude کردن شیء فعلی در زمان ویرایش
-
-            if overlapping_years.exists():
-                 raise ValidationError(_("این سال مالی با یک سال مالی موجود برای این سازمان همپوشانی دارد."))
-
+        fiscal_year_overlaps.validate([self])
 
     def __str__(self):
         return f"{self.organization} - {self.title}"
 
+
+fiscal_year_overlaps = OverlapValidator(
+    FiscalYear,
+    key_fields=['organization'],
+    message=_("این سال مالی با یک سال مالی موجود برای این سازمان همپوشانی دارد."),
+)
+
 class InsuranceCeiling(models.Model):
     """
     مدلی برای ذخیره سقف مبلغ بیمه برای هر سال مالی مشخص.
@@ -108,20 +107,23 @@ class TaxLevel(models.Model):
         """
         اعتبارسنجی برای جلوگیری از همپوشانی بازه‌های مالیاتی در یک سال مالی.
         """
-        if self.fiscal_year and self.from_amount is not None and self.to_amount is not None:
-            overlapping_levels = TaxLevel.objects.filter(
-                fiscal_year=self.fiscal_year,
-                from_amount__lt=self.to_amount,
-                to_amount__gt=self.from_amount
-            ).exclude(pk=self.pk) # exclude کردن شیء فعلی در زمان ویرایش
-
-            if overlapping_levels.exists():
-                raise ValidationError(_("این بازه مالیاتی با یک بازه موجود در این سال مالی همپوشانی دارد."))
+        tax_level_overlaps.validate([self])
 
     def __str__(self):
         return f"{self.fiscal_year} - {self.level_title}"
 
 
+# Tax brackets are half-open [from_amount, to_amount): adjacent levels share a bound.
+tax_level_overlaps = OverlapValidator(
+    TaxLevel,
+    key_fields=['fiscal_year'],
+    start_field='from_amount',
+    end_field='to_amount',
+    closed=False,
+    message=_("این بازه مالیاتی با یک بازه موجود در این سال مالی همپوشانی دارد."),
+)
+
+
 class FinancialPeriod(models.Model):
     """
     مدلی برای تعریف دوره‌های مالی (مانند ماهانه، فصلی) برای محاسبات حقوق.
@@ -155,20 +157,18 @@ class FinancialPeriod(models.Model):
         """
         اعتبارسنجی برای اطمینان از عدم همپوشانی با دوره‌های مالی موجود برای همان سال مالی.
         """
-        if self.fiscal_year and self.start_date and self.end_date:
-            overlapping_periods = FinancialPeriod.objects.filter(
-                fiscal_year=self.fiscal_year,
-                start_date__lte=self.end_date,
-                end_date__gte=self.start_date
-            ).exclude(pk=self.pk) # exclude کردن شیء فعلی در زمان ویرایش
-
-            if overlapping_periods.exists():
-                 raise ValidationError(_("این دوره مالی با یک دوره موجود برای این سال مالی همپوشانی دارد."))
-
+        financial_period_overlaps.validate([self])
 
     def __str__(self):
         return f"{self.fiscal_year} - {self.name}"
 
+
+financial_period_overlaps = OverlapValidator(
+    FinancialPeriod,
+    key_fields=['fiscal_year'],
+    message=_("این دوره مالی با یک دوره موجود برای این سال مالی همپوشانی دارد."),
+)
+
 # نکته: پس از اعمال تغییرات در مدل‌ها، حتماً دستورات makemigrations و migrate را اجرا کنید.
 # python manage.py makemigrations settings_app
 # python manage.py migrate
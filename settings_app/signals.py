@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import TaxLevel
+from .tax import invalidate_tax_table
+
+
+@receiver([post_save, post_delete], sender=TaxLevel)
+def tax_level_changed(sender, instance, **kwargs):
+    # جدول مالیاتی کامپایل‌شده سال مالی این سطح دیگر معتبر نیست.
+    invalidate_tax_table(instance.fiscal_year_id)
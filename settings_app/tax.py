@@ -0,0 +1,144 @@
+"""
+جدول کامپایل‌شده و تغییرناپذیر سطوح مالیاتی هر سال مالی.
+
+جدول یک بار برای هر سال مالی از روی TaxLevel ساخته می‌شود و مالیات تجمعی
+در ابتدای هر سطح از قبل محاسبه می‌شود؛ در نتیجه مالیات هر درآمد با یک جستجوی
+دودویی و یک ضرب به دست می‌آید. جدول‌ها در حافظه هر پروسه نگهداری می‌شوند و
+کنار هر جدول نسخه سال مالی آن در کش جنگو ثبت می‌شود. تغییر هر TaxLevel (از طریق
+سیگنال‌ها) نسخه سال مالی را در کش مشترک افزایش می‌دهد، پس همه پروسه‌ها (کارگرهای
+وب، run_jobs و پروسه‌های صدور فیش) در اولین استفاده بعدی جدول را دوباره
+می‌سازند. برای تغییراتی که از سیگنال‌ها نمی‌گذرند (update() گروهی)، هر جدول پس از
+TAX_TABLE_CACHE_TIMEOUT ثانیه نیز دوباره ساخته می‌شود.
+"""
+import time
+from bisect import bisect_right
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import TaxLevel
+
+
+ZERO = Decimal('0')
+
+
+class TaxTable:
+    """
+    Immutable progressive tax table.
+    Brackets are stored as parallel tuples sorted by lower bound, together with
+    the cumulative tax owed at each bracket's lower bound.
+    """
+
+    __slots__ = ('fiscal_year_id', 'lowers', 'uppers', 'rates', 'cumulative')
+
+    def __init__(self, fiscal_year_id, brackets):
+        """
+        `brackets` is an iterable of (from_amount, to_amount, tax_percent) rows.
+        """
+        lowers, uppers, rates, cumulative = [], [], [], []
+        running = ZERO
+        for from_amount, to_amount, tax_percent in sorted(brackets):
+            rate = tax_percent / 100
+            lowers.append(from_amount)
+            uppers.append(to_amount)
+            rates.append(rate)
+            cumulative.append(running)
+            running += (to_amount - from_amount) * rate
+
+        object.__setattr__(self, 'fiscal_year_id', fiscal_year_id)
+        object.__setattr__(self, 'lowers', tuple(lowers))
+        object.__setattr__(self, 'uppers', tuple(uppers))
+        object.__setattr__(self, 'rates', tuple(rates))
+        object.__setattr__(self, 'cumulative', tuple(cumulative))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("TaxTable is immutable")
+
+    def __len__(self):
+        return len(self.lowers)
+
+    def tax(self, income):
+        """
+        Tax owed for a single income: one binary search plus one multiply.
+        """
+        i = bisect_right(self.lowers, income) - 1
+        if i < 0:
+            return ZERO
+        # min() caps incomes that fall in a gap after the bracket (or above the last one).
+        return self.cumulative[i] + (min(income, self.uppers[i]) - self.lowers[i]) * self.rates[i]
+
+    def tax_many(self, incomes):
+        """
+        Batch variant of tax() for a whole column of incomes.
+        """
+        lowers, uppers, rates, cumulative = self.lowers, self.uppers, self.rates, self.cumulative
+        result = []
+        append = result.append
+        for income in incomes:
+            i = bisect_right(lowers, income) - 1
+            if i < 0:
+                append(ZERO)
+            else:
+                append(cumulative[i] + (min(income, uppers[i]) - lowers[i]) * rates[i])
+        return result
+
+
+TAX_TABLE_CACHE_TIMEOUT = getattr(settings, 'TAX_TABLE_CACHE_TIMEOUT', 60 * 5)
+
+# fiscal_year_id -> (version, compiled at (monotonic), TaxTable), per process.
+_tables = {}
+
+
+def tax_table_version_key(fiscal_year_id):
+    return f'settings_app:tax_table:{fiscal_year_id}:version'
+
+
+def get_tax_table_version(fiscal_year_id):
+    key = tax_table_version_key(fiscal_year_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, 1, timeout=None)
+        version = cache.get(key, 1)
+    return version
+
+
+def compile_tax_table(fiscal_year_id):
+    rows = TaxLevel.objects.filter(fiscal_year_id=fiscal_year_id).values_list(
+        'from_amount', 'to_amount', 'tax_percent'
+    )
+    return TaxTable(fiscal_year_id, rows)
+
+
+def get_tax_table(fiscal_year_id):
+    """
+    Returns the TaxTable of a fiscal year, compiling it again when its version
+    in the shared cache moved on or the local copy is older than
+    TAX_TABLE_CACHE_TIMEOUT.
+    """
+    # Read the version before compiling so a concurrent bump is never
+    # recorded against brackets loaded under the old version.
+    version = get_tax_table_version(fiscal_year_id)
+    entry = _tables.get(fiscal_year_id)
+    if entry is not None:
+        cached_version, compiled_at, table = entry
+        if cached_version == version and time.monotonic() - compiled_at < TAX_TABLE_CACHE_TIMEOUT:
+            return table
+    table = compile_tax_table(fiscal_year_id)
+    _tables[fiscal_year_id] = (version, time.monotonic(), table)
+    return table
+
+
+def invalidate_tax_table(fiscal_year_id):
+    """
+    Makes every process recompile the fiscal year's table by moving to a new
+    version; also drops this process's copy.
+    """
+    _tables.pop(fiscal_year_id, None)
+    key = tax_table_version_key(fiscal_year_id)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # The version key was evicted; any value other than the old one will do.
+        cache.add(key, 1, timeout=None)
+        return cache.incr(key)
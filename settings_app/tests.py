@@ -1,3 +1,92 @@
-from django.test import TestCase
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+
+from accounting_salary.testing import PayrollTestDataMixin
+
+from . import tax
+from .models import TaxLevel
+from .tax import TaxTable, get_tax_table, tax_table_version_key
+
+
+class TaxTableTests(SimpleTestCase):
+    """
+    مالیات هر درآمد از سطوح مالیاتی پلکانی.
+    """
+
+    def table(self, *brackets):
+        return TaxTable(1, [tuple(Decimal(value) for value in bracket) for bracket in brackets])
+
+    def test_progressive_brackets(self):
+        table = self.table(('0', '100', '0'), ('100', '200', '10'), ('200', '500', '20'))
+        self.assertEqual(table.tax(Decimal('50')), Decimal('0'))
+        self.assertEqual(table.tax(Decimal('150')), Decimal('5'))
+        self.assertEqual(table.tax(Decimal('300')), Decimal('30'))
+        # Income above the last bracket is taxed up to its upper bound only.
+        self.assertEqual(table.tax(Decimal('1000')), Decimal('70'))
+
+    def test_income_below_and_between_brackets(self):
+        table = self.table(('200', '300', '20'), ('100', '150', '10'))
+        self.assertEqual(table.tax(Decimal('50')), Decimal('0'))
+        # 170 falls in the gap after the first bracket.
+        self.assertEqual(table.tax(Decimal('170')), Decimal('5'))
+        self.assertEqual(table.tax(Decimal('250')), Decimal('15'))
+
+    def test_tax_many_matches_tax(self):
+        table = self.table(('0', '100', '0'), ('100', '200', '10'), ('200', '500', '20'))
+        incomes = [Decimal(value) for value in ('0', '99', '100', '199.5', '200', '499', '501')]
+        self.assertEqual(table.tax_many(incomes), [table.tax(income) for income in incomes])
+
+    def test_table_is_immutable(self):
+        with self.assertRaises(AttributeError):
+            self.table(('0', '100', '10')).rates = ()
+
+
+class TaxTableCacheTests(PayrollTestDataMixin, TestCase):
+    """
+    جدول کامپایل‌شده با تغییر سطوح مالیاتی در همه پروسه‌ها دوباره ساخته می‌شود.
+    """
+
+    def setUp(self):
+        # Primary keys are reused once each test's transaction is rolled back.
+        cache.clear()
+        tax._tables.clear()
+
+    def create_level(self, from_amount, to_amount, tax_percent):
+        return TaxLevel.objects.create(
+            fiscal_year=self.fiscal_year, level_title=f"{from_amount}-{to_amount}",
+            from_amount=Decimal(from_amount), to_amount=Decimal(to_amount), tax_percent=Decimal(tax_percent),
+        )
+
+    def test_table_is_compiled_once(self):
+        self.create_level('0', '100', '10')
+        table = get_tax_table(self.fiscal_year.pk)
+        with self.assertNumQueries(0):
+            self.assertIs(get_tax_table(self.fiscal_year.pk), table)
+
+    def test_saving_a_level_recompiles(self):
+        level = self.create_level('0', '100', '10')
+        self.assertEqual(get_tax_table(self.fiscal_year.pk).tax(Decimal('100')), Decimal('10'))
+        level.tax_percent = Decimal('20')
+        level.save()
+        self.assertEqual(get_tax_table(self.fiscal_year.pk).tax(Decimal('100')), Decimal('20'))
+        level.delete()
+        self.assertEqual(len(get_tax_table(self.fiscal_year.pk)), 0)
+
+    def test_version_bumped_by_another_process_recompiles(self):
+        level = self.create_level('0', '100', '10')
+        get_tax_table(self.fiscal_year.pk)
+        # Another process saved the level: only the shared version moves.
+        TaxLevel.objects.filter(pk=level.pk).update(tax_percent=Decimal('20'))
+        cache.incr(tax_table_version_key(self.fiscal_year.pk))
+        self.assertEqual(get_tax_table(self.fiscal_year.pk).tax(Decimal('100')), Decimal('20'))
+
+    def test_local_copy_expires(self):
+        level = self.create_level('0', '100', '10')
+        get_tax_table(self.fiscal_year.pk)
+        TaxLevel.objects.filter(pk=level.pk).update(tax_percent=Decimal('20'))
+        self.assertEqual(get_tax_table(self.fiscal_year.pk).tax(Decimal('100')), Decimal('10'))
+        with mock.patch.object(tax, 'TAX_TABLE_CACHE_TIMEOUT', 0):
+            self.assertEqual(get_tax_table(self.fiscal_year.pk).tax(Decimal('100')), Decimal('20'))
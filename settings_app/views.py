@@ -12,24 +12,15 @@ from django.utils.translation import gettext_lazy as _
 from .models import FiscalYear, InsuranceCeiling, TaxLevel, FinancialPeriod
 from .forms import FiscalYearForm, InsuranceCeilingForm, TaxLevelForm, FinancialPeriodForm
 
-# Import Organization model and CustomUser model for permission checks
+# Import Organization model and organization-level permission checks
 from organizations.models import Organization
-from users.models import CustomUser # Assuming CustomUser is in users.models
+from users.permissions import has_org_permission, org_ids_with_permission
+from accounting_salary.mixins import RelatedObjectsMixin
 
-# Helper function to check organization-specific permission (can be defined in users app and imported)
-def has_org_permission(user, organization, perm_name):
-    """
-    Checks if the user has the specified permission in the given organization.
-    Assumes user is an instance of CustomUser with the has_organization_permission method.
-    """
-    if not isinstance(user, CustomUser):
-        # Handle cases where user is not CustomUser (e.g., AnonymousUser)
-        return False
-    return user.has_organization_permission(organization, perm_name)
 
 
 # ویوهای مدیریت سال‌های مالی (FiscalYear)
-class FiscalYearListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
+class FiscalYearListView(LoginRequiredMixin, UserPassesTestMixin, RelatedObjectsMixin, ListView):
     """
     نمایش لیست تمامی سال‌های مالی.
     نیاز به ورود به سیستم و مجوز مشاهده سال‌های مالی دارد.
@@ -38,6 +29,7 @@ class FiscalYearListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
     template_name = 'settings_app/fiscal_year_list.html'
     context_object_name = 'fiscal_years'
     # paginate_by = 10 # اضافه کردن صفحه بندی (اختیاری)
+    list_select_related = ('organization',)
 
     def test_func(self):
         # Check if the user has the general 'view_fiscalyear' permission or is staff/superuser
@@ -54,10 +46,7 @@ class FiscalYearListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
             # Show only fiscal years in organizations the user has permission to view them in
             # This requires defining what "permission to view fiscal years in an organization" means.
             # Let's assume it means having 'settings_app.view_fiscalyear' permission in that organization.
-            user_accessible_org_ids = [
-                org.pk for org in Organization.objects.all() # Or a subset of organizations
-                if has_org_permission(self.request.user, org, 'settings_app.view_fiscalyear')
-            ]
+            user_accessible_org_ids = org_ids_with_permission(self.request.user, 'settings_app.view_fiscalyear')
             return FiscalYear.objects.filter(organization__pk__in=user_accessible_org_ids)
 
 
@@ -120,7 +109,7 @@ class FiscalYearUpdateView(LoginRequiredMixin, UserPassesTestMixin, SuccessMessa
 # ویوهای مدیریت سقف‌های بیمه (InsuranceCeiling)
 # توجه: این ویوها به یک سال مالی خاص مرتبط هستند و fiscal_year_pk را از URL دریافت می‌کنند.
 
-class InsuranceCeilingListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
+class InsuranceCeilingListView(LoginRequiredMixin, UserPassesTestMixin, RelatedObjectsMixin, ListView):
     """
     نمایش لیست سقف‌های بیمه برای یک سال مالی خاص.
     نیاز به ورود به سیستم و مجوز مشاهده سقف‌های بیمه (در سازمان مربوطه) دارد.
@@ -128,6 +117,7 @@ class InsuranceCeilingListView(LoginRequiredMixin, UserPassesTestMixin, ListView
     model = InsuranceCeiling
     template_name = 'settings_app/insurance_ceiling_list.html'
     context_object_name = 'insurance_ceilings'
+    list_select_related = ('fiscal_year',)
 
     def test_func(self):
         # Check if the user has the 'view_insuranceceiling' permission in the organization of the fiscal year
@@ -197,7 +187,7 @@ class InsuranceCeilingUpdateView(LoginRequiredMixin, UserPassesTestMixin, Succes
 # ویوهای مدیریت سطوح مالیاتی (TaxLevel)
 # توجه: این ویوها به یک سال مالی خاص مرتبط هستند و fiscal_year_pk را از URL دریافت می‌کنند.
 
-class TaxLevelListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
+class TaxLevelListView(LoginRequiredMixin, UserPassesTestMixin, RelatedObjectsMixin, ListView):
     """
     نمایش لیست سطوح مالیاتی برای یک سال مالی خاص.
     نیاز به ورود به سیستم و مجوز مشاهده سطوح مالیاتی (در سازمان مربوطه) دارد.
@@ -205,6 +195,7 @@ class TaxLevelListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
     model = TaxLevel
     template_name = 'settings_app/tax_level_list.html'
     context_object_name = 'tax_levels'
+    list_select_related = ('fiscal_year',)
 
     def test_func(self):
         # Check if the user has the 'view_taxlevel' permission in the organization of the fiscal year
@@ -274,7 +265,7 @@ class TaxLevelUpdateView(LoginRequiredMixin, UserPassesTestMixin, SuccessMessage
 # ویوهای مدیریت دوره‌های مالی (FinancialPeriod)
 # توجه: این ویوها به یک سال مالی خاص مرتبط هستند و fiscal_year_pk را از URL دریافت می‌کنند.
 
-class FinancialPeriodListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
+class FinancialPeriodListView(LoginRequiredMixin, UserPassesTestMixin, RelatedObjectsMixin, ListView):
     """
     نمایش لیست تمامی دوره‌های مالی برای یک سال مالی خاص.
     نیاز به ورود به سیستم و مجوز مشاهده دوره‌های مالی (در سازمان مربوطه) دارد.
@@ -282,6 +273,7 @@ class FinancialPeriodListView(LoginRequiredMixin, UserPassesTestMixin, ListView)
     model = FinancialPeriod
     template_name = 'settings_app/financial_period_list.html'
     context_object_name = 'financial_periods'
+    list_select_related = ('fiscal_year',)
 
     def test_func(self):
         # Check if the user has the 'view_financialperiod' permission in the organization of the fiscal year
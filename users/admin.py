@@ -15,9 +15,8 @@ class CustomUserAdmin(UserAdmin):
     model = CustomUser
     list_display = ['username', 'email', 'first_name', 'last_name', 'is_staff', 'is_active'] # Customize list display
     # Customize fieldsets for display and add forms
-    fieldsets = UserAdmin.fieldsets + (
-        (None, {'fields': ('first_name', 'last_name', 'email',)}), # Add custom fields to display form
-    )
+    # UserAdmin.fieldsets already shows first_name, last_name and email ("Personal info").
+    fieldsets = UserAdmin.fieldsets
     add_fieldsets = UserAdmin.add_fieldsets + (
         (None, {'fields': ('first_name', 'last_name', 'email',)}), # Add custom fields to add form
     )
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from users.models import CustomUser
+from users.permissions import cache_permission_maps, get_permission_cache_version, load_permission_maps
+
+
+class Command(BaseCommand):
+    help = "پیش‌بارگذاری کش مجوزهای سازمانی برای تمام کاربران فعال"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help="Number of users whose permission maps are loaded per query.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        started = time.perf_counter()
+        version = get_permission_cache_version()
+        user_ids = list(CustomUser.objects.filter(is_active=True).order_by('pk').values_list('pk', flat=True))
+        for offset in range(0, len(user_ids), batch_size):
+            batch = user_ids[offset:offset + batch_size]
+            cache_permission_maps(load_permission_maps(batch), version)
+        self.stdout.write(
+            f"Cached permissions of {len(user_ids)} users ({time.perf_counter() - started:.2f}s)"
+        )
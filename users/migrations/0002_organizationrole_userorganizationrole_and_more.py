@@ -0,0 +1,57 @@
+# Generated by Django 5.2.1 on 2026-10-18 16:48
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('organizations', '0001_initial'),
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrganizationRole',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='نام نقش')),
+                ('description', models.TextField(blank=True, null=True, verbose_name='توضیحات')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='تاریخ ایجاد')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='تاریخ به\u200cروزرسانی')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='roles', to='organizations.organization', verbose_name='سازمان')),
+                ('permissions', models.ManyToManyField(blank=True, related_name='organization_roles', to='auth.permission', verbose_name='مجوزها')),
+            ],
+            options={
+                'verbose_name': 'نقش سازمانی',
+                'verbose_name_plural': 'نقش\u200cهای سازمانی',
+                'ordering': ['organization', 'name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='UserOrganizationRole',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='تاریخ ایجاد')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='user_organization_roles', to='organizations.organization', verbose_name='سازمان')),
+                ('role', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='user_assignments', to='users.organizationrole', verbose_name='نقش')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='user_organization_roles', to=settings.AUTH_USER_MODEL, verbose_name='کاربر')),
+            ],
+            options={
+                'verbose_name': 'نقش سازمانی کاربر',
+                'verbose_name_plural': 'نقش\u200cهای سازمانی کاربران',
+                'ordering': ['organization', 'user'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='organizationrole',
+            constraint=models.UniqueConstraint(fields=('organization', 'name'), name='unique_role_name_per_org'),
+        ),
+        migrations.AddConstraint(
+            model_name='userorganizationrole',
+            constraint=models.UniqueConstraint(fields=('user', 'organization', 'role'), name='unique_user_role_per_org'),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.contrib.auth.models import AbstractUser
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.utils.translation import gettext_lazy as _ # برای ترجمه label ها
 
@@ -43,6 +44,97 @@ class CustomUser(AbstractUser):
     def __str__(self):
         return self.username
 
+    def get_organization_permissions(self):
+        """
+        Resolver of this user's organization-level permissions, memoized on the
+        user instance (i.e. for the lifetime of the request).
+        """
+        from .permissions import get_permission_resolver
+        return get_permission_resolver(self)
+
+    def has_organization_permission(self, organization, perm_name):
+        """
+        آیا کاربر مجوز perm_name (مانند 'hr.view_department') را در سازمان داده شده دارد؟
+        """
+        return self.get_organization_permissions().has(organization, perm_name)
+
+
+class OrganizationRole(models.Model):
+    """
+    نقش‌های تعریف شده در هر سازمان (مانند حسابدار حقوق، مدیر منابع انسانی).
+    هر نقش مجموعه‌ای از مجوزهای جنگو را در محدوده همان سازمان اعطا می‌کند.
+    """
+    organization = models.ForeignKey(
+        'organizations.Organization',
+        on_delete=models.CASCADE,
+        related_name='roles',
+        verbose_name=_("سازمان")
+    )
+    name = models.CharField(max_length=100, verbose_name=_("نام نقش"))
+    description = models.TextField(blank=True, null=True, verbose_name=_("توضیحات"))
+    permissions = models.ManyToManyField(
+        'auth.Permission',
+        blank=True,
+        related_name='organization_roles',
+        verbose_name=_("مجوزها")
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("تاریخ ایجاد"))
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_("تاریخ به‌روزرسانی"))
+
+    class Meta:
+        verbose_name = _("نقش سازمانی")
+        verbose_name_plural = _("نقش‌های سازمانی")
+        constraints = [
+            models.UniqueConstraint(fields=['organization', 'name'], name='unique_role_name_per_org')
+        ]
+        ordering = ['organization', 'name']
+
+    def __str__(self):
+        return f"{self.name} ({self.organization})"
+
+
+class UserOrganizationRole(models.Model):
+    """
+    انتساب یک نقش سازمانی به یک کاربر در یک سازمان.
+    """
+    user = models.ForeignKey(
+        CustomUser,
+        on_delete=models.CASCADE,
+        related_name='user_organization_roles',
+        verbose_name=_("کاربر")
+    )
+    organization = models.ForeignKey(
+        'organizations.Organization',
+        on_delete=models.CASCADE,
+        related_name='user_organization_roles',
+        verbose_name=_("سازمان")
+    )
+    role = models.ForeignKey(
+        OrganizationRole,
+        on_delete=models.CASCADE,
+        related_name='user_assignments',
+        verbose_name=_("نقش")
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("تاریخ ایجاد"))
+
+    class Meta:
+        verbose_name = _("نقش سازمانی کاربر")
+        verbose_name_plural = _("نقش‌های سازمانی کاربران")
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'organization', 'role'], name='unique_user_role_per_org')
+        ]
+        ordering = ['organization', 'user']
+
+    def clean(self):
+        """
+        نقش انتساب داده شده باید متعلق به همان سازمان باشد.
+        """
+        if self.role_id and self.organization_id and self.role.organization_id != self.organization_id:
+            raise ValidationError(_("نقش انتخاب شده متعلق به این سازمان نیست."))
+
+    def __str__(self):
+        return f"{self.user} - {self.role.name} ({self.organization})"
+
 # نکته مهم:
 # پس از تعریف این مدل CustomUser و قبل از اولین migration،
 # باید در فایل settings.py پروژه، خط زیر را اضافه یا به‌روزرسانی کنید:
@@ -0,0 +1,209 @@
+"""
+تشخیص مجوزهای سازمانی کاربر.
+
+تمام نقش‌های سازمانی کاربر (UserOrganizationRole -> OrganizationRole -> Permission)
+با یک کوئری بارگذاری و به صورت نگاشت {شناسه سازمان: مجموعه مجوزها} در حافظه
+نگهداری می‌شوند. نمونه resolver روی شیء کاربر ذخیره می‌شود، پس در طول یک
+درخواست فقط یک بار ساخته می‌شود.
+
+علاوه بر این، نگاشت هر کاربر در کش جنگو با یک کلید نسخه‌دار ذخیره می‌شود تا
+درخواست‌های بعدی اصلاً به پایگاه داده مراجعه نکنند. هر تغییر در نقش‌ها یا
+مجوزها (users.signals) نسخه را افزایش می‌دهد و همه ورودی‌های قبلی را باطل می‌کند.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from organizations.models import Organization
+
+
+RESOLVER_CACHE_ATTR = '_organization_permission_resolver'
+
+PERMISSION_CACHE_VERSION_KEY = 'users:org_permissions:version'
+PERMISSION_CACHE_TIMEOUT = getattr(settings, 'ORGANIZATION_PERMISSION_CACHE_TIMEOUT', 60 * 60)
+
+
+def get_permission_cache_version():
+    version = cache.get(PERMISSION_CACHE_VERSION_KEY)
+    if version is None:
+        cache.add(PERMISSION_CACHE_VERSION_KEY, 1, timeout=None)
+        version = cache.get(PERMISSION_CACHE_VERSION_KEY, 1)
+    return version
+
+
+def bump_permission_cache_version():
+    """
+    Invalidates every cached permission map by moving to a new key version.
+    """
+    try:
+        return cache.incr(PERMISSION_CACHE_VERSION_KEY)
+    except ValueError:
+        # The version key was evicted; any value other than the old one will do.
+        cache.add(PERMISSION_CACHE_VERSION_KEY, 1, timeout=None)
+        return cache.incr(PERMISSION_CACHE_VERSION_KEY)
+
+
+def permission_cache_key(user_pk, version=None):
+    if version is None:
+        version = get_permission_cache_version()
+    return f'users:org_permissions:v{version}:user:{user_pk}'
+
+
+def load_permission_maps(user_ids):
+    """
+    Builds {user_id: {organization_id: set(perm names)}} for many users in one query.
+    """
+    from .models import UserOrganizationRole
+
+    permission_maps = {user_id: {} for user_id in user_ids}
+    rows = UserOrganizationRole.objects.filter(
+        user_id__in=user_ids,
+        role__permissions__isnull=False,
+    ).values_list(
+        'user_id',
+        'organization_id',
+        'role__permissions__content_type__app_label',
+        'role__permissions__codename',
+    ).iterator(chunk_size=5000)
+    for user_id, organization_id, app_label, codename in rows:
+        permission_maps[user_id].setdefault(organization_id, set()).add(f"{app_label}.{codename}")
+    return permission_maps
+
+
+def cache_permission_maps(permission_maps, version=None):
+    if version is None:
+        version = get_permission_cache_version()
+    cache.set_many(
+        {permission_cache_key(user_id, version): permission_map for user_id, permission_map in permission_maps.items()},
+        timeout=PERMISSION_CACHE_TIMEOUT,
+    )
+
+
+def _org_pk(organization):
+    return getattr(organization, 'pk', organization)
+
+
+class OrganizationPermissionResolver:
+    """
+    Answers organization-scoped permission checks for one user from an in-memory map.
+    Permission names use Django's "app_label.codename" form.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self._permissions = None
+        self._all_org_ids = None
+
+    @property
+    def is_unrestricted(self):
+        return bool(self.user.is_active and self.user.is_superuser)
+
+    def load_permission_map(self):
+        """
+        Reads the map from the shared cache, falling back to a single query.
+        """
+        # Read the version before querying so a concurrent bump is never
+        # overwritten with data loaded under the old version.
+        version = get_permission_cache_version()
+        key = permission_cache_key(self.user.pk, version)
+        permission_map = cache.get(key)
+        if permission_map is None:
+            permission_map = load_permission_maps([self.user.pk])[self.user.pk]
+            cache.set(key, permission_map, timeout=PERMISSION_CACHE_TIMEOUT)
+        return permission_map
+
+    @property
+    def permissions(self):
+        if self._permissions is None:
+            if not self.user.is_active:
+                self._permissions = {}
+            else:
+                self._permissions = self.load_permission_map()
+        return self._permissions
+
+    def has(self, organization, perm_name):
+        if organization is None:
+            return False
+        if self.is_unrestricted:
+            return True
+        return perm_name in self.permissions.get(_org_pk(organization), ())
+
+    def orgs_with(self, perm_name):
+        """
+        Set of organization ids in which the user holds `perm_name`.
+        """
+        if self.is_unrestricted:
+            if self._all_org_ids is None:
+                self._all_org_ids = set(Organization.objects.values_list('pk', flat=True))
+            return self._all_org_ids
+        return {
+            organization_id
+            for organization_id, perms in self.permissions.items()
+            if perm_name in perms
+        }
+
+    def has_in_any(self, organization_ids, perm_name):
+        """
+        True if the user holds `perm_name` in at least one of `organization_ids`.
+        """
+        if self.is_unrestricted:
+            return True
+        permissions = self.permissions
+        return any(perm_name in permissions.get(organization_id, ()) for organization_id in organization_ids)
+
+    def organization_ids(self):
+        """
+        Organizations in which the user holds at least one role permission.
+        """
+        return set(self.permissions)
+
+
+class _NoPermissions:
+    """
+    Resolver used for anonymous users: grants nothing, runs no queries.
+    """
+
+    is_unrestricted = False
+
+    def has(self, organization, perm_name):
+        return False
+
+    def orgs_with(self, perm_name):
+        return set()
+
+    def has_in_any(self, organization_ids, perm_name):
+        return False
+
+    def organization_ids(self):
+        return set()
+
+
+NO_PERMISSIONS = _NoPermissions()
+
+
+def get_permission_resolver(user):
+    """
+    Returns the resolver memoized on `user` (request.user lives for one request).
+    """
+    from .models import CustomUser
+
+    if not isinstance(user, CustomUser) or not user.is_authenticated:
+        return NO_PERMISSIONS
+    resolver = getattr(user, RESOLVER_CACHE_ATTR, None)
+    if resolver is None:
+        resolver = OrganizationPermissionResolver(user)
+        setattr(user, RESOLVER_CACHE_ATTR, resolver)
+    return resolver
+
+
+def has_org_permission(user, organization, perm_name):
+    """
+    Checks if the user has the specified permission in the given organization.
+    """
+    return get_permission_resolver(user).has(organization, perm_name)
+
+
+def org_ids_with_permission(user, perm_name):
+    """
+    Ids of the organizations in which the user has the specified permission.
+    """
+    return get_permission_resolver(user).orgs_with(perm_name)
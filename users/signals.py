@@ -0,0 +1,22 @@
+from django.contrib.auth.models import Group
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .models import CustomUser, OrganizationRole, UserOrganizationRole
+from .permissions import bump_permission_cache_version
+
+
+@receiver([post_save, post_delete], sender=UserOrganizationRole)
+@receiver([post_save, post_delete], sender=OrganizationRole)
+def organization_role_changed(sender, instance, **kwargs):
+    # نقش یا انتساب نقش تغییر کرده است؛ نگاشت‌های کش‌شده مجوزها دیگر معتبر نیستند.
+    bump_permission_cache_version()
+
+
+@receiver(m2m_changed, sender=OrganizationRole.permissions.through)
+@receiver(m2m_changed, sender=Group.permissions.through)
+@receiver(m2m_changed, sender=CustomUser.groups.through)
+@receiver(m2m_changed, sender=CustomUser.user_permissions.through)
+def permissions_m2m_changed(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_permission_cache_version()
@@ -10,4 +10,16 @@ def get_item(dictionary, key):
     """
     return dictionary.get(key)
 
+
+@register.simple_tag
+def has_org_perm(user, organization, perm_name):
+    """
+    Organization-scoped permission check for templates, which cannot call
+    methods with arguments.
+    Example: {% has_org_perm request.user organization 'hr.add_department' as can_add %}
+    """
+    if not organization:
+        return False
+    return user.has_organization_permission(organization, perm_name)
+
 # You can add other custom filters or simple tags here as well.
@@ -1,3 +1,112 @@
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
 from django.test import TestCase
 
-# Create your tests here.
+from organizations.models import Organization
+
+from .models import CustomUser, OrganizationRole, UserOrganizationRole
+from .permissions import (
+    PERMISSION_CACHE_VERSION_KEY, get_permission_resolver, has_org_permission, org_ids_with_permission,
+)
+
+
+class OrganizationRoleTestData:
+    """
+    An accountant holding salaries.view_payrollrun in one of two organizations.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.organization = Organization.objects.create(name="سازمان نمونه")
+        cls.other = Organization.objects.create(name="سازمان دیگر")
+        cls.role = OrganizationRole.objects.create(organization=cls.organization, name="حسابدار")
+        cls.view_payrollrun = Permission.objects.get(content_type__app_label='salaries', codename='view_payrollrun')
+        cls.role.permissions.add(cls.view_payrollrun)
+        cls.user = CustomUser.objects.create_user('accountant')
+        cls.assignment = UserOrganizationRole.objects.create(user=cls.user, organization=cls.organization, role=cls.role)
+
+    def setUp(self):
+        cache.clear()
+
+    def fresh_user(self):
+        # A new object stands for the user of a new request.
+        return CustomUser.objects.get(pk=self.user.pk)
+
+
+class OrganizationPermissionResolverTests(OrganizationRoleTestData, TestCase):
+    """
+    مجوزهای سازمانی کاربر با یک کوئری در هر درخواست تشخیص داده می‌شوند.
+    """
+
+    def test_permissions_are_scoped_to_the_organization(self):
+        user = self.fresh_user()
+        self.assertTrue(has_org_permission(user, self.organization, 'salaries.view_payrollrun'))
+        self.assertFalse(has_org_permission(user, self.other, 'salaries.view_payrollrun'))
+        self.assertFalse(has_org_permission(user, self.organization, 'salaries.change_payrollrun'))
+        self.assertEqual(org_ids_with_permission(user, 'salaries.view_payrollrun'), {self.organization.pk})
+
+    def test_map_is_loaded_once_per_request(self):
+        user = self.fresh_user()
+        with self.assertNumQueries(1):
+            for organization in (self.organization, self.other, self.organization.pk):
+                has_org_permission(user, organization, 'salaries.view_payrollrun')
+            org_ids_with_permission(user, 'salaries.view_payrollrun')
+        self.assertIs(get_permission_resolver(user), get_permission_resolver(user))
+
+    def test_superuser_holds_every_permission(self):
+        user = CustomUser.objects.create_superuser('admin', 'admin@example.com', 'password')
+        with self.assertNumQueries(0):
+            self.assertTrue(has_org_permission(user, self.other, 'salaries.change_payrollrun'))
+        self.assertEqual(
+            org_ids_with_permission(user, 'salaries.change_payrollrun'), {self.organization.pk, self.other.pk},
+        )
+
+    def test_inactive_user_holds_nothing(self):
+        CustomUser.objects.filter(pk=self.user.pk).update(is_active=False)
+        user = self.fresh_user()
+        with self.assertNumQueries(0):
+            self.assertFalse(has_org_permission(user, self.organization, 'salaries.view_payrollrun'))
+
+
+
+class PermissionCacheTests(OrganizationRoleTestData, TestCase):
+    """
+    نگاشت مجوزها بین درخواست‌ها در کش می‌ماند و با هر تغییر نقش باطل می‌شود.
+    """
+
+    def can_view(self):
+        return has_org_permission(self.fresh_user(), self.organization, 'salaries.view_payrollrun')
+
+    def test_later_requests_read_the_cache(self):
+        self.assertTrue(self.can_view())
+        user = self.fresh_user()
+        with self.assertNumQueries(0):
+            self.assertTrue(has_org_permission(user, self.organization, 'salaries.view_payrollrun'))
+
+    def test_removing_a_role_permission_invalidates(self):
+        self.assertTrue(self.can_view())
+        self.role.permissions.remove(self.view_payrollrun)
+        self.assertFalse(self.can_view())
+
+    def test_adding_a_role_permission_invalidates(self):
+        self.role.permissions.remove(self.view_payrollrun)
+        self.assertFalse(self.can_view())
+        self.role.permissions.add(self.view_payrollrun)
+        self.assertTrue(self.can_view())
+
+    def test_deleting_the_assignment_invalidates(self):
+        self.assertTrue(self.can_view())
+        self.assignment.delete()
+        self.assertFalse(self.can_view())
+
+    def test_new_assignment_invalidates(self):
+        self.assertFalse(has_org_permission(self.fresh_user(), self.other, 'salaries.view_payrollrun'))
+        UserOrganizationRole.objects.create(user=self.user, organization=self.other, role=self.role)
+        self.assertTrue(has_org_permission(self.fresh_user(), self.other, 'salaries.view_payrollrun'))
+
+    def test_evicted_version_key_still_invalidates(self):
+        self.assertTrue(self.can_view())
+        cache.delete(PERMISSION_CACHE_VERSION_KEY)
+        self.role.permissions.remove(self.view_payrollrun)
+        self.assertFalse(self.can_view())
@@ -12,6 +12,7 @@ from .models import CustomUser, OrganizationRole, UserOrganizationRole
 
 # Import Organization model from the organizations app for filtering/context
 from organizations.models import Organization
+from accounting_salary.mixins import RelatedObjectsMixin
 
 
 # --- Authentication Views (Existing) ---
@@ -46,7 +47,7 @@ class RegisterView(CreateView):
 
 # --- Views for OrganizationRole (Management of Organization Roles) ---
 
-class OrganizationRoleListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
+class OrganizationRoleListView(LoginRequiredMixin, UserPassesTestMixin, RelatedObjectsMixin, ListView):
     """
     نمایش لیست نقش‌های سازمانی.
     فقط برای کاربران مجاز (مثلاً is_staff یا superuser) قابل دسترسی است.
@@ -56,6 +57,7 @@ class OrganizationRoleListView(LoginRequiredMixin, UserPassesTestMixin, ListView
     template_name = 'users/organizationrole_list.html'
     context_object_name = 'organization_roles'
     # paginate_by = 10 # Optional: Add pagination
+    list_select_related = ('organization',)
 
     def test_func(self):
         # Only allow staff users or superusers to access this view
@@ -184,7 +186,7 @@ class OrganizationRoleDeleteView(LoginRequiredMixin, UserPassesTestMixin, Succes
 
 # --- Views for UserOrganizationRole (Assignment of Organization Roles to Users) ---
 
-class UserOrganizationRoleListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
+class UserOrganizationRoleListView(LoginRequiredMixin, UserPassesTestMixin, RelatedObjectsMixin, ListView):
     """
     نمایش لیست انتساب نقش‌های سازمانی به کاربران.
     فقط برای کاربران مجاز قابل دسترسی است.
@@ -194,6 +196,7 @@ class UserOrganizationRoleListView(LoginRequiredMixin, UserPassesTestMixin, List
     template_name = 'users/userorganizationrole_list.html'
     context_object_name = 'user_organization_roles'
     # paginate_by = 10 # Optional: Add pagination
+    list_select_related = ('user', 'organization', 'role')
 
     def test_func(self):
         # Only allow staff users or superusers to access this view